@@ -1,26 +1,81 @@
-from flask import Flask
+from flask import Flask, request
 from config import Config
-from app.routes.auth import init_firebase
-from app.utils import load_site_info
+from app.admission import init_admission
+from app.assets import init_assets
+from app.audio.render_cache import init_render_cache
+from app.logs import init_logging, start_listener
+from app.meditation_log import init_meditation_log
+from app.metrics import init_metrics
+from app.response_cache import init_response_cache
+from app.routes.auth import init_firebase, init_firebase_worker
+from app.sessions import ServerSideSessionInterface, init_sessions
+from app.site_info import get_site_info_source
+from app.templating import init_templating
+from app.version import get_version_info
+from app.theme import THEME_COOKIE, ThemeCompiler
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+    init_logging(app)
 
-    # Load site info and add to config
-    site_info = load_site_info()
-    app.config['SITE_NAME'] = site_info['site']['name']
+    # Load compiled site info and add to config
+    site_info_source = get_site_info_source()
+    app.extensions['site_info'] = site_info_source
+    app.config['SITE_NAME'] = site_info_source.get()['site']['name']
+    theme_compiler = ThemeCompiler(site_info_source)
+    app.extensions['theme'] = theme_compiler
 
+    init_metrics(app)
+    init_admission(app)
     init_firebase(app)
+    init_sessions(app)
+    init_meditation_log(app)
+    init_render_cache(app)
+    # Cached template fragments are invalidated whenever site_info reloads
+    init_templating(app, lambda: site_info_source.version)
+    init_assets(app)
+    init_response_cache(app, lambda: site_info_source.version)
 
     # Import blueprints at function level to avoid circular imports
     from app.routes import auth, main  # pylint: disable=import-outside-toplevel
     app.register_blueprint(auth.bp)
     app.register_blueprint(main.bp)
 
-    # Make site info available to all templates
+    # Make site info and the compiled theme available to all templates
     @app.context_processor
     def inject_site_info():
-        return {'site_info': site_info}
+        theme = theme_compiler.get()
+        return {
+            'site_info': site_info_source.get(),
+            'theme': theme,
+            'theme_class': theme.html_class(request.cookies.get(THEME_COOKIE)),
+        }
 
     return app
+
+
+def warm_up(app):
+    """Load read-only state now so workers forked from a preloaded app share it."""
+    get_version_info()
+    app.extensions['theme'].get()
+    env = app.jinja_env
+    for name in env.list_templates():
+        env.get_template(name)
+
+
+def init_worker(app):
+    """Re-create per-process state after a fork.
+
+    Everything create_app builds from files (site_info, templates, theme,
+    credentials, signing keys) is shared copy-on-write with the parent.
+    Connections, threads and event-loop-bound clients are not, and are
+    rebuilt here.
+    """
+    start_listener()
+    init_firebase_worker(app)
+    if isinstance(app.session_interface, ServerSideSessionInterface):
+        app.session_interface.store.after_fork()
+    app.extensions['meditation_log'].after_fork()
+    if 'auth_admission' in app.extensions:
+        app.extensions['auth_admission'].after_fork()
@@ -0,0 +1,208 @@
+"""Cross-worker admission control for expensive endpoints.
+
+Token buckets, one global and one per client IP, live in a small SQLite
+file in WAL mode, so every gunicorn worker on the host draws from the
+same budget. A request that finds either bucket empty is shed before it
+does any real work, with a Retry-After telling the client when a token
+will be available.
+"""
+import ipaddress
+import itertools
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from functools import wraps
+
+from flask import Response, current_app, request
+
+from app.metrics import AUTH_ADMITTED, AUTH_SHED
+
+logger = logging.getLogger(__name__)
+
+# Set in the WSGI environ when a front end already took the request's token
+ADMITTED_ENVIRON_KEY = 'app.admission.admitted'
+SHED_MESSAGE = b'Too many login attempts, please try again shortly.\n'
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS buckets ('
+    ' key TEXT PRIMARY KEY,'
+    ' tokens REAL NOT NULL,'
+    ' updated_at REAL NOT NULL'
+    ') WITHOUT ROWID'
+)
+
+
+def client_ip(remote_addr, forwarded_for=None, trusted_hops=0):
+    """Return the client address, trusting the last trusted_hops proxies.
+
+    IPv6 clients are grouped by /64, since a single host usually controls
+    a whole prefix.
+    """
+    address = remote_addr or 'unknown'
+    if trusted_hops and forwarded_for:
+        hops = [part.strip() for part in forwarded_for.split(',') if part.strip()]
+        if hops:
+            address = hops[-min(trusted_hops, len(hops))]
+    try:
+        parsed = ipaddress.ip_address(address)
+    except ValueError:
+        return address
+    if parsed.version == 6:
+        return str(ipaddress.ip_network(f'{parsed}/64', strict=False))
+    return str(parsed)
+
+
+class TokenBucketLimiter:
+    """Global and per-IP token buckets shared through a SQLite file.
+
+    buckets maps a scope ('global' or 'ip') to (tokens per second, burst).
+    """
+
+    def __init__(self, path, buckets, purge_interval=1000, busy_timeout=1.0):
+        self.path = path
+        self.buckets = buckets
+        self.purge_interval = purge_interval
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._writes = itertools.count(1)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection().execute(SCHEMA)
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            # Bucket levels are disposable, so skip fsync entirely
+            conn.execute('PRAGMA synchronous=OFF')
+            self._local.conn = conn
+        return conn
+
+    def after_fork(self):
+        """Forget connections opened before a fork; SQLite handles must not cross it."""
+        self._local = threading.local()
+
+    def _keys(self, ip):
+        return [
+            (scope, 'global' if scope == 'global' else f'{scope}:{ip}') for scope in self.buckets
+        ]
+
+    def _levels(self, conn, keys, now):
+        """Return {scope: (key, tokens)} with tokens refilled up to now."""
+        placeholders = ','.join('?' * len(keys))
+        rows = {
+            key: (tokens, updated_at) for key, tokens, updated_at in conn.execute(
+                f'SELECT key, tokens, updated_at FROM buckets WHERE key IN ({placeholders})',
+                [key for _, key in keys]
+            )
+        }
+        levels = {}
+        for scope, key in keys:
+            rate, burst = self.buckets[scope]
+            tokens, updated_at = rows.get(key, (burst, now))
+            levels[scope] = (key, min(burst, tokens + max(0.0, now - updated_at) * rate))
+        return levels
+
+    def _shortfall(self, levels):
+        """Return (seconds until admitted, scope) for the emptiest bucket, or (0, None)."""
+        wait, blocking = 0.0, None
+        for scope, (_, tokens) in levels.items():
+            if tokens < 1:
+                seconds = (1 - tokens) / self.buckets[scope][0]
+                if seconds > wait:
+                    wait, blocking = seconds, scope
+        return wait, blocking
+
+    def admit(self, ip, now=None):
+        """Take a token from every bucket, or none if any is empty.
+
+        Returns (admitted, retry_after_seconds, scope that shed the request).
+        When the store is unavailable requests are admitted: failing closed
+        would lock everyone out of logging in.
+        """
+        now = time.time() if now is None else now
+        try:
+            conn = self._connection()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                levels = self._levels(conn, self._keys(ip), now)
+                wait, blocking = self._shortfall(levels)
+                if blocking is None:
+                    conn.executemany(
+                        'INSERT OR REPLACE INTO buckets (key, tokens, updated_at) VALUES (?, ?, ?)',
+                        [(key, tokens - 1, now) for key, tokens in levels.values()]
+                    )
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        except sqlite3.Error as e:
+            logger.warning("Admission store unavailable", extra={'error': str(e)})
+            return True, 0.0, None
+
+        if blocking is None and next(self._writes) % self.purge_interval == 0:
+            self._purge(now)
+        return blocking is None, wait, blocking
+
+    def _purge(self, now):
+        """Drop buckets idle long enough to have refilled completely."""
+        slowest = min(rate / burst for rate, burst in self.buckets.values())
+        try:
+            self._connection().execute(
+                'DELETE FROM buckets WHERE updated_at < ?', (now - 1 / slowest,)
+            )
+        except sqlite3.Error:
+            pass
+
+
+def retry_after(wait):
+    """Format a wait in seconds as a Retry-After value of at least one second."""
+    return str(max(1, math.ceil(wait)))
+
+
+def request_ip():
+    return client_ip(
+        request.remote_addr,
+        request.headers.get('X-Forwarded-For'),
+        current_app.config['TRUSTED_PROXY_HOPS']
+    )
+
+
+def admission_controlled(view):
+    """Shed requests with 429 when the endpoint's token buckets are empty.
+
+    Requests a front end has already admitted (see async_login) are not
+    charged a second token.
+    """
+    @wraps(view)
+    def decorated_function(*args, **kwargs):
+        limiter = current_app.extensions.get('auth_admission')
+        if limiter is not None and not request.environ.get(ADMITTED_ENVIRON_KEY):
+            admitted, wait, scope = limiter.admit(request_ip())
+            if not admitted:
+                AUTH_SHED.labels(scope).inc()
+                return Response(
+                    SHED_MESSAGE, status=429, mimetype='text/plain',
+                    headers={'Retry-After': retry_after(wait)}
+                )
+            AUTH_ADMITTED.inc()
+        return view(*args, **kwargs)
+    return decorated_function
+
+
+def init_admission(app):
+    """Create the shared login limiter unless AUTH_RATE_LIMIT is off."""
+    if not app.config['AUTH_RATE_LIMIT']:
+        return
+    path = app.config['AUTH_RATE_LIMIT_PATH'] or os.path.join(
+        app.instance_path, 'admission.sqlite3'
+    )
+    app.extensions['auth_admission'] = TokenBucketLimiter(path, {
+        'global': (app.config['AUTH_GLOBAL_RATE'], app.config['AUTH_GLOBAL_BURST']),
+        'ip': (app.config['AUTH_IP_RATE_PER_MINUTE'] / 60, app.config['AUTH_IP_BURST']),
+    })
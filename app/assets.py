@@ -0,0 +1,70 @@
+"""Serve fingerprinted, pre-compressed static assets built by scripts/build_assets.py.
+
+When app/static/dist/manifest.json exists, url_for('static', ...) in
+templates resolves to the content-hashed copy, and the static view serves
+those copies with far-future immutable caching and the best pre-compressed
+variant the client accepts. Without a manifest everything behaves as
+before.
+"""
+import json
+import mimetypes
+import os
+
+from flask import request, send_from_directory, url_for
+
+MANIFEST_PATH = os.path.join('dist', 'manifest.json')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Preferred order when the client accepts several encodings
+ENCODING_SUFFIXES = (('br', '.br'), ('gzip', '.gz'))
+
+
+def load_manifest(static_folder):
+    """Return the asset manifest, or an empty one if assets were not built."""
+    try:
+        with open(os.path.join(static_folder, MANIFEST_PATH), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {'files': {}, 'encodings': {}}
+    manifest.setdefault('files', {})
+    manifest.setdefault('encodings', {})
+    return manifest
+
+
+def init_assets(app):
+    """Route static URLs and responses through the asset manifest."""
+    manifest = load_manifest(app.static_folder)
+    app.extensions['asset_manifest'] = manifest
+    files = manifest['files']
+    fingerprinted = set(files.values())
+    encodings = manifest['encodings']
+
+    def asset_url_for(endpoint, **values):
+        if endpoint == 'static' and values.get('filename') in files:
+            values['filename'] = files[values['filename']]
+        return url_for(endpoint, **values)
+
+    app.jinja_env.globals['url_for'] = asset_url_for
+
+    send_static_file = app.view_functions['static']
+
+    def static(filename):
+        if filename not in fingerprinted:
+            return send_static_file(filename=filename)
+
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        served, encoding = filename, None
+        for name, suffix in ENCODING_SUFFIXES:
+            if name in encodings.get(filename, ()) and request.accept_encodings[name]:
+                served, encoding = filename + suffix, name
+                break
+        response = send_from_directory(
+            app.static_folder, served, mimetype=mimetype, max_age=31536000, conditional=True
+        )
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if filename in encodings:
+            response.vary.add('Accept-Encoding')
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        return response
+
+    app.view_functions['static'] = static
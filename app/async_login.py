@@ -0,0 +1,107 @@
+"""ASGI wrapper that keeps the login callback off the worker threads.
+
+In a sync worker, auth_callback holds the worker for the whole Firebase
+round trip. Here the wrapper takes the admission token first, answering
+a shed request with 429 itself, then verifies the token and fetches a
+missing profile on the event loop, using the shared AsyncIdentityClient.
+It then hands the request to Flask, which finds both results in its
+caches and only writes the session. Everything else goes to Flask
+unchanged through a2wsgi's thread pool.
+"""
+import asyncio
+import logging
+from urllib.parse import parse_qs
+
+from a2wsgi import WSGIMiddleware
+
+from app.admission import ADMITTED_ENVIRON_KEY, SHED_MESSAGE, client_ip, retry_after
+from app.metrics import AUTH_ADMITTED, AUTH_SHED
+
+logger = logging.getLogger(__name__)
+
+CALLBACK_PATH = '/auth/callback'
+
+
+class AsyncLoginApp:
+    """ASGI application serving a Flask app with an async login path."""
+
+    def __init__(self, flask_app, wsgi_workers=10):
+        self.flask_app = flask_app
+        self.wsgi = WSGIMiddleware(self._flask_wsgi, workers=wsgi_workers)
+
+    def _flask_wsgi(self, environ, start_response):
+        # a2wsgi exposes the ASGI scope; carry the admission decision over
+        if environ['asgi.scope'].get(ADMITTED_ENVIRON_KEY):
+            environ[ADMITTED_ENVIRON_KEY] = True
+        return self.flask_app(environ, start_response)
+
+    async def _admit(self, scope, send):
+        """Take the login's admission token, answering 429 when shed.
+
+        Returns whether the request may go on. The token is taken here
+        rather than in the Flask view so a shed login costs no thread.
+        """
+        limiter = self.flask_app.extensions.get('auth_admission')
+        if limiter is None:
+            return True
+        headers = dict(scope['headers'])
+        forwarded_for = headers.get(b'x-forwarded-for', b'').decode('latin-1')
+        ip = client_ip(
+            (scope.get('client') or (None,))[0], forwarded_for,
+            self.flask_app.config['TRUSTED_PROXY_HOPS']
+        )
+        admitted, wait, blocking = await asyncio.to_thread(limiter.admit, ip)
+        if admitted:
+            AUTH_ADMITTED.inc()
+            return True
+        AUTH_SHED.labels(blocking).inc()
+        await send({
+            'type': 'http.response.start',
+            'status': 429,
+            'headers': [
+                (b'content-type', b'text/plain; charset=utf-8'),
+                (b'content-length', str(len(SHED_MESSAGE)).encode('ascii')),
+                (b'retry-after', retry_after(wait).encode('ascii')),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': SHED_MESSAGE})
+        return False
+
+    async def prepare_login(self, query_string):
+        """Warm the verifier and profile caches for the callback's token."""
+        id_token = parse_qs(query_string.decode('latin-1')).get('id_token', [None])[0]
+        if not id_token:
+            return
+        extensions = self.flask_app.extensions
+        verifier = extensions['token_verifier']
+        try:
+            if not verifier.keys.fresh:
+                await asyncio.to_thread(verifier.keys.fetch_if_expired)
+            claims = verifier.verify(id_token)
+            await extensions['user_profiles'].aget(
+                claims['uid'], claims, extensions['identity'].get_user
+            )
+        except Exception as e:
+            # The Flask view repeats the checks and reports the failure
+            logger.debug("Async login preparation failed", extra={'error': str(e)})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.flask_app.extensions['identity'].aclose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] == 'http' and scope['path'] == CALLBACK_PATH:
+            if not await self._admit(scope, send):
+                return
+            scope = {**scope, ADMITTED_ENVIRON_KEY: True}
+            await self.prepare_login(scope['query_string'])
+        await self.wsgi(scope, receive, send)
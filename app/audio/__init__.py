@@ -0,0 +1 @@
+"""Audio rendering for meditation sessions."""
@@ -0,0 +1,165 @@
+"""Block-based mixer for subliminal meditation sessions.
+
+A session is a looped background sound plus a quiet looped subliminal
+(affirmation) layer. Both layers are rendered in fixed-size blocks with
+vectorized NumPy operations, so memory use is bounded by the block size no
+matter how long the session is.
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+SAMPLE_RATE = 44100
+CHANNELS = 2
+BLOCK_FRAMES = 32768
+# Upper bound on any session; 4 hours of 16-bit stereo at 44.1 kHz is about
+# 2.5 GB, safely inside the 32-bit size fields of the WAV header
+MAX_DURATION_MINUTES = 240
+
+
+class MixParams(NamedTuple):
+    """Everything that determines the rendered output of a session."""
+    duration_seconds: float
+    background_volume: float
+    subliminal_volume: float
+    fade_in_seconds: float = 10.0
+    fade_out_seconds: float = 10.0
+    subliminal_delay_seconds: float = 5.0
+    sample_rate: int = SAMPLE_RATE
+    channels: int = CHANNELS
+
+    @property
+    def total_frames(self):
+        return int(round(self.duration_seconds * self.sample_rate))
+
+
+def params_from_site_info(site_info, meditation_type=None, duration_minutes=None, **overrides):
+    """Build MixParams from site_info session_defaults and meditation_types.
+
+    The duration is clamped to the selected meditation type's duration_range,
+    or without a known type to the widest range of any type, and never
+    exceeds MAX_DURATION_MINUTES. Raises ValueError for a duration that is
+    not positive.
+    """
+    defaults = site_info.get('session_defaults') or {}
+    minutes = defaults.get('duration_minutes', 20) if duration_minutes is None else duration_minutes
+    if minutes <= 0:
+        raise ValueError("duration must be positive")
+    ranges = [entry['duration_range'] for entry in site_info.get('meditation_types') or ()
+              if entry.get('duration_range')]
+    high = max((entry_high for _, entry_high in ranges), default=MAX_DURATION_MINUTES)
+    for entry in site_info.get('meditation_types') or ():
+        if entry.get('name') == meditation_type and entry.get('duration_range'):
+            low, high = entry['duration_range']
+            minutes = max(minutes, low)
+            break
+    minutes = min(minutes, high, MAX_DURATION_MINUTES)
+    params = {
+        'duration_seconds': float(minutes) * 60,
+        'background_volume': float(defaults.get('background_volume', 0.5)),
+        'subliminal_volume': float(defaults.get('subliminal_volume', 0.3)),
+        'subliminal_delay_seconds': float(defaults.get('auto_start_delay', 5)),
+    }
+    params.update(overrides)
+    return MixParams(**params)
+
+
+def as_frames(samples, channels):
+    """Return samples as a float32 (frames, channels) array, upmixing mono."""
+    samples = np.asarray(samples, dtype=np.float32)
+    if samples.ndim == 1:
+        samples = samples[:, np.newaxis]
+    if samples.shape[1] == channels:
+        return samples
+    if samples.shape[1] == 1:
+        return np.broadcast_to(samples, (samples.shape[0], channels))
+    raise ValueError(f"Cannot mix {samples.shape[1]} channels into {channels}")
+
+
+def loop_into(source, start, out):
+    """Fill out with source frames starting at start, wrapping around the end."""
+    length = source.shape[0]
+    position = start % length
+    filled = 0
+    count = out.shape[0]
+    while filled < count:
+        chunk = min(count - filled, length - position)
+        out[filled:filled + chunk] = source[position:position + chunk]
+        filled += chunk
+        position = 0
+    return out
+
+
+def envelope(start, count, total, fade_in, fade_out, *, delay=0, out=None):
+    """Linear fade-in/fade-out gain for frames [start, start + count).
+
+    Frames before delay are silent; the fade-in starts after the delay.
+    """
+    # float64 frame numbers: float32 cannot represent frames past ~6 minutes exactly
+    frames = np.arange(start, start + count, dtype=np.float64)
+    if out is None:
+        out = np.empty(count, dtype=np.float32)
+    np.subtract(frames, delay, out=out)
+    if fade_in > 0:
+        out /= fade_in
+    else:
+        out[:] = out >= 0
+    np.clip(out, 0.0, 1.0, out=out)
+    if fade_out > 0:
+        np.subtract(total, frames, out=frames)
+        frames /= fade_out
+        np.minimum(out, frames, out=out)
+    return np.clip(out, 0.0, 1.0, out=out)
+
+
+def render_blocks(background, subliminal, params, start_frame=0, block_frames=BLOCK_FRAMES):  # pylint: disable=too-many-locals
+    """Yield float32 (frames, channels) blocks of the mixed session.
+
+    Rendering can start at any frame, which lets callers seek without
+    rendering from zero. Yielded arrays are reused between blocks; copy
+    them if they need to outlive the next iteration.
+    """
+    channels = params.channels
+    rate = params.sample_rate
+    total = params.total_frames
+    background = as_frames(background, channels)
+    subliminal = as_frames(subliminal, channels) if subliminal is not None else None
+    fade_in = params.fade_in_seconds * rate
+    fade_out = params.fade_out_seconds * rate
+    delay = params.subliminal_delay_seconds * rate
+
+    mix = np.empty((block_frames, channels), dtype=np.float32)
+    layer = np.empty((block_frames, channels), dtype=np.float32)
+    gain = np.empty(block_frames, dtype=np.float32)
+
+    position = start_frame
+    while position < total:
+        count = min(block_frames, total - position)
+        out = mix[:count]
+
+        loop_into(background, position, out)
+        envelope(position, count, total, fade_in, fade_out, out=gain[:count])
+        gain[:count] *= params.background_volume
+        out *= gain[:count, np.newaxis]
+
+        if subliminal is not None and params.subliminal_volume > 0:
+            loop_into(subliminal, position, layer[:count])
+            envelope(position, count, total, fade_in, fade_out, delay=delay, out=gain[:count])
+            gain[:count] *= params.subliminal_volume
+            layer[:count] *= gain[:count, np.newaxis]
+            out += layer[:count]
+
+        np.clip(out, -1.0, 1.0, out=out)
+        yield out
+        position += count
+
+
+def to_pcm16(block):
+    """Convert a float block in [-1, 1] to interleaved little-endian 16-bit PCM."""
+    return (block * 32767.0).astype('<i2').tobytes()
+
+
+def render_pcm16(background, subliminal, params, start_frame=0, block_frames=BLOCK_FRAMES):
+    """Yield the session as 16-bit PCM byte chunks."""
+    for block in render_blocks(background, subliminal, params, start_frame, block_frames):
+        yield to_pcm16(block)
@@ -0,0 +1,155 @@
+"""Content-addressed disk cache of rendered sessions.
+
+Entries are complete WAV files named by a hash of the render parameters and
+the digests of the source files. They are written to a temporary file and
+renamed into place, so several gunicorn workers can share one directory.
+Hits are handed out as paths for send_file, so the response can go out
+through the server's sendfile support without copying into Python. Hits bump the
+file's mtime so eviction can drop the least recently used entries once the
+byte budget is exceeded.
+"""
+import hashlib
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from app.audio.stream import SessionStream
+
+logger = logging.getLogger(__name__)
+
+# Bump when the mixer output changes so stale renders are never served
+RENDER_VERSION = 2
+
+
+def render_key(params, source_digests):
+    """Return the cache key for a render of params from the given sources."""
+    h = hashlib.sha256()
+    h.update(repr((RENDER_VERSION, tuple(params))).encode('utf-8'))
+    for digest in source_digests:
+        h.update(b'\0')
+        h.update((digest or '').encode('ascii'))
+    return h.hexdigest()
+
+
+class RenderCache:  # pylint: disable=too-many-instance-attributes
+    """Byte-budgeted LRU directory of rendered session files.
+
+    At most fill_workers renders are written in the background at a time;
+    misses beyond that are streamed live without filling the cache.
+    """
+
+    def __init__(self, directory, max_bytes, fill_workers=2):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.fill_workers = fill_workers
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._filling = set()
+        self._executor = ThreadPoolExecutor(max_workers=fill_workers, thread_name_prefix='render-fill')
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.wav')
+
+    def lookup(self, key):
+        """Return the path of the cached file for key, or None on a miss.
+
+        The entry may still be evicted before the caller opens it.
+        """
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return path
+
+    def store(self, key, stream):
+        """Write a SessionStream to the cache via write-then-rename."""
+        tmp_path = os.path.join(self.directory, f'.tmp-{os.getpid()}-{uuid.uuid4().hex}')
+        try:
+            with open(tmp_path, 'wb') as f:
+                for chunk in stream.iter_range():
+                    f.write(chunk)
+            os.replace(tmp_path, self._path(key))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.evict()
+
+    def fill_async(self, key, background, subliminal, params):
+        """Render an entry in the background unless it is already being filled.
+
+        Returns without filling when every fill worker is busy.
+        """
+        with self._lock:
+            if key in self._filling or len(self._filling) >= self.fill_workers:
+                return
+            self._filling.add(key)
+
+        def fill():
+            try:
+                self.store(key, SessionStream(background, subliminal, params))
+            except Exception as e:
+                logger.exception("Render cache fill failed", extra={'key': key, 'error': str(e)})
+            finally:
+                with self._lock:
+                    self._filling.discard(key)
+
+        self._executor.submit(fill)
+
+    def _entries(self):
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith('.wav'):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        return entries
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits its budget."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                # Workers still sending the file keep it open until they finish
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+    def stats(self):
+        """Return hit/miss/eviction counters and the current on-disk size."""
+        entries = self._entries()
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(entries),
+                'bytes': sum(size for _, size, _ in entries),
+                'max_bytes': self.max_bytes,
+            }
+
+
+def init_render_cache(app):
+    """Create the shared render cache configured by RENDER_CACHE_DIR."""
+    directory = app.config['RENDER_CACHE_DIR'] or os.path.join(app.instance_path, 'render-cache')
+    app.extensions['render_cache'] = RenderCache(
+        directory, app.config['RENDER_CACHE_MAX_BYTES'], app.config['RENDER_CACHE_FILL_WORKERS']
+    )
@@ -0,0 +1,210 @@
+"""Decoded, memory-mapped session sounds shared by every worker on a host.
+
+Each source sound is decoded once into raw float32 PCM stored beside it
+(`rain.mp3` -> `rain.mp3.<digest>.pcm`) with a small JSON header recording
+the source digest. Workers open the PCM as a read-only numpy.memmap, so
+the OS page cache holds a single copy for the whole host. The decoded audio is made
+loop-ready by crossfading its tail into its head, so looping it for longer
+sessions has no click at the seam. Workers that find a stale header take an
+exclusive lock on `rain.mp3.lock` first, so a source is decoded by one
+worker while the others wait and reuse its result.
+"""
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import threading
+import uuid
+
+import numpy as np
+
+from app.audio.mixer import SAMPLE_RATE
+from app.audio.wav import read_wav
+
+HEADER_SUFFIX = '.pcm.json'
+LOCK_SUFFIX = '.lock'
+DECODER_VERSION = 1
+LOOP_CROSSFADE_SECONDS = 0.5
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _write_header(path, header):
+    """Replace the .pcm.json header beside path atomically."""
+    tmp_path = f'{path}{HEADER_SUFFIX}.{os.getpid()}.{uuid.uuid4().hex}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(header, f)
+    os.replace(tmp_path, path + HEADER_SUFFIX)
+
+
+def make_seamless(samples, crossfade_frames):
+    """Crossfade the tail of samples into its head so it loops without a seam."""
+    crossfade_frames = min(crossfade_frames, samples.shape[0] // 2)
+    if crossfade_frames <= 0:
+        return samples
+    looped = samples[:-crossfade_frames].copy()
+    ramp = np.linspace(0.0, 1.0, crossfade_frames, dtype=np.float32)[:, np.newaxis]
+    looped[:crossfade_frames] = (
+        samples[:crossfade_frames] * ramp + samples[-crossfade_frames:] * (1.0 - ramp)
+    )
+    return looped
+
+
+def decode(path):
+    """Decode a sound file to float32 (frames, channels) at SAMPLE_RATE."""
+    if path.lower().endswith('.wav'):
+        try:
+            samples, sample_rate = read_wav(path)
+            if sample_rate == SAMPLE_RATE:
+                return samples
+        except ValueError:
+            pass
+    if shutil.which('ffmpeg') is None:
+        raise RuntimeError(f"ffmpeg is required to decode {path}")
+    raw = subprocess.run(
+        ['ffmpeg', '-v', 'error', '-i', path, '-f', 'f32le', '-acodec', 'pcm_f32le',
+         '-ac', '2', '-ar', str(SAMPLE_RATE), '-'],
+        check=True, capture_output=True
+    ).stdout
+    return np.frombuffer(raw, dtype='<f4').reshape(-1, 2)
+
+
+class SoundStore:
+    """Decode-once store of session sounds backed by read-only memmaps."""
+
+    def __init__(self, directory, loop_crossfade_seconds=LOOP_CROSSFADE_SECONDS):
+        self.directory = directory
+        self.crossfade_frames = int(loop_crossfade_seconds * SAMPLE_RATE)
+        self._lock = threading.Lock()
+        self._maps = {}
+
+    def source_path(self, file_name):
+        """Return the configured source file, falling back to a .wav beside it."""
+        path = os.path.join(self.directory, file_name)
+        if os.path.isfile(path):
+            return path
+        stem, _ = os.path.splitext(path)
+        if os.path.isfile(stem + '.wav'):
+            return stem + '.wav'
+        raise FileNotFoundError(f"No audio for {file_name} in {self.directory}")
+
+    def _read_header(self, path):
+        try:
+            with open(path + HEADER_SUFFIX, 'r', encoding='utf-8') as f:
+                header = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (header.get('decoder_version'), header.get('crossfade_frames')) != (
+                DECODER_VERSION, self.crossfade_frames):
+            return None
+        return header
+
+    def _decode(self, path, stat, digest):
+        """Decode path into its .pcm file and header, replacing both atomically."""
+        samples = make_seamless(np.ascontiguousarray(decode(path), dtype='<f4'),
+                                self.crossfade_frames)
+        # The PCM file name carries the digest, so a re-decode never overwrites
+        # a file another worker has mapped
+        pcm_path = f'{path}.{digest[:16]}.pcm'
+        header = {
+            'decoder_version': DECODER_VERSION,
+            'crossfade_frames': self.crossfade_frames,
+            'pcm_file': os.path.basename(pcm_path),
+            'source_sha256': digest,
+            'source_mtime_ns': stat.st_mtime_ns,
+            'source_size': stat.st_size,
+            'sample_rate': SAMPLE_RATE,
+            'frames': samples.shape[0],
+            'channels': samples.shape[1],
+        }
+        suffix = f'.{os.getpid()}.{uuid.uuid4().hex}.tmp'
+        samples.tofile(pcm_path + suffix)
+        os.replace(pcm_path + suffix, pcm_path)
+        _write_header(path, header)
+
+        # Drop PCM decoded from earlier versions of the source
+        prefix = os.path.basename(path) + '.'
+        for entry in os.scandir(os.path.dirname(path) or '.'):
+            if (entry.name.startswith(prefix) and entry.name.endswith('.pcm')
+                    and entry.name != header['pcm_file']):
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(entry.path)
+        return header
+
+    def _current_header(self, path):
+        """Return (header, stat); header is None unless it matches the source's mtime and size."""
+        stat = os.stat(path)
+        header = self._read_header(path)
+        if header and (header['source_mtime_ns'], header['source_size']) == (
+                stat.st_mtime_ns, stat.st_size):
+            return header, stat
+        return None, stat
+
+    def ensure_decoded(self, file_name):
+        """Return (source path, header), decoding when the source changed."""
+        path = self.source_path(file_name)
+        header, _ = self._current_header(path)
+        if header:
+            return path, header
+        with open(path + LOCK_SUFFIX, 'a', encoding='utf-8') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            # Another worker may have finished while this one waited
+            header, stat = self._current_header(path)
+            if header:
+                return path, header
+            header = self._read_header(path)
+            digest = _sha256(path)
+            if header and header['source_sha256'] == digest:
+                # Same content with a new mtime, e.g. after a checkout; record
+                # it so later requests skip the hash
+                header.update(source_mtime_ns=stat.st_mtime_ns, source_size=stat.st_size)
+                _write_header(path, header)
+                return path, header
+            return path, self._decode(path, stat, digest)
+
+    def digest(self, file_name):
+        """Return a digest of a decoded sound.
+
+        It covers the source file and the settings that shape the decoded
+        samples, so render cache keys built from it change with either.
+        """
+        header = self.ensure_decoded(file_name)[1]
+        return hashlib.sha256(
+            f"{header['source_sha256']}\0{DECODER_VERSION}\0{self.crossfade_frames}".encode('ascii')
+        ).hexdigest()
+
+    def get(self, file_name):
+        """Return the decoded sound as a read-only (frames, channels) memmap."""
+        path, header = self.ensure_decoded(file_name)
+        key = (path, header['source_sha256'])
+        with self._lock:
+            samples = self._maps.get(key)
+            if samples is None:
+                samples = np.memmap(
+                    os.path.join(os.path.dirname(path), header['pcm_file']), dtype='<f4', mode='r',
+                    shape=(header['frames'], header['channels'])
+                )
+                self._maps = {k: v for k, v in self._maps.items() if k[0] != path}
+                self._maps[key] = samples
+        return samples
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_sound_store(directory):
+    """Return the process-wide SoundStore for a sounds directory."""
+    with _stores_lock:
+        if directory not in _stores:
+            _stores[directory] = SoundStore(directory)
+        return _stores[directory]
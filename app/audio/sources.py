@@ -0,0 +1,32 @@
+"""Lookup of configured background sounds and affirmation layers."""
+import os
+
+
+def sounds_dir(site_info):
+    """Return the configured directory holding session sound files."""
+    directories = site_info.get('directories') or {}
+    return (directories.get('static') or {}).get('sounds', os.path.join('app', 'static', 'sounds'))
+
+
+def find_background(site_info, name):
+    """Return the background_sounds entry matching a name or file, or None."""
+    for entry in site_info.get('background_sounds') or ():
+        if name in (entry.get('name'), entry.get('file')):
+            return entry
+    return None
+
+
+def find_meditation_type(site_info, name):
+    """Return the meditation_types entry with the given name, or None."""
+    for entry in site_info.get('meditation_types') or ():
+        if entry.get('name') == name:
+            return entry
+    return None
+
+
+def affirmation_file(site_info, meditation_type=None):
+    """Return the affirmation file for a meditation type or the session default."""
+    entry = find_meditation_type(site_info, meditation_type) if meditation_type else None
+    if entry and entry.get('affirmations'):
+        return entry['affirmations']
+    return (site_info.get('session_defaults') or {}).get('affirmations')
@@ -0,0 +1,45 @@
+"""Lazy, seekable WAV streams of rendered sessions."""
+from app.audio.mixer import render_pcm16
+from app.audio.wav import HEADER_SIZE, wav_header
+
+
+class SessionStream:
+    """A rendered session exposed as a byte range of a WAV file.
+
+    Nothing is rendered up front: iter_range() renders only the frames
+    covering the requested bytes, one block at a time.
+    """
+
+    def __init__(self, background, subliminal, params):
+        self.background = background
+        self.subliminal = subliminal
+        self.params = params
+        self.block_align = params.channels * 2
+        self.data_size = params.total_frames * self.block_align
+        self.header = wav_header(self.data_size, params.sample_rate, params.channels)
+
+    @property
+    def length(self):
+        return HEADER_SIZE + self.data_size
+
+    def iter_range(self, start=0, stop=None):
+        """Yield the bytes in [start, stop) of the WAV file."""
+        stop = self.length if stop is None else min(stop, self.length)
+        if start < HEADER_SIZE:
+            yield self.header[start:stop]
+            start = HEADER_SIZE
+        if start >= stop:
+            return
+
+        offset = start - HEADER_SIZE
+        first_frame, skip = divmod(offset, self.block_align)
+        remaining = stop - start
+        for chunk in render_pcm16(self.background, self.subliminal, self.params, first_frame):
+            if skip:
+                chunk = chunk[skip:]
+                skip = 0
+            if len(chunk) >= remaining:
+                yield chunk[:remaining]
+                return
+            remaining -= len(chunk)
+            yield chunk
@@ -0,0 +1,31 @@
+"""WAV container helpers for streamed session audio."""
+import struct
+import wave
+
+import numpy as np
+
+HEADER_SIZE = 44
+
+
+def wav_header(data_size, sample_rate, channels, bits_per_sample=16):
+    """Return the 44-byte RIFF/WAVE header for a PCM stream of data_size bytes."""
+    block_align = channels * bits_per_sample // 8
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', 36 + data_size, b'WAVE',
+        b'fmt ', 16, 1, channels, sample_rate,
+        sample_rate * block_align, block_align, bits_per_sample,
+        b'data', data_size
+    )
+
+
+def read_wav(path):
+    """Read a 16-bit PCM WAV file into a float32 (frames, channels) array."""
+    with wave.open(str(path), 'rb') as f:
+        if f.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM WAV files are supported")
+        channels = f.getnchannels()
+        frames = f.readframes(f.getnframes())
+        sample_rate = f.getframerate()
+    samples = np.frombuffer(frames, dtype='<i2').reshape(-1, channels)
+    return samples.astype(np.float32) / 32768.0, sample_rate
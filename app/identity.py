@@ -0,0 +1,112 @@
+"""Async client for the Firebase Identity Toolkit REST API.
+
+One pooled httpx.AsyncClient is shared by every request handled on the
+event loop, so concurrent logins reuse warm connections instead of each
+opening its own. When FIREBASE_AUTH_EMULATOR_HOST is set, requests go to
+that host with the emulator's fixed bearer token, the same convention
+firebase_admin uses.
+"""
+import asyncio
+import calendar
+import time
+
+import httpx
+
+IDENTITY_TOOLKIT_URL = 'https://identitytoolkit.googleapis.com/v1'
+EMULATOR_TOKEN = 'owner'
+# Refresh the OAuth token this long before Google says it expires
+TOKEN_REFRESH_MARGIN = 60
+
+
+class UserNotFoundError(LookupError):
+    """Raised when the identity backend has no record for a uid."""
+
+
+def profile_from_lookup(user):
+    """Build a profile from an accounts:lookup user entry."""
+    return {
+        'display_name': user.get('displayName'),
+        'email': user.get('email'),
+        'photo_url': user.get('photoUrl'),
+    }
+
+
+class AsyncIdentityClient:  # pylint: disable=too-many-instance-attributes
+    """Look up Firebase users over a shared connection pool."""
+
+    def __init__(self, project_id, credential=None, emulator_host=None,
+                 timeout=5.0, max_connections=32):
+        self.project_id = project_id
+        self.credential = credential
+        self.emulator_host = emulator_host
+        if emulator_host:
+            self.base_url = f'http://{emulator_host}/identitytoolkit.googleapis.com/v1'
+        else:
+            self.base_url = IDENTITY_TOOLKIT_URL
+        self.timeout = httpx.Timeout(timeout)
+        self.max_connections = max_connections
+        self.limits = httpx.Limits(
+            max_connections=max_connections, max_keepalive_connections=max_connections
+        )
+        self._client = None
+        self._slots = None
+        self._token = None
+        self._token_expires_at = 0.0
+        self._token_lock = None
+        self.request_count = 0
+
+    def client(self):
+        """Return the shared AsyncClient, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url, timeout=self.timeout, limits=self.limits
+            )
+            self._token_lock = asyncio.Lock()
+            # httpcore rescans the whole pool for every queued request, which gets
+            # expensive under a login burst; queue on a semaphore instead
+            self._slots = asyncio.Semaphore(self.max_connections)
+        return self._client
+
+    def after_fork(self):
+        """Forget a client bound to the parent's event loop."""
+        self._client = None
+        self._slots = None
+        self._token_lock = None
+
+    async def _access_token(self):
+        """Return an OAuth token for the service account, refreshed off the loop."""
+        if self.emulator_host:
+            return EMULATOR_TOKEN
+        if self._token and time.time() < self._token_expires_at:
+            return self._token
+        async with self._token_lock:
+            if not self._token or time.time() >= self._token_expires_at:
+                # google-auth refreshes synchronously; keep it off the event loop
+                info = await asyncio.to_thread(self.credential.get_access_token)
+                self._token = info.access_token
+                # google-auth reports expiry as a naive UTC datetime
+                expiry = calendar.timegm(info.expiry.utctimetuple()) if info.expiry else time.time() + 3600
+                self._token_expires_at = expiry - TOKEN_REFRESH_MARGIN
+        return self._token
+
+    async def get_user(self, uid):
+        """Return the profile dict for uid from the identity backend."""
+        client = self.client()
+        token = await self._access_token()
+        self.request_count += 1
+        async with self._slots:
+            response = await client.post(
+                f'/projects/{self.project_id}/accounts:lookup',
+                json={'localId': [uid]},
+                headers={'Authorization': f'Bearer {token}'},
+            )
+        response.raise_for_status()
+        users = response.json().get('users') or []
+        if not users:
+            raise UserNotFoundError(f"No user record found for uid: {uid}")
+        return profile_from_lookup(users[0])
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
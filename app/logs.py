@@ -0,0 +1,80 @@
+"""Structured, non-blocking logging for the app.
+
+Records from every `app.*` logger go through a QueueHandler, so request
+threads only enqueue them. A QueueListener thread formats each record as a
+single JSON line and writes it to stderr.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RESERVED = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_queue = queue.SimpleQueue()
+_listener = None
+_listener_pid = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Format a record and its `extra` fields as one JSON object per line."""
+
+    def format(self, record):
+        entry = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created))
+                  + f'.{int(record.msecs):03d}Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def start_listener():
+    """Start the queue listener for this process; safe to call after fork."""
+    global _queue, _listener, _listener_pid
+    if _listener is not None and _listener_pid == os.getpid():
+        return
+    if _listener is not None:
+        # Forked: the parent's listener thread is gone and may have left the
+        # queue mid-operation, so give this process a fresh one
+        _queue = queue.SimpleQueue()
+        for h in logging.getLogger('app').handlers:
+            if isinstance(h, logging.handlers.QueueHandler):
+                h.queue = _queue
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter())
+    _listener = logging.handlers.QueueListener(_queue, handler, respect_handler_level=True)
+    _listener.start()
+    _listener_pid = os.getpid()
+
+
+def stop_listener():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.stop()
+    _listener = None
+
+
+def init_logging(app):
+    """Route the `app` logger hierarchy through the queue."""
+    logger = logging.getLogger('app')
+    logger.setLevel(app.config['LOG_LEVEL'])
+    if not any(isinstance(h, logging.handlers.QueueHandler) for h in logger.handlers):
+        logger.addHandler(logging.handlers.QueueHandler(_queue))
+        logger.propagate = False
+    start_listener()
+
+
+atexit.register(stop_listener)
@@ -0,0 +1,313 @@
+"""Append-only log of completed meditation sessions with per-user totals.
+
+Events live in a SQLite database in WAL mode. Every write also updates the
+user's aggregate row in the same transaction: totals, minutes per
+meditation type, and the current and longest daily streaks. The dashboard
+reads that row plus a few recent events through a covering index, so its
+cost does not grow with the user's history. Streaks use UTC days.
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from typing import NamedTuple, Optional
+
+SECONDS_PER_DAY = 86400
+MAX_SESSION_SECONDS = 24 * 3600
+# Clients may run slightly fast; anything further in the future is rejected
+MAX_CLOCK_SKEW = 300
+# 2020-01-01, well before the app existed
+MIN_STARTED_AT = 1577836800
+_EVENT_ID_RE = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS session_events ('
+    ' user_id TEXT NOT NULL,'
+    ' event_id TEXT NOT NULL,'
+    ' started_at INTEGER NOT NULL,'
+    ' day INTEGER NOT NULL,'
+    ' duration_seconds INTEGER NOT NULL,'
+    ' meditation_type TEXT NOT NULL,'
+    ' background TEXT,'
+    ' PRIMARY KEY (user_id, event_id)'
+    ') WITHOUT ROWID',
+    # Covering indexes: recent sessions and streak walks never touch the table
+    'CREATE INDEX IF NOT EXISTS session_events_recent'
+    ' ON session_events (user_id, started_at, duration_seconds, meditation_type)',
+    'CREATE INDEX IF NOT EXISTS session_events_days ON session_events (user_id, day)',
+    'CREATE TABLE IF NOT EXISTS user_stats ('
+    ' user_id TEXT PRIMARY KEY,'
+    ' total_sessions INTEGER NOT NULL,'
+    ' total_seconds INTEGER NOT NULL,'
+    ' by_type TEXT NOT NULL,'
+    ' last_day INTEGER NOT NULL,'
+    ' current_streak INTEGER NOT NULL,'
+    ' longest_streak INTEGER NOT NULL,'
+    ' last_started_at INTEGER NOT NULL'
+    ') WITHOUT ROWID',
+)
+
+
+class BatchTooLarge(ValueError):
+    """Raised when an uploaded batch exceeds its byte or event limit."""
+
+
+class SessionEvent(NamedTuple):
+    event_id: str
+    started_at: int
+    duration_seconds: int
+    meditation_type: str
+    background: Optional[str] = None
+
+
+def event_from_json(data, now=None):
+    """Validate a JSON object and return a SessionEvent, or raise ValueError.
+
+    A missing id gets a random one, so only client-supplied ids make
+    retries idempotent.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("A session event must be an object")
+    now = time.time() if now is None else now
+
+    event_id = data.get('id')
+    if event_id is None:
+        event_id = uuid.uuid4().hex
+    if not isinstance(event_id, str) or not _EVENT_ID_RE.match(event_id):
+        raise ValueError("id must be 1-64 letters, digits, '-' or '_'")
+
+    started_at = data.get('started_at')
+    if isinstance(started_at, bool) or not isinstance(started_at, (int, float)):
+        raise ValueError("started_at must be a Unix timestamp")
+    if not MIN_STARTED_AT <= started_at <= now + MAX_CLOCK_SKEW:
+        raise ValueError("started_at is out of range")
+
+    duration = data.get('duration_seconds')
+    if isinstance(duration, bool) or not isinstance(duration, int):
+        raise ValueError("duration_seconds must be an integer")
+    if not 0 < duration <= MAX_SESSION_SECONDS:
+        raise ValueError("duration_seconds is out of range")
+
+    meditation_type = data.get('meditation_type')
+    if not isinstance(meditation_type, str) or not 0 < len(meditation_type) <= 64:
+        raise ValueError("meditation_type is required")
+
+    background = data.get('background')
+    if background is not None and (not isinstance(background, str) or len(background) > 128):
+        raise ValueError("background must be a short string")
+
+    return SessionEvent(event_id, int(started_at), duration, meditation_type, background)
+
+
+def read_event_batch(stream, max_events, max_bytes, max_line_bytes=4096, now=None):
+    """Parse newline-delimited JSON events from a binary stream.
+
+    Lines are read one at a time, so an upload is never held in memory as
+    a whole. Returns (events, rejected): rejected lists
+    {'line': n, 'error': ...} for lines that are not valid events.
+    Raises BatchTooLarge as soon as a limit is exceeded.
+    """
+    events, rejected = [], []
+    total = line_number = 0
+    while True:
+        line = stream.readline(max_line_bytes + 1)
+        if not line:
+            break
+        line_number += 1
+        total += len(line)
+        if total > max_bytes:
+            raise BatchTooLarge(f"Batch exceeds {max_bytes} bytes")
+        if len(line) > max_line_bytes and not line.endswith(b'\n'):
+            raise BatchTooLarge(f"Line {line_number} exceeds {max_line_bytes} bytes")
+        line = line.strip()
+        if not line:
+            continue
+        if len(events) + len(rejected) >= max_events:
+            raise BatchTooLarge(f"Batch exceeds {max_events} events")
+        try:
+            events.append(event_from_json(json.loads(line), now=now))
+        except (ValueError, RecursionError) as e:
+            rejected.append({'line': line_number, 'error': str(e)})
+    return events, rejected
+
+
+def empty_stats():
+    return {
+        'total_sessions': 0,
+        'total_minutes': 0,
+        'by_type': {},
+        'current_streak': 0,
+        'longest_streak': 0,
+        'last_session_at': None,
+    }
+
+
+class MeditationLog:
+    """Session events and incrementally maintained per-user statistics."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        for statement in SCHEMA:
+            conn.execute(statement)
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def after_fork(self):
+        """Forget connections opened before a fork; SQLite handles must not cross it."""
+        self._local = threading.local()
+
+    def record(self, user_id, events):
+        """Store events for a user in one transaction; return how many were new.
+
+        Events whose id is already stored for the user are skipped, so a
+        retried upload has no effect.
+        """
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            inserted, new_days = [], set()
+            for event in events:
+                day = event.started_at // SECONDS_PER_DAY
+                day_seen = day in new_days or conn.execute(
+                    'SELECT 1 FROM session_events WHERE user_id = ? AND day = ? LIMIT 1',
+                    (user_id, day)
+                ).fetchone() is not None
+                cursor = conn.execute(
+                    'INSERT OR IGNORE INTO session_events'
+                    ' (user_id, event_id, started_at, day, duration_seconds, meditation_type, background)'
+                    ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (user_id, event.event_id, event.started_at, day, event.duration_seconds,
+                     event.meditation_type, event.background)
+                )
+                if cursor.rowcount:
+                    inserted.append(event)
+                    if not day_seen:
+                        new_days.add(day)
+            if inserted:
+                self._update_stats(conn, user_id, inserted, sorted(new_days))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return len(inserted)
+
+    def _run_length(self, conn, user_id, day, step):
+        """Count consecutive logged days next to day, walking in direction step."""
+        if step < 0:
+            sql = ('SELECT DISTINCT day FROM session_events'
+                   ' WHERE user_id = ? AND day < ? ORDER BY day DESC')
+        else:
+            sql = ('SELECT DISTINCT day FROM session_events'
+                   ' WHERE user_id = ? AND day > ? ORDER BY day')
+        count, expected = 0, day + step
+        for (found,) in conn.execute(sql, (user_id, day)):
+            if found != expected:
+                break
+            count += 1
+            expected += step
+        return count
+
+    def _update_stats(self, conn, user_id, events, new_days):  # pylint: disable=too-many-locals
+        row = conn.execute(
+            'SELECT total_sessions, total_seconds, by_type, last_day, current_streak,'
+            ' longest_streak, last_started_at FROM user_stats WHERE user_id = ?',
+            (user_id,)
+        ).fetchone()
+        if row is None:
+            sessions, seconds, by_type = 0, 0, {}
+            last_day, current, longest, last_started_at = None, 0, 0, 0
+        else:
+            sessions, seconds, by_type_json, last_day, current, longest, last_started_at = row
+            by_type = json.loads(by_type_json)
+
+        for event in events:
+            sessions += 1
+            seconds += event.duration_seconds
+            totals = by_type.setdefault(event.meditation_type, [0, 0])
+            totals[0] += 1
+            totals[1] += event.duration_seconds
+            last_started_at = max(last_started_at, event.started_at)
+
+        # Extend the streak with days after the last one first, so that
+        # backfilled days below see the final last_day
+        later = [day for day in new_days if last_day is None or day > last_day]
+        backfilled = [day for day in new_days if last_day is not None and day < last_day]
+        for day in later:
+            current = current + 1 if last_day is not None and day == last_day + 1 else 1
+            last_day = day
+            longest = max(longest, current)
+        for day in backfilled:
+            # A backfilled day can join two runs; only walk the run it belongs to
+            before = self._run_length(conn, user_id, day, -1)
+            after = self._run_length(conn, user_id, day, 1)
+            run = before + 1 + after
+            longest = max(longest, run)
+            if day + after == last_day:
+                current = run
+
+        conn.execute(
+            'INSERT OR REPLACE INTO user_stats (user_id, total_sessions, total_seconds, by_type,'
+            ' last_day, current_streak, longest_streak, last_started_at)'
+            ' VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (user_id, sessions, seconds, json.dumps(by_type, separators=(',', ':')),
+             last_day, current, longest, last_started_at)
+        )
+
+    def stats(self, user_id, now=None):
+        """Return the user's totals from their aggregate row."""
+        row = self._connection().execute(
+            'SELECT total_sessions, total_seconds, by_type, last_day, current_streak,'
+            ' longest_streak, last_started_at FROM user_stats WHERE user_id = ?',
+            (user_id,)
+        ).fetchone()
+        if row is None:
+            return empty_stats()
+        sessions, seconds, by_type, last_day, current, longest, last_started_at = row
+        today = int(time.time() if now is None else now) // SECONDS_PER_DAY
+        return {
+            'total_sessions': sessions,
+            'total_minutes': seconds // 60,
+            'by_type': {
+                name: {'sessions': count, 'minutes': type_seconds // 60}
+                for name, (count, type_seconds) in json.loads(by_type).items()
+            },
+            # The streak is still alive until a full day passes without a session
+            'current_streak': current if last_day >= today - 1 else 0,
+            'longest_streak': longest,
+            'last_session_at': last_started_at,
+        }
+
+    def recent(self, user_id, limit=5):
+        """Return the user's latest sessions, newest first."""
+        rows = self._connection().execute(
+            'SELECT started_at, duration_seconds, meditation_type FROM session_events'
+            ' WHERE user_id = ? ORDER BY started_at DESC LIMIT ?',
+            (user_id, limit)
+        ).fetchall()
+        return [
+            {'started_at': started_at, 'minutes': duration // 60, 'meditation_type': meditation_type}
+            for started_at, duration, meditation_type in rows
+        ]
+
+
+def init_meditation_log(app):
+    """Open the session log shared by all workers on the host."""
+    path = app.config['MEDITATION_LOG_PATH'] or os.path.join(
+        app.instance_path, 'meditation_log.sqlite3'
+    )
+    app.extensions['meditation_log'] = MeditationLog(path)
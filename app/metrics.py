@@ -0,0 +1,80 @@
+"""Prometheus metrics for the request hot paths.
+
+When PROMETHEUS_MULTIPROC_DIR is set (see gunicorn.conf.py), every worker
+writes its samples to that directory and /metrics aggregates them, so one
+scrape covers all workers on the host. Without it the metrics cover the
+current process only.
+"""
+import hmac
+import os
+import time
+
+from flask import Response, abort, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest
+)
+from prometheus_client import multiprocess
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Request latency by endpoint',
+    ['endpoint', 'method']
+)
+REQUESTS = Counter(
+    'http_requests_total', 'Requests by endpoint and status',
+    ['endpoint', 'method', 'status']
+)
+TOKEN_VERIFY_LATENCY = Histogram(
+    'firebase_token_verify_seconds', 'Time spent verifying Firebase ID tokens'
+)
+USER_LOOKUP_LATENCY = Histogram(
+    'user_profile_lookup_seconds', 'Time spent resolving user profiles on login'
+)
+TEMPLATE_RENDER_LATENCY = Histogram(
+    'template_render_seconds', 'Template render time by endpoint', ['endpoint']
+)
+AUTH_FAILURES = Counter(
+    'auth_failures_total', 'Failed logins by reason', ['reason']
+)
+AUTH_ADMITTED = Counter(
+    'auth_admitted_total', 'Login callbacks admitted by admission control'
+)
+AUTH_SHED = Counter(
+    'auth_shed_total', 'Login callbacks rejected with 429, by the bucket that was empty',
+    ['scope']
+)
+
+
+def _registry():
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    from prometheus_client import REGISTRY  # pylint: disable=import-outside-toplevel
+    return REGISTRY
+
+
+def init_metrics(app):
+    """Time every request and expose /metrics in Prometheus text format."""
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        started = g.pop('request_started', None)
+        if started is not None:
+            endpoint = request.endpoint or 'unmatched'
+            REQUEST_LATENCY.labels(endpoint, request.method).observe(time.perf_counter() - started)
+            REQUESTS.labels(endpoint, request.method, str(response.status_code)).inc()
+        return response
+
+    def metrics():
+        token = app.config['METRICS_TOKEN']
+        if token:
+            supplied = request.headers.get('Authorization', '')
+            if not hmac.compare_digest(supplied, f'Bearer {token}'):
+                abort(401)
+        return Response(generate_latest(_registry()), mimetype=CONTENT_TYPE_LATEST)
+
+    app.add_url_rule('/metrics', 'metrics', metrics)
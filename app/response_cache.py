@@ -0,0 +1,137 @@
+"""Rendered-response cache with strong ETags for anonymous pages.
+
+Views opt in with @cached_response. For anonymous GET/HEAD requests the
+rendered body is stored once per endpoint, view arguments, theme and config
+version, its ETag is computed once, and matching If-None-Match requests are
+answered with 304. Entries are invalidated when site_info reloads or a
+template file changes.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, current_app, make_response, request, session
+
+from app.theme import THEME_COOKIE
+
+
+class ResponseCache:  # pylint: disable=too-many-instance-attributes
+    """Bounded LRU of rendered response bodies."""
+
+    def __init__(self, config_version, template_folder, max_entries=128, check_interval=1.0):
+        self.config_version = config_version
+        self.template_folder = template_folder
+        self.max_entries = max_entries
+        self.check_interval = check_interval
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._template_stamp = None
+        self._next_check = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def template_stamp(self):
+        """Return the newest template mtime, re-checked at most once per interval."""
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.check_interval
+            newest = 0
+            for root, _, files in os.walk(self.template_folder):
+                for name in files:
+                    newest = max(newest, os.stat(os.path.join(root, name)).st_mtime_ns)
+            self._template_stamp = newest
+        return self._template_stamp
+
+    def generation(self):
+        return self.config_version(), self.template_stamp()
+
+    def get(self, key):
+        generation = self.generation()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != generation:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        generation = self.generation()
+        with self._lock:
+            self._entries[key] = (generation, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def count_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'not_modified': self.not_modified,
+                'entries': len(self._entries),
+            }
+
+
+def _build_response(body, mimetype, etag):
+    response = Response(body, mimetype=mimetype)
+    response.set_etag(etag)
+    # Browsers revalidate every time, which is a cheap 304 once they hold the ETag
+    response.cache_control.no_cache = True
+    response.vary.add('Cookie')
+    return response
+
+
+def cached_response(view):
+    """Cache the rendered output of a view for anonymous visitors."""
+    @wraps(view)
+    def decorated_function(*args, **kwargs):
+        cache = current_app.extensions.get('response_cache')
+        if cache is None or request.method not in ('GET', 'HEAD') or 'user_id' in session:
+            return view(*args, **kwargs)
+
+        theme = current_app.extensions['theme'].get()
+        key = (
+            request.endpoint,
+            tuple(sorted(kwargs.items())),
+            theme.html_class(request.cookies.get(THEME_COOKIE)),
+        )
+        entry = cache.get(key)
+        if entry is None:
+            response = make_response(view(*args, **kwargs))
+            # Set-Cookie is only added when the session is saved after this
+            # view returns, so check whether the view wrote to the session
+            if (response.status_code != 200 or response.is_streamed
+                    or session.modified or getattr(session, 'new', False)):
+                return response
+            body = response.get_data()
+            entry = (body, response.mimetype, hashlib.sha256(body).hexdigest()[:32])
+            cache.set(key, entry)
+
+        response = _build_response(*entry).make_conditional(request)
+        if response.status_code == 304:
+            cache.count_not_modified()
+        return response
+    return decorated_function
+
+
+def init_response_cache(app, config_version):
+    """Create the response cache; config_version changes invalidate it."""
+    app.extensions['response_cache'] = ResponseCache(
+        config_version,
+        os.path.join(app.root_path, app.template_folder),
+        max_entries=app.config['RESPONSE_CACHE_MAX_ENTRIES']
+    )
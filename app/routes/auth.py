@@ -1,16 +1,26 @@
 from datetime import datetime
 from functools import wraps
+import logging
 import os
+import time
 
 from flask import (
     Blueprint, redirect, url_for, session,
-    request, render_template
+    request, render_template, current_app
 )
 import firebase_admin
-from firebase_admin import auth as firebase_auth
 from firebase_admin import credentials
 
+from app.admission import admission_controlled
+from app.identity import AsyncIdentityClient
+from app.metrics import AUTH_FAILURES, TOKEN_VERIFY_LATENCY, USER_LOOKUP_LATENCY
+from app.response_cache import cached_response
+from app.sessions import ServerSideSession
+from app.token_verifier import TokenVerificationError, TokenVerifier, get_key_cache
+from app.user_profiles import UserProfileCache
+
 bp = Blueprint('auth', __name__)
+logger = logging.getLogger(__name__)
 
 def init_firebase(app):
     private_key = os.getenv('FIREBASE_PRIVATE_KEY')
@@ -34,7 +44,37 @@ def init_firebase(app):
             "client_x509_cert_url": os.getenv('FIREBASE_CLIENT_CERT_URL')
         }
         cred = credentials.Certificate(cred_dict)
-    firebase_admin.initialize_app(cred)
+    app.extensions['firebase_app'] = firebase_admin.initialize_app(cred)
+
+    # Verify ID tokens locally against cached signing keys; warm the key
+    # cache in the background so the first login does not pay for the fetch
+    keys = get_key_cache(app.config['FIREBASE_CERTS_URL'])
+    keys.prefetch()
+    project_id = app.config['FIREBASE_CONFIG']['projectId'] or cred.project_id
+    app.extensions['token_verifier'] = TokenVerifier(project_id, keys=keys)
+    app.extensions['identity'] = AsyncIdentityClient(
+        project_id,
+        credential=cred,
+        emulator_host=app.config['FIREBASE_AUTH_EMULATOR_HOST'],
+        timeout=app.config['IDENTITY_HTTP_TIMEOUT'],
+        max_connections=app.config['IDENTITY_HTTP_MAX_CONNECTIONS']
+    )
+    app.extensions['user_profiles'] = UserProfileCache(
+        ttl=app.config['USER_PROFILE_CACHE_TTL'],
+        max_size=app.config['USER_PROFILE_CACHE_SIZE']
+    )
+
+def init_firebase_worker(app):
+    """Re-create Firebase clients in a worker forked from a preloaded app.
+
+    Parsed credentials and signing keys are inherited; HTTP sessions,
+    background threads and event-loop-bound clients are not.
+    """
+    parent = app.extensions['firebase_app']
+    firebase_admin.delete_app(parent)
+    app.extensions['firebase_app'] = firebase_admin.initialize_app(parent.credential)
+    app.extensions['token_verifier'].keys.after_fork()
+    app.extensions['identity'].after_fork()
 
 def login_required(f):
     @wraps(f)
@@ -45,44 +85,55 @@ def login_required(f):
     return decorated_function
 
 @bp.route('/login')
+@cached_response
 def login():
     return render_template('login.html')
 
 @bp.route('/auth/callback')
+@admission_controlled
 def auth_callback():
     # Handle Firebase authentication callback
     id_token = request.args.get('id_token')
     if not id_token:
-        print("No ID token received")
+        logger.info("No ID token received")
+        AUTH_FAILURES.labels('missing_token').inc()
         return redirect(url_for('main.index'))
 
     try:
         # Verify the ID token
-        decoded_token = firebase_auth.verify_id_token(id_token)
+        started = time.perf_counter()
+        decoded_token = current_app.extensions['token_verifier'].verify(id_token)
+        TOKEN_VERIFY_LATENCY.observe(time.perf_counter() - started)
         user_id = decoded_token['uid']
 
-        # Get additional user info from Firebase
-        user = firebase_auth.get_user(user_id)
-        # Debug the user info more thoroughly
-        print("User info from Firebase:")
-        print(f"- Display Name: {user.display_name}")
-        print(f"- Email: {user.email}")
-        print(f"- Photo URL: {user.photo_url}")
+        # Build the profile from token claims, falling back to cached Firebase records
+        started = time.perf_counter()
+        user = current_app.extensions['user_profiles'].get(user_id, decoded_token)
+        USER_LOOKUP_LATENCY.observe(time.perf_counter() - started)
 
+        # A fresh session id on login defeats session fixation
+        if isinstance(session, ServerSideSession):
+            session.regenerate()
         # Store user info in session
         session['user_id'] = user_id
-        session['user_name'] = user.display_name or 'User'
-        session['user_email'] = user.email or ''
+        session['user_name'] = user['display_name'] or 'User'
+        session['user_email'] = user['email'] or ''
         # Set photo URL with fallback
-        photo_url = user.photo_url if user.photo_url else url_for('static', filename='img/default-avatar.png')
+        photo_url = user['photo_url'] or url_for('static', filename='img/default-avatar.png')
         session['user_photo'] = photo_url
-        print(f"Final photo URL stored in session: {session['user_photo']}")
         session['last_login'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-        print(f"Successfully authenticated user: {user_id}")
+        logger.info("Authenticated user", extra={
+            'uid': user_id, 'has_photo': bool(user['photo_url'])
+        })
         return redirect(url_for('main.dashboard'))
+    except TokenVerificationError as e:
+        AUTH_FAILURES.labels('invalid_token').inc()
+        logger.warning("Rejected ID token", extra={'error': str(e)})
+        return redirect(url_for('main.index'))
     except Exception as e:
-        print(f"Auth error (detailed): {str(e)}")
+        AUTH_FAILURES.labels('error').inc()
+        logger.exception("Auth error", extra={'error': str(e)})
         return redirect(url_for('main.index'))
 
 @bp.route('/logout')
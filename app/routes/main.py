@@ -1,14 +1,190 @@
-from flask import Blueprint, render_template, session
+import logging
+from datetime import datetime, timezone
+
+from flask import (
+    Blueprint, Response, abort, current_app, jsonify, render_template, request, send_file, session
+)
+from app.audio.mixer import params_from_site_info
+from app.audio.render_cache import render_key
+from app.audio.sound_store import get_sound_store
+from app.audio.sources import affirmation_file, find_background, find_meditation_type, sounds_dir
+from app.audio.stream import SessionStream
+from app.meditation_log import BatchTooLarge, event_from_json, read_event_batch
+from app.response_cache import cached_response
 from app.routes.auth import login_required
 
 bp = Blueprint('main', __name__)
+logger = logging.getLogger(__name__)
 
 @bp.route('/')
+@cached_response
 def index():
     return render_template('index.html')
 
 @bp.route('/dashboard')
 @login_required
 def dashboard():
-    print(f"Accessing dashboard. User ID in session: {session.get('user_id')}")
-    return render_template('dashboard.html')
+    logger.debug("Accessing dashboard", extra={'uid': session.get('user_id')})
+    meditation_log = current_app.extensions['meditation_log']
+    user_id = session['user_id']
+    recent = meditation_log.recent(user_id)
+    for entry in recent:
+        entry['started'] = datetime.fromtimestamp(
+            entry['started_at'], timezone.utc
+        ).strftime('%Y-%m-%d %H:%M UTC')
+    return render_template(
+        'dashboard.html', stats=meditation_log.stats(user_id), recent_sessions=recent
+    )
+
+@bp.route('/sessions', methods=['POST'])
+@login_required
+def record_session():
+    """Record one completed meditation session sent as JSON."""
+    data = request.get_json(silent=True)
+    try:
+        event = event_from_json(data)
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    site_info = current_app.extensions['site_info'].get()
+    if find_meditation_type(site_info, event.meditation_type) is None:
+        return jsonify(error=f"Unknown meditation type: {event.meditation_type}"), 400
+    recorded = current_app.extensions['meditation_log'].record(session['user_id'], [event])
+    return jsonify(id=event.event_id, recorded=bool(recorded)), 201 if recorded else 200
+
+@bp.route('/sessions/batch', methods=['POST'])
+@login_required
+def record_session_batch():
+    """Record many completed sessions sent as newline-delimited JSON.
+
+    Events carry client-generated ids, so re-sending a batch after a failed
+    upload records nothing twice. Valid events are written in one
+    transaction; invalid lines are reported back by line number.
+    """
+    # A form or text/plain POST can be sent cross-site without a preflight
+    if request.mimetype != 'application/x-ndjson':
+        return jsonify(error="Content-Type must be application/x-ndjson"), 415
+    max_bytes = current_app.config['SESSION_BATCH_MAX_BYTES']
+    if request.content_length is not None and request.content_length > max_bytes:
+        return jsonify(error=f"Batch exceeds {max_bytes} bytes"), 413
+    try:
+        events, rejected = read_event_batch(
+            request.stream, current_app.config['SESSION_BATCH_MAX_EVENTS'], max_bytes
+        )
+    except BatchTooLarge as e:
+        return jsonify(error=str(e)), 413
+
+    received = len(events) + len(rejected)
+    site_info = current_app.extensions['site_info'].get()
+    known_types = {entry.get('name') for entry in site_info.get('meditation_types') or ()}
+    accepted = []
+    for event in events:
+        if event.meditation_type in known_types:
+            accepted.append(event)
+        else:
+            rejected.append({
+                'id': event.event_id,
+                'error': f"Unknown meditation type: {event.meditation_type}",
+            })
+
+    recorded = current_app.extensions['meditation_log'].record(session['user_id'], accepted)
+    return jsonify(
+        received=received,
+        recorded=recorded,
+        duplicates=len(accepted) - recorded,
+        rejected=rejected
+    )
+
+@bp.route('/theme/<name>.css')
+def theme_css(name):
+    """Serve one compiled theme palette with a strong ETag."""
+    theme = current_app.extensions['theme'].get()
+    if name not in theme.css:
+        abort(404)
+    response = Response(theme.css[name], mimetype='text/css')
+    response.set_etag(theme.etags[name])
+    response.cache_control.public = True
+    response.cache_control.max_age = 86400
+    return response.make_conditional(request)
+
+def _volume_arg(name):
+    value = request.args.get(name, type=float)
+    if value is None:
+        return {}
+    return {name: min(max(value, 0.0), 1.0)}
+
+def _cached_wav_response(path, key):
+    """Send a cached render; Werkzeug answers ranges and can use sendfile."""
+    # Hits bump the mtime, but the key is content-addressed and makes a
+    # stable ETag for If-Range
+    response = send_file(path, mimetype='audio/wav', conditional=True, etag=key)
+    response.headers['Accept-Ranges'] = 'bytes'
+    response.headers['Cache-Control'] = 'private, no-transform'
+    return response
+
+def _wav_response(stream):
+    """Answer with the whole live render or the single byte range requested."""
+    start, stop, status = 0, stream.length, 200
+    # Multi-range requests are answered with the whole file
+    if request.range is not None and len(request.range.ranges) == 1:
+        byte_range = request.range.range_for_length(stream.length)
+        if byte_range is None:
+            return Response(status=416, headers={'Content-Range': f'bytes */{stream.length}'})
+        (start, stop), status = byte_range, 206
+
+    response = Response(
+        stream.iter_range(start, stop), status=status, mimetype='audio/wav',
+        direct_passthrough=True
+    )
+    response.headers['Accept-Ranges'] = 'bytes'
+    response.headers['Content-Length'] = str(stop - start)
+    if status == 206:
+        response.headers['Content-Range'] = f'bytes {start}-{stop - 1}/{stream.length}'
+    response.headers['Cache-Control'] = 'private, no-transform'
+    return response
+
+@bp.route('/session/audio')
+@login_required
+def session_audio():
+    """Stream a rendered session as WAV, honouring single byte ranges."""
+    site_info = current_app.extensions['site_info'].get()
+    background = find_background(site_info, request.args.get('background', ''))
+    if background is None:
+        abort(404)
+    meditation_type = request.args.get('type')
+    try:
+        params = params_from_site_info(
+            site_info, meditation_type, request.args.get('duration', type=int),
+            **_volume_arg('background_volume'), **_volume_arg('subliminal_volume')
+        )
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+
+    sounds = get_sound_store(sounds_dir(site_info))
+    try:
+        background_digest = sounds.digest(background['file'])
+    except FileNotFoundError:
+        abort(404)
+    subliminal_name = affirmation_file(site_info, meditation_type)
+    subliminal_digest = None
+    if subliminal_name:
+        try:
+            subliminal_digest = sounds.digest(subliminal_name)
+        except FileNotFoundError:
+            logger.warning("Affirmation layer not found", extra={'sound': subliminal_name})
+            subliminal_name = None
+
+    # Serve identical renders from the shared cache; on a miss stream a live
+    # render and fill the cache in the background for the next listener
+    render_cache = current_app.extensions['render_cache']
+    key = render_key(params, [background_digest, subliminal_digest])
+    cached_path = render_cache.lookup(key)
+    if cached_path is not None:
+        try:
+            return _cached_wav_response(cached_path, key)
+        except FileNotFoundError:
+            # Evicted since the lookup; render it live instead
+            pass
+    background_samples = sounds.get(background['file'])
+    subliminal_samples = sounds.get(subliminal_name) if subliminal_name else None
+    render_cache.fill_async(key, background_samples, subliminal_samples, params)
+    return _wav_response(SessionStream(background_samples, subliminal_samples, params))
@@ -0,0 +1,240 @@
+"""Server-side session storage behind a small opaque session cookie.
+
+The cookie only carries a random session id; the session data lives in a
+SessionStore. MemorySessionStore suits a single process, SQLiteSessionStore
+(WAL mode) lets several gunicorn workers on one host share sessions. Data is
+serialized with Flask's tagged JSON, as in signed cookies, so every backend
+round-trips the same value types.
+"""
+import os
+import re
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SecureCookieSession, SecureCookieSessionInterface, SessionInterface
+
+_SID_RE = re.compile(r'^[A-Za-z0-9_-]{43}$')
+
+
+class ServerSideSession(SecureCookieSession):
+    """Session dict that remembers the id it is stored under."""
+
+    def __init__(self, initial=None, sid=None):
+        super().__init__(initial)
+        self.sid = sid
+        self.replaced_sid = None
+
+    def regenerate(self):
+        """Store the session under a new id when it is saved, dropping the old one.
+
+        Call when the authenticated user changes, so a session id planted
+        before login cannot be used afterwards.
+        """
+        if self.sid is not None:
+            self.replaced_sid = self.sid
+            self.sid = None
+        self.modified = True
+
+
+class MemorySessionStore:
+    """In-process LRU session store with per-entry expiry."""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def after_fork(self):
+        self._lock = threading.Lock()
+
+    def get(self, sid):
+        """Return (serialized data, signed_cookie_size) for sid, or None."""
+        with self._lock:
+            entry = self._entries.get(sid)
+            if entry is None:
+                return None
+            expires_at, payload, cookie_size = entry
+            if expires_at <= time.time():
+                del self._entries[sid]
+                return None
+            self._entries.move_to_end(sid)
+            return payload, cookie_size
+
+    def set(self, sid, payload, cookie_size, ttl):
+        with self._lock:
+            self._entries[sid] = (time.time() + ttl, payload, cookie_size)
+            self._entries.move_to_end(sid)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, sid):
+        with self._lock:
+            self._entries.pop(sid, None)
+
+
+class SQLiteSessionStore:
+    """Session store in a SQLite database running in WAL mode.
+
+    Each thread keeps its own connection. Expired rows are ignored on read
+    and purged every purge_interval writes.
+    """
+
+    def __init__(self, path, purge_interval=500):
+        self.path = path
+        self.purge_interval = purge_interval
+        self._local = threading.local()
+        self._writes = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS sessions ('
+            ' sid TEXT PRIMARY KEY,'
+            ' data TEXT NOT NULL,'
+            ' cookie_size INTEGER NOT NULL,'
+            ' expires_at REAL NOT NULL'
+            ') WITHOUT ROWID'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS sessions_expires ON sessions (expires_at)')
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def after_fork(self):
+        """Forget connections opened before a fork; SQLite handles must not cross it."""
+        self._local = threading.local()
+
+    def get(self, sid):
+        """Return (serialized data, signed_cookie_size) for sid, or None."""
+        row = self._connection().execute(
+            'SELECT data, cookie_size FROM sessions WHERE sid = ? AND expires_at > ?',
+            (sid, time.time())
+        ).fetchone()
+        return None if row is None else (row[0], row[1])
+
+    def set(self, sid, payload, cookie_size, ttl):
+        conn = self._connection()
+        now = time.time()
+        conn.execute(
+            'INSERT OR REPLACE INTO sessions (sid, data, cookie_size, expires_at) VALUES (?, ?, ?, ?)',
+            (sid, payload, cookie_size, now + ttl)
+        )
+        self._writes += 1
+        if self._writes % self.purge_interval == 0:
+            conn.execute('DELETE FROM sessions WHERE expires_at <= ?', (now,))
+
+    def delete(self, sid):
+        self._connection().execute('DELETE FROM sessions WHERE sid = ?', (sid,))
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Flask session interface that keeps session data in a SessionStore.
+
+    Sessions expire after the app's permanent_session_lifetime. On every
+    write the interface records how large the equivalent signed cookie would
+    have been, so stats() can report the bytes saved per request.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.serializer = TaggedJSONSerializer()
+        self._cookie_serializer = SecureCookieSessionInterface()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.bytes_saved = 0
+
+    def _count_request(self, saved):
+        with self._lock:
+            self.requests += 1
+            self.bytes_saved += saved
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid and _SID_RE.match(sid):
+            entry = self.store.get(sid)
+            if entry is not None:
+                payload, cookie_size = entry
+                self._count_request(cookie_size - len(sid))
+                return ServerSideSession(self.serializer.loads(payload), sid=sid)
+        self._count_request(0)
+        return ServerSideSession()
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        secure = self.get_cookie_secure(app)
+        samesite = self.get_cookie_samesite(app)
+        httponly = self.get_cookie_httponly(app)
+
+        if session.accessed:
+            response.vary.add('Cookie')
+
+        if session.replaced_sid is not None:
+            self.store.delete(session.replaced_sid)
+
+        if not session:
+            if session.modified:
+                if session.sid:
+                    self.store.delete(session.sid)
+                response.delete_cookie(
+                    name, domain=domain, path=path, secure=secure,
+                    samesite=samesite, httponly=httponly
+                )
+                response.vary.add('Cookie')
+            return
+
+        if not session.modified:
+            return
+
+        if session.sid is None:
+            session.sid = secrets.token_urlsafe(32)
+        data = dict(session)
+        signer = self._cookie_serializer.get_signing_serializer(app)
+        cookie_size = len(signer.dumps(data)) if signer else 0
+        ttl = app.permanent_session_lifetime.total_seconds()
+        self.store.set(session.sid, self.serializer.dumps(data), cookie_size, ttl)
+        response.set_cookie(
+            name, session.sid, expires=self.get_expiration_time(app, session),
+            httponly=httponly, domain=domain, path=path, secure=secure, samesite=samesite
+        )
+        response.vary.add('Cookie')
+
+    def stats(self):
+        """Return request count and cookie bytes saved versus signed cookies."""
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'bytes_saved': self.bytes_saved,
+                'bytes_saved_per_request': (
+                    self.bytes_saved / self.requests if self.requests else 0.0
+                ),
+            }
+
+
+def init_sessions(app):
+    """Install the session interface selected by SESSION_BACKEND."""
+    backend = app.config['SESSION_BACKEND']
+    if backend == 'cookie':
+        return
+    if backend == 'memory':
+        store = MemorySessionStore(app.config['SESSION_MEMORY_MAX_ENTRIES'])
+    elif backend == 'sqlite':
+        path = app.config['SESSION_SQLITE_PATH'] or os.path.join(
+            app.instance_path, 'sessions.sqlite3'
+        )
+        store = SQLiteSessionStore(path)
+    else:
+        raise ValueError(f"Unknown SESSION_BACKEND: {backend}")
+    app.session_interface = ServerSideSessionInterface(store)
@@ -0,0 +1,180 @@
+"""Compiled, hot-reloadable site_info configuration.
+
+site_info.yaml is parsed with the libyaml loader when available and the
+parsed data is cached in a marshal sidecar keyed on the file's mtime, size
+and content hash, so most workers never run the YAML parser at all. The
+result is frozen into read-only mappings and handed to every template as
+the same object until the file changes on disk.
+"""
+import hashlib
+import logging
+import marshal
+import os
+import threading
+import time
+from types import MappingProxyType
+
+import yaml
+
+from app.version import LazyVersionInfo
+
+try:
+    YamlLoader = yaml.CSafeLoader
+except AttributeError:
+    YamlLoader = yaml.SafeLoader
+
+logger = logging.getLogger(__name__)
+
+SITE_INFO_PATH = os.path.join('config', 'site_info.yaml')
+SIDECAR_SUFFIX = '.cache'
+SIDECAR_FORMAT = 1
+REQUIRED_SECTIONS = ('site', 'company')
+
+
+def freeze(value):
+    """Recursively turn dicts into read-only mappings and lists into tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def validate(data):
+    """Check the sections the app relies on are present."""
+    if not isinstance(data, dict):
+        raise ValueError("site_info must be a mapping")
+    for section in REQUIRED_SECTIONS:
+        if not isinstance(data.get(section), dict) or 'name' not in data[section]:
+            raise ValueError(f"site_info is missing '{section}.name'")
+    return data
+
+
+def _file_key(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _write_sidecar(sidecar_path, payload):
+    """Write the sidecar atomically so concurrent workers never see half a file."""
+    tmp_path = f"{sidecar_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            marshal.dump(payload, f)
+        os.replace(tmp_path, sidecar_path)
+    except (OSError, ValueError) as e:
+        logger.warning("Could not write site_info cache", extra={'error': str(e)})
+
+
+def load_compiled(path):
+    """Return validated site_info data, using the marshal sidecar when fresh."""
+    sidecar_path = path + SIDECAR_SUFFIX
+    mtime_ns, size = _file_key(path)
+    cached = None
+    try:
+        with open(sidecar_path, 'rb') as f:
+            cached = marshal.load(f)
+        if cached.get('format') != SIDECAR_FORMAT:
+            cached = None
+    except (OSError, EOFError, ValueError, TypeError, AttributeError):
+        cached = None
+
+    if cached and cached['mtime_ns'] == mtime_ns and cached['size'] == size:
+        return cached['data']
+
+    with open(path, 'rb') as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    if cached and cached['sha256'] == digest:
+        data = cached['data']
+    else:
+        data = validate(yaml.load(raw, Loader=YamlLoader))
+    _write_sidecar(sidecar_path, {
+        'format': SIDECAR_FORMAT,
+        'mtime_ns': mtime_ns,
+        'size': size,
+        'sha256': digest,
+        'data': data,
+    })
+    return data
+
+
+def _fallback_data():
+    return {
+        'site': {'name': 'Subliminal Meditation App'},
+        'company': {'name': 'Exponentials Studio Limited'}
+    }
+
+
+class SiteInfoSource:
+    """Holds the frozen site_info and reloads it when the file changes.
+
+    get() stats the file at most once per check_interval seconds, so edits
+    are picked up without a restart while requests share one object.
+    """
+
+    def __init__(self, path=SITE_INFO_PATH, check_interval=1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._file_key = None
+        self._next_check = 0.0
+        self._value = None
+        self.version = 0
+        self.reload()
+
+    def _build(self, data):
+        data = dict(data)
+        company = dict(data.get('company') or {})
+        # Always use current year
+        company['year'] = time.gmtime().tm_year
+        data['company'] = company
+        frozen = dict(freeze(data))
+        # Version info is read on first access, not at startup
+        frozen['version'] = LazyVersionInfo()
+        return MappingProxyType(frozen)
+
+    def reload(self):
+        """Load the file now, keeping the previous value if it is invalid."""
+        try:
+            # Remember the key even if loading fails so a broken file is not re-read
+            # on every check; the next edit changes the key again
+            self._file_key = _file_key(self.path)
+            data = load_compiled(self.path)
+        except Exception as e:
+            logger.error("Error loading site info", extra={'path': self.path, 'error': str(e)})
+            if self._value is None:
+                self._value = self._build(_fallback_data())
+            return self._value
+        self._value = self._build(data)
+        self.version += 1
+        return self._value
+
+    def get(self):
+        """Return the current site_info, reloading it if the file changed."""
+        now = time.monotonic()
+        if now < self._next_check:
+            return self._value
+        with self._lock:
+            if now >= self._next_check:
+                self._next_check = now + self.check_interval
+                try:
+                    changed = _file_key(self.path) != self._file_key
+                except OSError:
+                    changed = False
+                if changed:
+                    self.reload()
+        return self._value
+
+
+_default_source = None
+_default_source_lock = threading.Lock()
+
+
+def get_site_info_source():
+    """Return the process-wide SiteInfoSource for config/site_info.yaml."""
+    global _default_source
+    with _default_source_lock:
+        if _default_source is None:
+            _default_source = SiteInfoSource()
+        return _default_source
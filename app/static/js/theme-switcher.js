@@ -1,7 +1,9 @@
 // Theme Switcher
 class ThemeSwitcher {
     constructor() {
-        this.theme = localStorage.getItem('theme') || 'light';
+        // Theme defaults and auto-switch times come from site_info via data attributes on <html>
+        this.config = document.documentElement.dataset;
+        this.theme = localStorage.getItem('theme') || this.readCookie('theme') || this.config.themeDefault || 'light';
         this.systemPrefersDark = window.matchMedia('(prefers-color-scheme: dark)');
         this.initialize();
     }
@@ -21,14 +23,24 @@ class ThemeSwitcher {
         this.setupAutoSwitch();
     }
 
+    readCookie(name) {
+        const match = document.cookie.match(new RegExp('(?:^|; )' + name + '=([^;]*)'));
+        return match ? decodeURIComponent(match[1]) : null;
+    }
+
+    parseHour(value, fallback) {
+        const hour = parseInt((value || '').split(':')[0], 10);
+        return Number.isNaN(hour) ? fallback : hour;
+    }
+
     setupAutoSwitch() {
         const now = new Date();
         const hours = now.getHours();
         
         // Auto switch based on time if enabled
-        if (this.theme === 'system') {
-            const startDark = 18; // 6 PM
-            const endDark = 6;    // 6 AM
+        if (this.theme === 'system' && this.config.autoSwitch !== 'off') {
+            const startDark = this.parseHour(this.config.darkStart, 18);
+            const endDark = this.parseHour(this.config.darkEnd, 6);
             
             if ((hours >= startDark) || (hours < endDark)) {
                 this.applyTheme('dark');
@@ -42,15 +54,22 @@ class ThemeSwitcher {
         const newTheme = document.documentElement.classList.contains('dark-mode') ? 'light' : 'dark';
         this.theme = newTheme;
         localStorage.setItem('theme', newTheme);
+        // Let the server render the chosen theme on the next first paint
+        document.cookie = `theme=${newTheme}; path=/; max-age=31536000; SameSite=Lax`;
         this.applyTheme(newTheme);
         this.updateButtonIcon(newTheme);
     }
 
     applyTheme(theme) {
+        const root = document.documentElement.classList;
         if (theme === 'dark') {
-            document.documentElement.classList.add('dark-mode');
+            root.add('dark-mode');
+            root.remove('light-mode');
+        } else if (theme === 'light') {
+            root.add('light-mode');
+            root.remove('dark-mode');
         } else {
-            document.documentElement.classList.remove('dark-mode');
+            root.remove('dark-mode', 'light-mode');
         }
         this.updateButtonIcon(theme);
     }
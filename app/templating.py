@@ -0,0 +1,139 @@
+"""Template compilation and rendering caches.
+
+- A filesystem bytecode cache so new workers load compiled templates
+  instead of recompiling them.
+- A `{% cache key, ... %}...{% endcache %}` tag for fragments that only
+  depend on deploy-time config and simple request state such as whether
+  the user is logged in. Keys are scoped to the current config version.
+- Per-endpoint render-time counters.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from flask import before_render_template, g, request, template_rendered
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+
+from app.metrics import TEMPLATE_RENDER_LATENCY
+
+
+class FragmentCache:
+    """Bounded LRU of rendered template fragments."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class FragmentCacheExtension(Extension):
+    """Jinja extension adding the `cache` tag."""
+
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(
+            fragment_cache=FragmentCache(),
+            fragment_cache_version=lambda: None
+        )
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            args.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        call = self.call_method('_render_cached', [nodes.List(args)])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render_cached(self, key_parts, caller):
+        key = (self.environment.fragment_cache_version(), *key_parts)
+        cache = self.environment.fragment_cache
+        value = cache.get(key)
+        if value is None:
+            value = caller()
+            cache.set(key, value)
+        return value
+
+
+class RenderStats:
+    """Template render counts and cumulative render time per endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, endpoint, seconds):
+        TEMPLATE_RENDER_LATENCY.labels(endpoint or 'unmatched').observe(seconds)
+        with self._lock:
+            count, total = self._endpoints.get(endpoint, (0, 0.0))
+            self._endpoints[endpoint] = (count + 1, total + seconds)
+
+    def stats(self):
+        """Return {endpoint: {'renders', 'total_ms', 'mean_ms'}}."""
+        with self._lock:
+            return {
+                endpoint: {
+                    'renders': count,
+                    'total_ms': total * 1000,
+                    'mean_ms': total * 1000 / count,
+                }
+                for endpoint, (count, total) in self._endpoints.items()
+            }
+
+
+def init_templating(app, config_version):
+    """Install the bytecode cache, fragment cache tag and render counters.
+
+    config_version is called on every fragment lookup and should change
+    whenever deploy-time config that fragments depend on changes.
+    """
+    cache_dir = app.config['JINJA_BYTECODE_CACHE_DIR'] or os.path.join(
+        app.instance_path, 'jinja-cache'
+    )
+    os.makedirs(cache_dir, exist_ok=True)
+    app.jinja_options = {**app.jinja_options, 'bytecode_cache': FileSystemBytecodeCache(cache_dir)}
+    app.jinja_options['extensions'] = [
+        *app.jinja_options.get('extensions', ()), FragmentCacheExtension
+    ]
+    app.jinja_env.fragment_cache_version = config_version
+
+    render_stats = RenderStats()
+    app.extensions['render_stats'] = render_stats
+
+    def start_timer(_sender, **_extra):
+        g.setdefault('_render_started', time.perf_counter())
+
+    def stop_timer(_sender, **_extra):
+        started = g.pop('_render_started', None)
+        if started is not None:
+            render_stats.record(request.endpoint, time.perf_counter() - started)
+
+    before_render_template.connect(start_timer, app, weak=False)
+    template_rendered.connect(stop_timer, app, weak=False)
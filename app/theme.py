@@ -0,0 +1,98 @@
+"""Compile branding.themes from site_info into CSS custom properties.
+
+The palettes in site_info.yaml are the single source of truth: each theme
+becomes one minified block of custom properties, and a critical-CSS
+snippet with every palette is inlined into base.html so the first paint
+uses the right colours without JavaScript or an extra request. The
+compiled output is cached per site_info version.
+"""
+import hashlib
+import threading
+
+from markupsafe import Markup
+
+THEME_COOKIE = 'theme'
+DEFAULT_THEME = 'light'
+
+
+def _flatten(palette, prefix=''):
+    """Yield (css variable name, value) pairs from a nested palette."""
+    for key, value in palette.items():
+        name = f"{prefix}{key.replace('_', '-')}"
+        if hasattr(value, 'items'):
+            yield from _flatten(value, f'{name}-')
+        else:
+            yield f'--{name}', value
+
+
+def theme_selector(name):
+    """Return the selector a theme's custom properties are scoped to."""
+    return ':root' if name == DEFAULT_THEME else f':root.{name}-mode'
+
+
+def declarations(palette):
+    return ';'.join(f'{name}:{value}' for name, value in _flatten(palette))
+
+
+class CompiledTheme:
+    """Minified CSS for every configured theme plus the inline snippet."""
+
+    def __init__(self, site_info):
+        branding = site_info.get('branding') or {}
+        settings = site_info.get('theme') or {}
+        themes = branding.get('themes') or {}
+        self.default_mode = settings.get('default_mode', DEFAULT_THEME)
+        self.auto_switch = settings.get('auto_switch') or {}
+        self.names = tuple(themes)
+        self.css = {
+            name: f'{theme_selector(name)}{{{declarations(palette)}}}'
+            for name, palette in themes.items()
+        }
+        self.etags = {
+            name: hashlib.sha256(css.encode('utf-8')).hexdigest()[:20]
+            for name, css in self.css.items()
+        }
+
+        transition = settings.get('transition_duration')
+        parts = [f':root{{--transition-duration:{transition}}}'] if transition else []
+        parts.extend(self.css.values())
+        if self.default_mode == 'system' and 'dark' in themes:
+            # Follow the OS preference until the user picks a theme explicitly
+            parts.append(
+                '@media (prefers-color-scheme:dark){:root:not(.light-mode)'
+                f"{{{declarations(themes['dark'])}}}}}"
+            )
+        self.critical_css = Markup(''.join(parts))
+
+    def html_class(self, cookie_value):
+        """Return the <html> class for a request's theme cookie.
+
+        An explicit choice always gets its class, so choosing light also
+        overrides a dark OS preference. Without one, only a non-default
+        default_mode needs a class.
+        """
+        if cookie_value in self.names:
+            return f'{cookie_value}-mode'
+        if self.default_mode in self.names and self.default_mode != DEFAULT_THEME:
+            return f'{self.default_mode}-mode'
+        return ''
+
+
+class ThemeCompiler:
+    """Recompile the theme only when the site_info version changes."""
+
+    def __init__(self, site_info_source):
+        self.site_info_source = site_info_source
+        self._lock = threading.Lock()
+        self._version = None
+        self._compiled = None
+
+    def get(self):
+        site_info = self.site_info_source.get()
+        version = self.site_info_source.version
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._compiled = CompiledTheme(site_info)
+                    self._version = version
+        return self._compiled
@@ -0,0 +1,244 @@
+"""Local verification of Firebase ID tokens with cached Google signing keys."""
+import base64
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from google.auth import crypt
+
+GOOGLE_CERTS_URL = (
+    'https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com'
+)
+logger = logging.getLogger(__name__)
+
+ISSUER_PREFIX = 'https://securetoken.google.com/'
+DEFAULT_MAX_AGE = 3600
+_MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+
+class TokenVerificationError(ValueError):
+    """Raised when an ID token fails verification."""
+
+
+def _b64decode(segment):
+    """Decode a base64url segment that may be missing its padding."""
+    return base64.urlsafe_b64decode(segment + '=' * (-len(segment) % 4))
+
+
+def parse_max_age(cache_control):
+    """Return the max-age in seconds from a Cache-Control header, if any."""
+    match = _MAX_AGE_RE.search(cache_control or '')
+    return int(match.group(1)) if match else None
+
+
+class SigningKeyCache:  # pylint: disable=too-many-instance-attributes
+    """Process-wide cache of Google's token signing certificates.
+
+    Certificates are parsed once per fetch into ready-to-use verifiers. The
+    cache honours the Cache-Control max-age of the key endpoint and refreshes
+    in a background thread once the keys enter the refresh margin, so request
+    threads only block when there are no usable keys at all. A key id missing
+    from the cached set triggers one refetch, in case Google rotated keys
+    early; since the key id comes from the token, such refetches happen at
+    most once per unknown_kid_interval seconds.
+    """
+
+    def __init__(self, url=GOOGLE_CERTS_URL, refresh_margin=300, timeout=5.0,
+                 unknown_kid_interval=60):
+        self.url = url
+        self.refresh_margin = refresh_margin
+        self.timeout = timeout
+        self.unknown_kid_interval = unknown_kid_interval
+        self._next_unknown_fetch = 0.0
+        self._http = requests.Session()
+        self._verifiers = {}
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._refreshing = False
+        self.fetch_count = 0
+
+    def _fetch(self):
+        """Download and parse the current certificate set."""
+        response = self._http.get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        verifiers = {
+            kid: crypt.RSAVerifier.from_string(cert)
+            for kid, cert in response.json().items()
+        }
+        max_age = parse_max_age(response.headers.get('Cache-Control'))
+        if max_age is None:
+            max_age = DEFAULT_MAX_AGE
+        with self._lock:
+            self._verifiers = verifiers
+            self._expires_at = time.monotonic() + max_age
+            self.fetch_count += 1
+
+    def after_fork(self):
+        """Drop the parent's HTTP connections and thread state in a forked child."""
+        self._http = requests.Session()
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._refreshing = False
+        if not self.fresh:
+            self.prefetch()
+
+    def _background_refresh(self):
+        try:
+            self._fetch()
+        except Exception as e:
+            logger.warning("Signing key refresh failed", extra={'url': self.url, 'error': str(e)})
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def prefetch(self):
+        """Start a background refresh unless one is already running."""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._background_refresh, daemon=True).start()
+
+    @property
+    def fresh(self):
+        """True while the cached keys are usable without a blocking fetch."""
+        return time.monotonic() < self._expires_at
+
+    def fetch_if_expired(self):
+        """Fetch the keys synchronously, letting only one thread do the work."""
+        with self._fetch_lock:
+            if time.monotonic() >= self._expires_at:
+                self._fetch()
+
+    def _refetch_for_unknown(self, kid):
+        """Refetch the keys for a key id the cached set lacks, rate limited."""
+        with self._fetch_lock:
+            now = time.monotonic()
+            if kid in self._verifiers or now < self._next_unknown_fetch:
+                return
+            self._next_unknown_fetch = now + self.unknown_kid_interval
+            try:
+                self._fetch()
+            except Exception as e:
+                logger.warning("Signing key refetch failed", extra={'url': self.url, 'error': str(e)})
+
+    def get(self, kid):
+        """Return the verifier for a key id, refreshing the set when needed."""
+        now = time.monotonic()
+        if now >= self._expires_at:
+            self.fetch_if_expired()
+        elif now >= self._expires_at - self.refresh_margin:
+            self.prefetch()
+        verifier = self._verifiers.get(kid)
+        if verifier is None:
+            self._refetch_for_unknown(kid)
+            verifier = self._verifiers.get(kid)
+        if verifier is None:
+            raise TokenVerificationError(f"Unknown signing key: {kid}")
+        return verifier
+
+
+_key_caches = {}
+_key_caches_lock = threading.Lock()
+
+
+def get_key_cache(url=GOOGLE_CERTS_URL):
+    """Return the process-wide SigningKeyCache for a certificate URL."""
+    with _key_caches_lock:
+        if url not in _key_caches:
+            _key_caches[url] = SigningKeyCache(url)
+        return _key_caches[url]
+
+
+class TokenVerifier:  # pylint: disable=too-many-instance-attributes
+    """Verify Firebase ID tokens locally against a SigningKeyCache.
+
+    Successfully verified tokens are remembered by digest in a small LRU, so a
+    replayed callback with the same token skips signature checking entirely.
+    """
+
+    def __init__(self, project_id, keys=None, cache_size=256, clock_skew=5):
+        if not project_id:
+            raise ValueError("A Firebase project id is required to verify tokens")
+        self.project_id = project_id
+        self.issuer = ISSUER_PREFIX + project_id
+        self.keys = keys or get_key_cache()
+        self.cache_size = cache_size
+        self.clock_skew = clock_skew
+        self._verified = OrderedDict()
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+
+    def _remembered(self, digest, now):
+        with self._lock:
+            claims = self._verified.get(digest)
+            if claims is None:
+                return None
+            if claims['exp'] + self.clock_skew <= now:
+                del self._verified[digest]
+                return None
+            self._verified.move_to_end(digest)
+            self.cache_hits += 1
+            return claims
+
+    def _remember(self, digest, claims):
+        with self._lock:
+            self._verified[digest] = claims
+            self._verified.move_to_end(digest)
+            while len(self._verified) > self.cache_size:
+                self._verified.popitem(last=False)
+
+    def _check_claims(self, claims, now):
+        if claims.get('aud') != self.project_id:
+            raise TokenVerificationError("Token has an incorrect audience")
+        if claims.get('iss') != self.issuer:
+            raise TokenVerificationError("Token has an incorrect issuer")
+        subject = claims.get('sub')
+        if not isinstance(subject, str) or not subject or len(subject) > 128:
+            raise TokenVerificationError("Token has an invalid subject")
+        if claims.get('iat', 0) > now + self.clock_skew:
+            raise TokenVerificationError("Token used before issued")
+        if claims.get('exp', 0) + self.clock_skew <= now:
+            raise TokenVerificationError("Token has expired")
+
+    def verify(self, id_token):
+        """Verify an ID token and return its decoded claims.
+
+        Mirrors firebase_admin.auth.verify_id_token: the returned dict carries
+        the token subject under 'uid'.
+        """
+        if not isinstance(id_token, str) or id_token.count('.') != 2:
+            raise TokenVerificationError("Malformed ID token")
+        now = time.time()
+        digest = hashlib.sha256(id_token.encode('utf-8')).digest()
+        claims = self._remembered(digest, now)
+        if claims is not None:
+            return dict(claims)
+
+        header_b64, payload_b64, signature_b64 = id_token.split('.')
+        try:
+            header = json.loads(_b64decode(header_b64))
+            claims = json.loads(_b64decode(payload_b64))
+            signature = _b64decode(signature_b64)
+        except ValueError as e:
+            raise TokenVerificationError(f"Malformed ID token: {e}") from e
+        if not isinstance(header, dict) or not isinstance(claims, dict):
+            raise TokenVerificationError("Malformed ID token")
+        if header.get('alg') != 'RS256':
+            raise TokenVerificationError("Token has an unsupported algorithm")
+        self._check_claims(claims, now)
+
+        verifier = self.keys.get(header.get('kid'))
+        signed_section = f'{header_b64}.{payload_b64}'.encode('ascii')
+        if not verifier.verify(signed_section, signature):
+            raise TokenVerificationError("Token has an invalid signature")
+
+        claims['uid'] = claims['sub']
+        self._remember(digest, claims)
+        return dict(claims)
@@ -0,0 +1,129 @@
+"""User profile lookup that avoids a Firebase round trip on most logins."""
+import threading
+import time
+from collections import OrderedDict
+
+from firebase_admin import auth as firebase_auth
+
+
+def profile_from_claims(claims):
+    """Build a profile from ID-token claims, or None if they are incomplete."""
+    if not claims.get('name') or not claims.get('email'):
+        return None
+    return {
+        'display_name': claims['name'],
+        'email': claims['email'],
+        'photo_url': claims.get('picture'),
+    }
+
+
+def profile_from_record(user):
+    """Build a profile from a firebase_admin UserRecord."""
+    return {
+        'display_name': user.display_name,
+        'email': user.email,
+        'photo_url': user.photo_url,
+    }
+
+
+class UserProfileCache:  # pylint: disable=too-many-instance-attributes
+    """TTL- and size-bounded cache of user profiles keyed by uid.
+
+    Profiles come from token claims when they carry name and email, then from
+    the cache, and only on a miss from Firebase. The counters let callers see
+    how many outbound Firebase calls each login costs.
+    """
+
+    def __init__(self, ttl=300, max_size=1024, fetch_user=None):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._fetch_user = fetch_user
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.claims_hits = 0
+        self.cache_hits = 0
+        self.firebase_calls = 0
+
+    def _cached(self, uid):
+        with self._lock:
+            entry = self._entries.get(uid)
+            if entry is None:
+                return None
+            expires_at, profile = entry
+            if expires_at <= time.monotonic():
+                del self._entries[uid]
+                return None
+            self._entries.move_to_end(uid)
+            return profile
+
+    def _store(self, uid, profile):
+        with self._lock:
+            self._entries[uid] = (time.monotonic() + self.ttl, profile)
+            self._entries.move_to_end(uid)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _local(self, uid, claims):
+        """Return the profile from claims or the cache, or None on a miss."""
+        with self._lock:
+            self.lookups += 1
+        profile = profile_from_claims(claims) if claims else None
+        if profile is not None:
+            with self._lock:
+                self.claims_hits += 1
+            return profile
+
+        profile = self._cached(uid)
+        if profile is not None:
+            with self._lock:
+                self.cache_hits += 1
+        return profile
+
+    def get(self, uid, claims=None):
+        """Return the profile dict for uid, preferring token claims."""
+        profile = self._local(uid, claims)
+        if profile is not None:
+            return profile
+
+        with self._lock:
+            self.firebase_calls += 1
+        fetch_user = self._fetch_user or firebase_auth.get_user
+        profile = profile_from_record(fetch_user(uid))
+        self._store(uid, profile)
+        return profile
+
+    async def aget(self, uid, claims, fetch_profile):
+        """Async variant of get; fetch_profile(uid) is awaited on a miss."""
+        profile = self._local(uid, claims)
+        if profile is not None:
+            return profile
+
+        with self._lock:
+            self.firebase_calls += 1
+        profile = await fetch_profile(uid)
+        self._store(uid, profile)
+        return profile
+
+    def invalidate(self, uid):
+        """Drop the cached profile for uid, e.g. after a profile update."""
+        with self._lock:
+            self._entries.pop(uid, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return lookup counters and Firebase calls per lookup."""
+        with self._lock:
+            return {
+                'lookups': self.lookups,
+                'claims_hits': self.claims_hits,
+                'cache_hits': self.cache_hits,
+                'firebase_calls': self.firebase_calls,
+                'firebase_calls_per_lookup': (
+                    self.firebase_calls / self.lookups if self.lookups else 0.0
+                ),
+                'cached_profiles': len(self._entries),
+            }
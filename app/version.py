@@ -0,0 +1,159 @@
+"""Version information without forking git at startup.
+
+Lookup order:
+1. `.version.json`, written at build time by scripts/build_version_manifest.py
+2. `.version`, the legacy YAML file written by older build commands
+3. A pure-Python read of `.git/HEAD`, loose refs and packed-refs. It never
+   forks git: an untagged HEAD is reported as a dev build, and the commit
+   date is 'unknown' when the commit only exists in a pack.
+"""
+import json
+import logging
+import os
+import zlib
+from collections.abc import Mapping
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+import pytz
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_PATH = '.version.json'
+LEGACY_PATH = '.version'
+GIT_DIR = '.git'
+
+
+def _build_date():
+    return datetime.now(pytz.UTC).strftime('%d.%m.%y %H:%M UTC')
+
+
+def _read_ref(git_dir, ref):
+    """Resolve a ref name to a sha using loose refs, then packed-refs."""
+    loose = os.path.join(git_dir, *ref.split('/'))
+    if os.path.isfile(loose):
+        with open(loose, 'r', encoding='utf-8') as f:
+            return f.read().strip()
+    for name, sha, _ in _packed_refs(git_dir):
+        if name == ref:
+            return sha
+    return None
+
+
+def _packed_refs(git_dir):
+    """Yield (name, sha, peeled_sha) entries from packed-refs."""
+    path = os.path.join(git_dir, 'packed-refs')
+    if not os.path.isfile(path):
+        return []
+    entries = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('^'):
+                if entries:
+                    name, sha, _ = entries[-1]
+                    entries[-1] = (name, sha, line[1:])
+                continue
+            sha, name = line.split(' ', 1)
+            entries.append((name, sha, None))
+    return entries
+
+
+def _tag_at(git_dir, sha):
+    """Return the name of a tag pointing at sha, if there is one."""
+    for name, tag_sha, peeled in _packed_refs(git_dir):
+        if name.startswith('refs/tags/') and sha in (tag_sha, peeled):
+            return name[len('refs/tags/'):]
+    tags_dir = os.path.join(git_dir, 'refs', 'tags')
+    for root, _, files in os.walk(tags_dir):
+        for file_name in files:
+            path = os.path.join(root, file_name)
+            tag = os.path.relpath(path, tags_dir).replace(os.sep, '/')
+            target = _read_ref(git_dir, f'refs/tags/{tag}')
+            if target == sha or _read_object_field(git_dir, target, b'object') == sha:
+                return tag
+    return None
+
+
+def _read_object_field(git_dir, sha, field):
+    """Read a header field from a loose commit or tag object, if present."""
+    if not sha:
+        return None
+    path = os.path.join(git_dir, 'objects', sha[:2], sha[2:])
+    if not os.path.isfile(path):
+        return None
+    with open(path, 'rb') as f:
+        raw = zlib.decompress(f.read())
+    for line in raw.split(b'\0', 1)[1].split(b'\n'):
+        if not line:
+            break
+        if line.startswith(field + b' '):
+            return line[len(field) + 1:].decode('utf-8', 'replace')
+    return None
+
+
+def _commit_date(git_dir, sha):
+    """Format the committer date of a loose commit like `git show -s --format=%ci`."""
+    committer = _read_object_field(git_dir, sha, b'committer')
+    if not committer:
+        # Reading packed objects would need git or a pack parser
+        return 'unknown'
+    timestamp, offset = committer.rsplit(' ', 2)[-2:]
+    sign = -1 if offset.startswith('-') else 1
+    delta = timedelta(hours=int(offset[1:3]), minutes=int(offset[3:5])) * sign
+    date = datetime.fromtimestamp(int(timestamp), timezone(delta))
+    return f"{date.strftime('%Y-%m-%d %H:%M:%S')} {offset}"
+
+
+def read_git_version(git_dir=GIT_DIR):
+    """Build version info by reading the git directory directly."""
+    with open(os.path.join(git_dir, 'HEAD'), 'r', encoding='utf-8') as f:
+        head = f.read().strip()
+    sha = _read_ref(git_dir, head[5:]) if head.startswith('ref: ') else head
+    if not sha:
+        raise ValueError(f"Cannot resolve {head}")
+    tag = _tag_at(git_dir, sha)
+    short_sha = sha[:7]
+    return {
+        'number': f"{tag}-{short_sha}" if tag else f"dev-{short_sha}",
+        'sha': short_sha,
+        'build_date': _build_date(),
+        'commit_date': _commit_date(git_dir, sha)
+    }
+
+
+@lru_cache(maxsize=1)
+def get_version_info():
+    """Return version info, reading it once per process."""
+    try:
+        if os.path.exists(MANIFEST_PATH):
+            with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        if os.path.exists(LEGACY_PATH):
+            import yaml  # pylint: disable=import-outside-toplevel
+            with open(LEGACY_PATH, 'r', encoding='utf-8') as f:
+                return yaml.safe_load(f)
+        return read_git_version()
+    except Exception as e:
+        logger.warning("Error getting version info", extra={'error': str(e)})
+        return {
+            'number': 'unknown',
+            'sha': 'unknown',
+            'build_date': _build_date(),
+            'commit_date': 'unknown'
+        }
+
+
+class LazyVersionInfo(Mapping):
+    """Mapping that defers the version lookup until a field is first read."""
+
+    def __getitem__(self, key):
+        return get_version_info()[key]
+
+    def __iter__(self):
+        return iter(get_version_info())
+
+    def __len__(self):
+        return len(get_version_info())
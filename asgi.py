@@ -0,0 +1,10 @@
+"""ASGI entry point; logins are resolved on the event loop.
+
+    uvicorn asgi:app
+    gunicorn asgi:app -k uvicorn.workers.UvicornWorker
+"""
+from app import create_app
+from app.async_login import AsyncLoginApp
+
+flask_app = create_app()
+app = AsyncLoginApp(flask_app, wsgi_workers=flask_app.config['ASGI_WSGI_THREADS'])
@@ -22,3 +22,51 @@ class Config:
         "messagingSenderId": os.getenv('FIREBASE_MESSAGING_SENDER_ID'),
         "appId": os.getenv('FIREBASE_APP_ID'),
     }
+    # Google endpoint publishing the certificates that sign Firebase ID tokens
+    FIREBASE_CERTS_URL = os.getenv(
+        'FIREBASE_CERTS_URL',
+        'https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com'
+    )
+    # Reverse proxies in front of the app whose X-Forwarded-For entries are trusted
+    TRUSTED_PROXY_HOPS = int(os.getenv('TRUSTED_PROXY_HOPS', '0'))
+    # Token buckets shared by all workers that shed excess /auth/callback requests
+    AUTH_RATE_LIMIT = os.getenv('AUTH_RATE_LIMIT', 'true').lower() != 'false'
+    AUTH_RATE_LIMIT_PATH = os.getenv('AUTH_RATE_LIMIT_PATH')  # defaults to the instance folder
+    AUTH_GLOBAL_RATE = float(os.getenv('AUTH_GLOBAL_RATE', '50'))  # per second
+    AUTH_GLOBAL_BURST = float(os.getenv('AUTH_GLOBAL_BURST', '200'))
+    AUTH_IP_RATE_PER_MINUTE = float(os.getenv('AUTH_IP_RATE_PER_MINUTE', '30'))
+    AUTH_IP_BURST = float(os.getenv('AUTH_IP_BURST', '20'))
+    # Local Firebase Auth emulator (host:port) used instead of the Identity Toolkit API
+    FIREBASE_AUTH_EMULATOR_HOST = os.getenv('FIREBASE_AUTH_EMULATOR_HOST')
+    # Pooled async client for user lookups in the ASGI login path
+    IDENTITY_HTTP_TIMEOUT = float(os.getenv('IDENTITY_HTTP_TIMEOUT', '5'))
+    IDENTITY_HTTP_MAX_CONNECTIONS = int(os.getenv('IDENTITY_HTTP_MAX_CONNECTIONS', '32'))
+    # Threads running the Flask app behind the ASGI entry point (asgi.py)
+    ASGI_WSGI_THREADS = int(os.getenv('ASGI_WSGI_THREADS', '10'))
+    # Bounds for the per-process cache of Firebase user records
+    USER_PROFILE_CACHE_TTL = int(os.getenv('USER_PROFILE_CACHE_TTL', '300'))
+    USER_PROFILE_CACHE_SIZE = int(os.getenv('USER_PROFILE_CACHE_SIZE', '1024'))
+    # Keep the session cookie off cross-site POSTs such as /sessions/batch uploads
+    SESSION_COOKIE_SAMESITE = os.getenv('SESSION_COOKIE_SAMESITE', 'Lax')
+    # Session storage: 'sqlite' (shared by workers on one host), 'memory' or 'cookie'
+    SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'sqlite')
+    SESSION_SQLITE_PATH = os.getenv('SESSION_SQLITE_PATH')  # defaults to the instance folder
+    SESSION_MEMORY_MAX_ENTRIES = int(os.getenv('SESSION_MEMORY_MAX_ENTRIES', '10000'))
+    # Completed meditation sessions and per-user statistics
+    MEDITATION_LOG_PATH = os.getenv('MEDITATION_LOG_PATH')  # defaults to the instance folder
+    # Limits for offline clients uploading sessions to /sessions/batch
+    SESSION_BATCH_MAX_EVENTS = int(os.getenv('SESSION_BATCH_MAX_EVENTS', '500'))
+    SESSION_BATCH_MAX_BYTES = int(os.getenv('SESSION_BATCH_MAX_BYTES', str(256 * 1024)))
+    # Disk cache of rendered session audio shared by all workers on the host
+    RENDER_CACHE_DIR = os.getenv('RENDER_CACHE_DIR')  # defaults to the instance folder
+    RENDER_CACHE_MAX_BYTES = int(os.getenv('RENDER_CACHE_MAX_BYTES', str(2 * 1024 ** 3)))
+    # Background renders filling the cache at once, per worker
+    RENDER_CACHE_FILL_WORKERS = int(os.getenv('RENDER_CACHE_FILL_WORKERS', '2'))
+    # Compiled template bytecode shared across worker restarts
+    JINJA_BYTECODE_CACHE_DIR = os.getenv('JINJA_BYTECODE_CACHE_DIR')  # defaults to the instance folder
+    # Rendered anonymous pages kept by the response cache
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '128'))
+    # Level for the structured JSON logs written to stderr
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+    # When set, /metrics requires 'Authorization: Bearer <token>'
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
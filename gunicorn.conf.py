@@ -0,0 +1,76 @@
+"""Production gunicorn settings.
+
+The app is loaded once in the master (preload_app) and workers are forked
+from it, so parsed config, compiled templates and signing keys are shared
+copy-on-write instead of rebuilt per worker. post_fork re-creates the
+per-process state listed in app.init_worker.
+
+Usage:
+    gunicorn -c gunicorn.conf.py run:app
+    GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker gunicorn -c gunicorn.conf.py asgi:app
+"""
+import gc
+import os
+import shutil
+import tempfile
+
+
+def _cpu_count():
+    """Cores available to this process, honouring container CPU affinity."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+cores = _cpu_count()
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', str(cores * 2 + 1)))
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread' if threads > 1 else 'sync')
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() != 'false'
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+keepalive = 5
+# Recycle workers now and then so slow leaks cannot grow without bound
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = max_requests // 10
+
+# Per-worker metric files are aggregated by /metrics. The directory has to
+# exist before prometheus_client is imported and must not hold files from a
+# previous run.
+metrics_dir = os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'subliminal-meditation-metrics')
+)
+shutil.rmtree(metrics_dir, ignore_errors=True)
+os.makedirs(metrics_dir, exist_ok=True)
+
+
+def _flask_app(server):
+    application = server.app.wsgi()
+    # asgi:app wraps the Flask app
+    return getattr(application, 'flask_app', application)
+
+
+def when_ready(server):
+    if server.cfg.preload_app:
+        from app import warm_up  # pylint: disable=import-outside-toplevel
+        warm_up(_flask_app(server))
+
+
+def pre_fork(_server, _worker):
+    # Move everything allocated so far out of the GC's reach; otherwise the
+    # first collection in each worker touches, and so copies, every page
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, _worker):
+    if server.cfg.preload_app:
+        from app import init_worker  # pylint: disable=import-outside-toplevel
+        init_worker(_flask_app(server))
+
+
+def child_exit(_server, worker):
+    from prometheus_client import multiprocess  # pylint: disable=import-outside-toplevel
+    multiprocess.mark_process_dead(worker.pid)
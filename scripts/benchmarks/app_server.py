@@ -0,0 +1,84 @@
+"""Run the app under gunicorn on a free localhost port for benchmarks."""
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def worker_pids(master_pid):
+    """Return the pids of a gunicorn master's workers (Linux only)."""
+    with open(f'/proc/{master_pid}/task/{master_pid}/children', 'r', encoding='ascii') as f:
+        return [int(pid) for pid in f.read().split()]
+
+
+class AppServer:
+    """gunicorn started with gunicorn.conf.py; use as a context manager.
+
+    Extra environment variables are passed to the server on top of the
+    current environment, e.g. WEB_CONCURRENCY or GUNICORN_WORKER_CLASS.
+    """
+
+    def __init__(self, app='run:app', env=None, startup_timeout=60):
+        self.app = app
+        self.port = free_port()
+        self.env = dict(os.environ, **(env or {}), PORT=str(self.port))
+        self.startup_timeout = startup_timeout
+        self.process = None
+        self.boot_seconds = None
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.port}'
+
+    def start(self):
+        start = time.perf_counter()
+        # The server outlives this call; stop() terminates it
+        self.process = subprocess.Popen(  # pylint: disable=consider-using-with
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', self.app],
+            cwd=ROOT, env=self.env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        workers = int(self.env.get('WEB_CONCURRENCY', '1'))
+        deadline = start + self.startup_timeout
+        while True:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"gunicorn exited with status {self.process.returncode}")
+            if time.perf_counter() > deadline:
+                self.stop()
+                raise RuntimeError("gunicorn did not start in time")
+            try:
+                requests.get(f'{self.url}/', timeout=1)
+                if len(worker_pids(self.process.pid)) >= workers:
+                    break
+            except requests.RequestException:
+                pass
+            time.sleep(0.05)
+        self.boot_seconds = time.perf_counter() - start
+        return self
+
+    def stop(self):
+        if self.process is not None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+            self.process = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
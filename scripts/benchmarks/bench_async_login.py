@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Fire concurrent logins at the app with a slow local identity backend.
+
+Each login is for a user whose token lacks name and email, so every
+callback needs a user lookup. The sync path runs Flask on a fixed pool of
+threads, like sync gunicorn workers. The async path resolves the lookup
+on the event loop first.
+
+Usage:
+    python scripts/benchmarks/bench_async_login.py [logins] [lookup_delay_seconds] [threads]
+"""
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+import httpx  # noqa: E402  pylint: disable=wrong-import-position
+from a2wsgi import WSGIMiddleware  # noqa: E402  pylint: disable=wrong-import-position
+
+from fake_firebase import FakeKeyServer, configure_app_environment  # noqa: E402  pylint: disable=wrong-import-position
+
+
+async def login_storm(asgi_app, server, prefix, logins):
+    tokens = []
+    for i in range(logins):
+        uid = f'{prefix}-{i}'
+        server.add_user(uid, display_name=f'User {i}', email=f'{uid}@example.com')
+        tokens.append(server.mint_token(uid))
+
+    transport = httpx.ASGITransport(app=asgi_app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(
+            client.get('/auth/callback', params={'id_token': token}) for token in tokens
+        ))
+        elapsed = time.perf_counter() - start
+    ok = sum(1 for r in responses if r.headers.get('location', '').endswith('/dashboard'))
+    return elapsed, ok
+
+
+def main():
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.1
+    threads = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+    with FakeKeyServer(lookup_delay=delay) as server:
+        configure_app_environment(server)
+        os.environ['SESSION_BACKEND'] = 'memory'
+        os.environ['AUTH_RATE_LIMIT'] = 'false'
+        from app import create_app  # pylint: disable=import-outside-toplevel
+        from app.async_login import AsyncLoginApp  # pylint: disable=import-outside-toplevel
+        flask_app = create_app()
+
+        sync_app = WSGIMiddleware(flask_app, workers=threads)
+        sync_elapsed, sync_ok = asyncio.run(login_storm(sync_app, server, 'sync', logins))
+
+        async_app = AsyncLoginApp(flask_app, wsgi_workers=threads)
+        async_elapsed, async_ok = asyncio.run(login_storm(async_app, server, 'async', logins))
+
+    print(f"Concurrent logins:      {logins} ({delay * 1000:.0f} ms per user lookup, {threads} threads)")
+    print(f"Sync callback:          {sync_elapsed:.2f} s, {logins / sync_elapsed:.0f} logins/s, {sync_ok} ok")
+    print(f"Async callback:         {async_elapsed:.2f} s, {logins / async_elapsed:.0f} logins/s, {async_ok} ok")
+    print(f"Identity lookups:       {server.lookup_count}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Compare changelog generation before and after the streaming parser.
+
+Builds a synthetic repository with git fast-import, tags its first
+commit, and times collecting the commits since that tag with both the
+old approach (git log read whole, one startswith chain per commit) and
+iter_commits() plus categorize_commits(). Python heap peaks are measured
+with tracemalloc. It then prepends an entry to a large CHANGELOG.md.
+
+Usage:
+    python scripts/benchmarks/bench_changelog.py [commits]
+"""
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import generate_changelog  # noqa: E402  pylint: disable=wrong-import-position
+from git_access import GitRepository  # noqa: E402  pylint: disable=wrong-import-position
+
+TYPES = ('feat', 'fix', 'docs', 'style', 'refactor', 'perf', 'test', 'build', 'ci', 'chore', 'revert')
+SCOPES = (None, 'auth', 'audio', 'ui', 'api')
+OLD_PREFIXES = (
+    ('feat', 'Features'), ('fix', 'Bug Fixes'), ('docs', 'Documentation'), ('style', 'Style'),
+    ('refactor', 'Refactoring'), ('perf', 'Performance'), ('test', 'Tests'), ('build', 'Build'),
+    ('ci', 'CI'), ('chore', 'Chores'), ('revert', 'Reverts'),
+)
+CHANGELOG_ENTRIES = 200000
+
+
+def commit_message(rng, i):
+    if rng.random() < 0.1:
+        return f'Merge branch topic-{i}', ''
+    commit_type = rng.choice(TYPES)
+    scope = rng.choice(SCOPES)
+    breaking = '!' if rng.random() < 0.001 else ''
+    subject = f"{commit_type}{f'({scope})' if scope else ''}{breaking}: change number {i}"
+    body = f'Details for change {i}.\n\nRefs: #{i}\n' if rng.random() < 0.3 else ''
+    return subject, body
+
+
+def build_repository(path, count):
+    """Create count commits on an empty tree, tagging the first one."""
+    subprocess.run(['git', 'init', '-q', path], check=True)
+    rng = random.Random(11)
+    stream = []
+    for i in range(count):
+        subject, body = commit_message(rng, i)
+        data = f'{subject}\n\n{body}'.encode() if body else f'{subject}\n'.encode()
+        stream.append(b'commit refs/heads/main\n')
+        if i == 0:
+            stream.append(b'mark :1\n')
+        stream.append(f'committer Bench <bench@example.com> {1700000000 + i} +0000\n'.encode())
+        stream.append(b'data %d\n%s\n' % (len(data), data))
+    stream.append(b'reset refs/tags/0.1.0\nfrom :1\n\n')
+    subprocess.run(['git', 'fast-import', '--quiet'], input=b''.join(stream), cwd=path, check=True)
+    subprocess.run(['git', 'symbolic-ref', 'HEAD', 'refs/heads/main'], cwd=path, check=True)
+
+
+def before():
+    """The old pipeline: three describes, the whole log in memory, a startswith chain."""
+    for _ in range(3):
+        last_tag = subprocess.check_output(['git', 'describe', '--tags', '--abbrev=0'], text=True).strip()
+    commits = subprocess.check_output(
+        ['git', 'log', f'{last_tag}..HEAD', '--pretty=format:%s'], text=True
+    ).splitlines()
+    categories = {name: [] for _, name in OLD_PREFIXES}
+    for commit in commits:
+        for prefix, name in OLD_PREFIXES:
+            if commit.startswith(prefix):
+                categories[name].append(commit)
+                break
+    has_breaking = any('!' in commit or 'BREAKING CHANGE' in commit for commit in commits)
+    has_feature = any(commit.startswith('feat:') for commit in commits)
+    return categories, 'major' if has_breaking else 'minor' if has_feature else 'patch'
+
+
+def after():
+    with GitRepository() as repo:
+        last_tag = repo.latest_tag()
+    return generate_changelog.categorize_commits(generate_changelog.iter_commits(last_tag))
+
+
+def measure(fn):
+    """Return (result, seconds, peak heap bytes); tracing runs separately so it does not skew timing."""
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        build_repository(tmp, count)
+        print(f"Built {count} commits in {time.perf_counter() - start:.1f}s")
+        os.chdir(tmp)
+
+        print(f"{'':<10}{'seconds':>10}{'peak MiB':>10}{'entries':>10}")
+        for name, fn in (('before', before), ('after', after)):
+            (categories, bump), elapsed, peak = measure(fn)
+            entries = sum(len(commits) for commits in categories.values())
+            print(f"{name:<10}{elapsed:>10.2f}{peak / 2**20:>10.1f}{entries:>10}  bump={bump}")
+
+        categories, bump = after()
+        path = os.path.join(tmp, 'CHANGELOG.md')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(generate_changelog.CHANGELOG_HEADER)
+            for i in range(CHANGELOG_ENTRIES):
+                f.write(generate_changelog.format_entry(f'0.0.{i}', {'Chores': [f'chore: entry {i}']}))
+        size = os.path.getsize(path)
+        entry = generate_changelog.format_entry('1.0.0', categories)
+        _, elapsed, peak = measure(lambda: generate_changelog.update_changelog(entry, path))
+        print(f"Prepended {len(entry) / 2**20:.1f} MiB to a {size / 2**20:.1f} MiB changelog "
+              f"in {elapsed:.2f}s, peak {peak / 2**20:.1f} MiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Time changelog summaries against a local stand-in for the completion API.
+
+Summarizes a synthetic release one chunk at a time, then with concurrent
+chunks, then again from the cache. The stand-in fails its first requests
+so every run also goes through the client's retries.
+
+Usage:
+    python scripts/benchmarks/bench_changelog_summary.py [commits] [latency_ms]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from changelog_summary import ChangelogSummarizer  # noqa: E402  pylint: disable=wrong-import-position
+from fake_openai import FakeCompletionServer  # noqa: E402  pylint: disable=wrong-import-position
+
+TYPES = ('feat', 'fix', 'docs', 'refactor', 'perf', 'chore')
+
+
+def run(server, cache_dir, commits, concurrency, label):
+    with ChangelogSummarizer(
+        'test-key', base_url=server.base_url, cache_dir=cache_dir, concurrency=concurrency
+    ) as summarizer:
+        start = time.perf_counter()
+        summary = summarizer.summarize(commits, range_key=f'bench-{len(commits)}')
+        elapsed = time.perf_counter() - start
+    print(f"{label:<24}{elapsed:>9.2f}s{summarizer.request_count:>10}{server.request_count:>7}"
+          f"{server.max_in_flight:>12}  {summary}")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    latency = (int(sys.argv[2]) if len(sys.argv) > 2 else 200) / 1000
+    commits = [
+        f'{TYPES[i % len(TYPES)]}: change number {i} touching module_{i % 97}' for i in range(count)
+    ]
+    # http counts every attempt the stand-in saw, including retried failures
+    print(f"{'':<24}{'time':>10}{'requests':>10}{'http':>7}{'in flight':>12}  summary")
+    for concurrency in (1, 8):
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                FakeCompletionServer(delay=latency, fail_next=2, fail_status=503) as server:
+            run(server, cache_dir, commits, concurrency, f'concurrency={concurrency}')
+            run(server, cache_dir, commits, concurrency, '  re-run (cached)')
+
+
+if __name__ == '__main__':
+    main()
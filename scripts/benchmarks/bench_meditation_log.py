@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Show that dashboard reads stay flat as a user's session history grows.
+
+Loads a user's history in steps, and at each size times stats() plus
+recent(). For comparison it also times the aggregate query a dashboard
+would need without the incrementally maintained row.
+
+Usage:
+    python scripts/benchmarks/bench_meditation_log.py [max_sessions]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app.meditation_log import MeditationLog, SessionEvent  # noqa: E402  pylint: disable=wrong-import-position
+
+TYPES = ('Mindfulness', 'Breathing', 'Body Scan', 'Loving-Kindness')
+READS = 200
+BATCH = 500
+
+
+def timed(fn, repeat=READS):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    max_sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    rng = random.Random(7)
+    started_at = int(time.time()) - max_sessions * 31 * 3600
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log = MeditationLog(os.path.join(tmp, 'log.sqlite3'))
+        conn = log._connection()  # pylint: disable=protected-access
+
+        def dashboard():
+            log.stats('user')
+            log.recent('user')
+
+        def scan():
+            conn.execute(
+                'SELECT meditation_type, COUNT(*), SUM(duration_seconds) FROM session_events'
+                ' WHERE user_id = ? GROUP BY meditation_type', ('user',)
+            ).fetchall()
+
+        print(f"{'sessions':>10}{'dashboard µs':>15}{'full scan µs':>15}{'write µs/event':>16}")
+        sizes = [n for n in (1000, 2000, 5000, 10000, 20000, 50000, 100000) if n < max_sessions]
+        written = 0
+        for target in sizes + [max_sessions]:
+            write_time, write_count = 0.0, 0
+            while written < target:
+                batch = []
+                for _ in range(min(BATCH, target - written)):
+                    started_at += rng.randint(1800, 30 * 3600)
+                    batch.append(SessionEvent(
+                        f'e{written}', started_at, rng.randint(5, 60) * 60, rng.choice(TYPES)
+                    ))
+                    written += 1
+                start = time.perf_counter()
+                log.record('user', batch)
+                write_time += time.perf_counter() - start
+                write_count += len(batch)
+            print(f"{written:>10}{timed(dashboard):>15.1f}{timed(scan, 20):>15.1f}"
+                  f"{write_time / write_count * 1e6:>16.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Compare worker memory and boot time with and without preload_app.
+
+Starts gunicorn with gunicorn.conf.py against a local Firebase stand-in,
+sends some traffic, and reads each worker's unique (USS) and proportional
+(PSS) memory from /proc. Linux only.
+
+Usage:
+    python scripts/benchmarks/bench_preload.py [workers] [requests_per_worker]
+"""
+import sys
+
+import requests
+
+from app_server import AppServer, worker_pids
+from fake_firebase import FakeKeyServer, configure_app_environment
+
+
+def memory_kb(pid):
+    """Return (uss, pss) in KiB from /proc/<pid>/smaps_rollup."""
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup', 'r', encoding='ascii') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return fields['Private_Clean'] + fields['Private_Dirty'], fields['Pss']
+
+
+def run(preload, workers, requests_per_worker):
+    env = {
+        'WEB_CONCURRENCY': str(workers),
+        'GUNICORN_PRELOAD': 'true' if preload else 'false',
+        'GUNICORN_THREADS': '1',
+    }
+    with AppServer(env=env) as server, requests.Session() as http:
+        for _ in range(requests_per_worker * workers):
+            for path in ('/', '/login', '/metrics'):
+                http.get(server.url + path, timeout=5)
+        sizes = [memory_kb(pid) for pid in worker_pids(server.process.pid)]
+        boot = server.boot_seconds
+    uss = sum(s[0] for s in sizes) / len(sizes) / 1024
+    pss = sum(s[1] for s in sizes) / len(sizes) / 1024
+    return boot, uss, pss
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    requests_per_worker = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+
+    with FakeKeyServer() as firebase:
+        configure_app_environment(firebase)
+        print(f"Workers: {workers}, {requests_per_worker * 3} requests each\n")
+        print(f"{'':<14}{'boot':>8}{'USS/worker':>13}{'PSS/worker':>13}")
+        for preload in (False, True):
+            boot, uss, pss = run(preload, workers, requests_per_worker)
+            label = 'preload' if preload else 'no preload'
+            print(f"{label:<14}{boot:>7.2f}s{uss:>10.1f} MB{pss:>10.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Compare worker boot time for the version lookup before and after the manifest.
+Each sample runs in a fresh interpreter, like a new gunicorn worker.
+Usage:
+    python scripts/benchmarks/bench_startup.py [samples]
+"""
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# The version lookup create_app() used to run: three git subprocesses
+BEFORE = """
+import subprocess
+sha = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD']).decode('ascii').strip()
+try:
+    tag = subprocess.check_output(['git', 'describe', '--tags', '--abbrev=0'],
+                                  stderr=subprocess.DEVNULL).decode('ascii').strip()
+except subprocess.CalledProcessError:
+    tag = 'dev'
+subprocess.check_output(['git', 'show', '-s', '--format=%ci', 'HEAD'])
+"""
+
+AFTER = """
+get_version_info()['number']
+"""
+
+# Both variants pay for the same imports; only the lookup itself is timed
+HARNESS = """
+import time
+from app.version import get_version_info
+start = time.perf_counter()
+{code}
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def sample(code, samples):
+    """Return (boot ms, lookup ms) medians for code run in fresh interpreters."""
+    boots, lookups = [], []
+    for _ in range(samples):
+        start = time.perf_counter()
+        output = subprocess.check_output(
+            [sys.executable, '-c', HARNESS.format(code=code)], cwd=ROOT, text=True
+        )
+        boots.append((time.perf_counter() - start) * 1000)
+        lookups.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(boots), statistics.median(lookups)
+
+
+def main():
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print(f"{'':<28} {'worker boot':>12} {'version lookup':>16}")
+    for label, code in (('before (git subprocesses)', BEFORE), ('after (manifest/.git read)', AFTER)):
+        boot, lookup = sample(code, samples)
+        print(f"{label:<28} {boot:9.1f} ms {lookup:13.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Benchmark local ID-token verification against the fake key server.
+Usage:
+    python scripts/benchmarks/bench_token_verifier.py [iterations]
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from fake_firebase import FakeKeyServer  # noqa: E402  pylint: disable=wrong-import-position
+from app.token_verifier import SigningKeyCache, TokenVerifier  # noqa: E402  pylint: disable=wrong-import-position
+
+
+def timed(label, func, iterations):
+    """Run func iterations times and print the mean latency."""
+    start = time.perf_counter()
+    for i in range(iterations):
+        func(i)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed / iterations * 1e6:10.1f} µs/op")
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    with FakeKeyServer() as server:
+        keys = SigningKeyCache(server.url)
+        verifier = TokenVerifier(server.project_id, keys=keys, cache_size=iterations)
+        tokens = [server.mint_token(f'user-{i}') for i in range(iterations)]
+
+        start = time.perf_counter()
+        verifier.verify(server.mint_token('cold'))
+        print(f"{'cold (key fetch)':<28} {(time.perf_counter() - start) * 1e6:10.1f} µs/op")
+
+        timed('warm keys, new token', lambda i: verifier.verify(tokens[i]), iterations)
+        timed('replayed token', lambda i: verifier.verify(tokens[i]), iterations)
+
+        print(f"\nKey server requests: {server.request_count}")
+        print(f"Replay cache hits:   {verifier.cache_hits}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Simulate a login storm and count outbound user lookups per login.
+Usage:
+    python scripts/benchmarks/bench_user_profiles.py [logins] [users]
+"""
+import random
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app.user_profiles import UserProfileCache  # noqa: E402  pylint: disable=wrong-import-position
+
+FIREBASE_LATENCY = 0.002
+
+
+def fake_get_user(uid):
+    """Stand-in for firebase_auth.get_user with a fixed network delay."""
+    time.sleep(FIREBASE_LATENCY)
+    return SimpleNamespace(display_name=f'User {uid}', email=f'{uid}@example.com', photo_url=None)
+
+
+def main():
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rng = random.Random(42)
+    cache = UserProfileCache(fetch_user=fake_get_user)
+
+    start = time.perf_counter()
+    for _ in range(logins):
+        uid = f'user-{rng.randrange(users)}'
+        # Roughly half of the providers put name and email into the token
+        claims = {'sub': uid}
+        if rng.random() < 0.5:
+            claims.update(name=f'User {uid}', email=f'{uid}@example.com')
+        cache.get(uid, claims)
+    elapsed = time.perf_counter() - start
+
+    stats = cache.stats()
+    print(f"Logins:                    {logins} over {users} users")
+    print(f"Profiles from claims:      {stats['claims_hits']}")
+    print(f"Profiles from cache:       {stats['cache_hits']}")
+    print(f"Firebase get_user calls:   {stats['firebase_calls']} (was {logins})")
+    print(f"Firebase calls per login:  {stats['firebase_calls_per_lookup']:.3f} (was 1.000)")
+    print(f"Lookup time per login:     {elapsed / logins * 1e6:.1f} µs "
+          f"(was ~{FIREBASE_LATENCY * 1e6:.0f} µs)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""Local stand-ins for the Firebase endpoints used by the app.
+
+Everything here runs on 127.0.0.1 with no network access, so the auth layer
+can be exercised and benchmarked offline.
+"""
+import datetime
+import json
+import os
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from google.auth import crypt, jwt
+
+DEFAULT_PROJECT_ID = 'fake-project'
+
+
+def _generate_key_pair():
+    """Create an RSA key and a self-signed certificate like Google publishes."""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'fake-securetoken')])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=2))
+        .sign(key, hashes.SHA256())
+    )
+    key_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    )
+    cert_pem = cert.public_bytes(serialization.Encoding.PEM).decode('ascii')
+    return key_pem, cert_pem
+
+
+class _Server(ThreadingHTTPServer):
+    # Accept login bursts without the default backlog of 5 refusing connections
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class FakeKeyServer:  # pylint: disable=too-many-instance-attributes
+    """Serve signing certificates and mint ID tokens signed with them.
+
+    The server also answers Identity Toolkit accounts:lookup calls under the
+    path the Auth emulator uses, so pointing FIREBASE_AUTH_EMULATOR_HOST at
+    `emulator_host` routes user lookups here. `lookup_delay` simulates a
+    slow backend.
+    """
+
+    def __init__(self, project_id=DEFAULT_PROJECT_ID, max_age=3600, lookup_delay=0.0):
+        self.project_id = project_id
+        self.max_age = max_age
+        self.lookup_delay = lookup_delay
+        self.request_count = 0
+        self.lookup_count = 0
+        self.users = {}
+        self._signers = {}
+        self.certs = {}
+        self._server = None
+        self._thread = None
+        self.rotate()
+
+    def rotate(self):
+        """Publish a new signing key and make it the one used for minting."""
+        kid = uuid.uuid4().hex
+        key_pem, cert_pem = _generate_key_pair()
+        self._signers[kid] = crypt.RSASigner.from_string(key_pem, key_id=kid)
+        self.certs[kid] = cert_pem
+        self.current_kid = kid
+        return kid
+
+    def add_user(self, uid, display_name=None, email=None, photo_url=None):
+        """Create the user record returned by accounts:lookup."""
+        record = {'localId': uid, 'displayName': display_name, 'email': email, 'photoUrl': photo_url}
+        self.users[uid] = {k: v for k, v in record.items() if v is not None}
+
+    @property
+    def emulator_host(self):
+        host, port = self._server.server_address[:2]
+        return f'{host}:{port}'
+
+    @property
+    def url(self):
+        return f'http://{self.emulator_host}/certs'
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body are separate writes; don't let Nagle stall keep-alive clients
+            disable_nagle_algorithm = True
+
+            def _send_json(self, payload, headers=()):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json; charset=UTF-8')
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                server.request_count += 1
+                self._send_json(
+                    server.certs, [('Cache-Control', f'public, max-age={server.max_age}')]
+                )
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                request = json.loads(self.rfile.read(length) or b'{}')
+                if not self.path.endswith('/accounts:lookup'):
+                    self.send_error(404)
+                    return
+                server.lookup_count += 1
+                if server.lookup_delay:
+                    time.sleep(server.lookup_delay)
+                users = [server.users[uid] for uid in request.get('localId', ()) if uid in server.users]
+                self._send_json({'kind': 'identitytoolkit#GetAccountInfoResponse', 'users': users})
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        """Start serving on an ephemeral localhost port."""
+        self._server = _Server(('127.0.0.1', 0), self._make_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def mint_token(self, uid, lifetime=3600, **claims):
+        """Return a signed ID token for uid with optional extra claims."""
+        now = int(time.time())
+        payload = {
+            'iss': f'https://securetoken.google.com/{self.project_id}',
+            'aud': self.project_id,
+            'auth_time': now,
+            'sub': uid,
+            'iat': now,
+            'exp': now + lifetime,
+        }
+        payload.update(claims)
+        token = jwt.encode(self._signers[self.current_kid], payload)
+        return token.decode('ascii')
+
+
+def configure_app_environment(server):
+    """Point the app's Firebase settings at a running FakeKeyServer."""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode('ascii')
+    os.environ.update({
+        'FIREBASE_PROJECT_ID': server.project_id,
+        'FIREBASE_PRIVATE_KEY': pem.replace('\n', '\\n'),
+        'FIREBASE_PRIVATE_KEY_ID': 'fake',
+        'FIREBASE_CLIENT_EMAIL': f'fake@{server.project_id}.iam.gserviceaccount.com',
+        'FIREBASE_CERTS_URL': server.url,
+        'FIREBASE_AUTH_EMULATOR_HOST': server.emulator_host,
+    })
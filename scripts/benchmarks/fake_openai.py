@@ -0,0 +1,124 @@
+"""Local stand-in for the OpenAI chat completions endpoint.
+
+Point OPENAI_BASE_URL (or ChangelogSummarizer's base_url) at `base_url`
+to summarize changelogs offline. `delay` simulates model latency and
+`fail_next` makes the next requests fail, to exercise retries.
+"""
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Server(ThreadingHTTPServer):
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class FakeCompletionServer:  # pylint: disable=too-many-instance-attributes
+    """Answer /v1/chat/completions with a short deterministic summary."""
+
+    def __init__(self, delay=0.0, fail_next=0, fail_status=500):
+        self.delay = delay
+        self.fail_next = fail_next
+        self.fail_status = fail_status
+        self.request_count = 0
+        self.failure_count = 0
+        self.max_in_flight = 0
+        self.prompts = []
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/v1'
+
+    def begin_request(self):
+        """Count a request; return whether it should fail."""
+        with self._lock:
+            self.request_count += 1
+            failing = self.fail_next > 0
+            if failing:
+                self.fail_next -= 1
+                self.failure_count += 1
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        return failing
+
+    def end_request(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def _send_json(self, status, payload):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                request = json.loads(self.rfile.read(length) or b'{}')
+                if not self.path.endswith('/chat/completions'):
+                    self.send_error(404)
+                    return
+                failing = server.begin_request()
+                try:
+                    if server.delay:
+                        time.sleep(server.delay)
+                    if failing:
+                        self._send_json(server.fail_status, {'error': {'message': 'injected failure'}})
+                        return
+                    prompt = request['messages'][-1]['content']
+                    server.prompts.append(prompt)
+                    content = f'Summary of {len(prompt.splitlines())} lines.'
+                    self._send_json(200, {
+                        'id': f'chatcmpl-{uuid.uuid4().hex}',
+                        'object': 'chat.completion',
+                        'created': int(time.time()),
+                        'model': request.get('model'),
+                        'choices': [{
+                            'index': 0,
+                            'message': {'role': 'assistant', 'content': content},
+                            'finish_reason': 'stop',
+                        }],
+                        'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0},
+                    })
+                finally:
+                    server.end_request()
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        """Start serving on an ephemeral localhost port."""
+        self._server = _Server(('127.0.0.1', 0), self._make_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test of the main pages against a local Firebase stand-in.
+
+Starts the fake Firebase key server and user service, runs the app under
+gunicorn with gunicorn.conf.py, and drives it with a scripted mix of
+anonymous visitors and members who log in, open the dashboard and log
+out. Per-endpoint p50/p95/p99 latency and requests/sec are printed and
+written to JSON. With --baseline, or with the compare command, the
+results are checked against an earlier run. The exit status is 1 when any
+endpoint regressed by more than the threshold.
+
+Everything runs offline on one Linux box.
+
+Usage:
+    python scripts/benchmarks/load_test.py run [--duration 30] [--users 16]
+        [--mix anonymous=0.7,member=0.3] [--output results.json]
+        [--baseline baseline.json] [--threshold 15]
+        [--workers 2] [--threads 4] [--app run:app|asgi:app]
+    python scripts/benchmarks/load_test.py compare baseline.json results.json [--threshold 15]
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+import requests
+
+from app_server import ROOT, AppServer
+from fake_firebase import FakeKeyServer, configure_app_environment
+
+LOGIN = 'login'
+# Each scenario is one visit: a fresh browser session running its steps in order
+SCENARIOS = {
+    'anonymous': ['/', '/login', '/'],
+    'member': [LOGIN, '/dashboard', '/', '/dashboard', '/logout'],
+}
+CALLBACK_PATH = '/auth/callback'
+# Latency changes smaller than this are noise, whatever the percentage
+MIN_LATENCY_DELTA_MS = 1.0
+
+
+def parse_mix(text):
+    """Parse 'anonymous=0.7,member=0.3' into scenario weights."""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"Unknown scenario: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class VirtualUser(threading.Thread):  # pylint: disable=too-many-instance-attributes
+    """Run visits back to back until the deadline, recording each request."""
+
+    def __init__(self, base_url, firebase, accounts, mix, *, seed, measure_from, deadline, think):
+        super().__init__(daemon=True)
+        self.base_url = base_url
+        self.firebase = firebase
+        self.accounts = accounts
+        self.names = list(mix)
+        self.weights = [mix[name] for name in self.names]
+        self.rng = random.Random(seed)
+        self.measure_from = measure_from
+        self.deadline = deadline
+        self.think = think
+        self.samples = {}
+        self.errors = {}
+
+    def record(self, endpoint, started, elapsed, ok):
+        if started < self.measure_from:
+            return
+        self.samples.setdefault(endpoint, []).append(elapsed)
+        if not ok:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def request(self, http, path, params=None):
+        started = time.perf_counter()
+        try:
+            response = http.get(self.base_url + path, params=params, allow_redirects=False, timeout=30)
+        except requests.RequestException:
+            return started, time.perf_counter() - started, None
+        return started, time.perf_counter() - started, response
+
+    def login(self, http):
+        uid, with_profile_claims = self.rng.choice(self.accounts)
+        claims = {'name': f'User {uid}', 'email': f'{uid}@example.com'} if with_profile_claims else {}
+        token = self.firebase.mint_token(uid, **claims)
+        started, elapsed, response = self.request(http, CALLBACK_PATH, {'id_token': token})
+        ok = response is not None and response.headers.get('Location', '').endswith('/dashboard')
+        self.record(CALLBACK_PATH, started, elapsed, ok)
+
+    def run(self):
+        while time.perf_counter() < self.deadline:
+            scenario = self.rng.choices(self.names, self.weights)[0]
+            with requests.Session() as http:
+                for step in SCENARIOS[scenario]:
+                    if time.perf_counter() >= self.deadline:
+                        return
+                    if step == LOGIN:
+                        self.login(http)
+                    else:
+                        started, elapsed, response = self.request(http, step)
+                        ok = response is not None and response.status_code < 400
+                        self.record(step, started, elapsed, ok)
+                    if self.think:
+                        time.sleep(self.think)
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples, errors, seconds):
+    """Return per-endpoint latency percentiles and throughput."""
+    summary = {}
+    for endpoint, values in sorted(samples.items()):
+        values.sort()
+        summary[endpoint] = {
+            'requests': len(values),
+            'errors': errors.get(endpoint, 0),
+            'rps': len(values) / seconds,
+            'mean_ms': sum(values) / len(values) * 1000,
+            'p50_ms': percentile(values, 0.50) * 1000,
+            'p95_ms': percentile(values, 0.95) * 1000,
+            'p99_ms': percentile(values, 0.99) * 1000,
+        }
+    return summary
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def create_accounts(firebase, count, claims_ratio, seed):
+    """Register count users; return (uid, token carries profile claims) pairs."""
+    rng = random.Random(seed)
+    accounts = []
+    for i in range(count):
+        uid = f'load-{i}'
+        firebase.add_user(uid, display_name=f'User {i}', email=f'{uid}@example.com')
+        # Some providers put name and email into the token, others do not
+        accounts.append((uid, rng.random() < claims_ratio))
+    return accounts
+
+
+def merge_samples(users):
+    """Combine every user's latencies and error counts per endpoint."""
+    samples, errors = {}, {}
+    for user in users:
+        for endpoint, values in user.samples.items():
+            samples.setdefault(endpoint, []).extend(values)
+        for endpoint, count in user.errors.items():
+            errors[endpoint] = errors.get(endpoint, 0) + count
+    return samples, errors
+
+
+def run_load(args):
+    with FakeKeyServer(lookup_delay=args.lookup_delay) as firebase:
+        configure_app_environment(firebase)
+        accounts = create_accounts(firebase, args.accounts, args.claims_ratio, args.seed)
+
+        env = {
+            'WEB_CONCURRENCY': str(args.workers),
+            'GUNICORN_THREADS': str(args.threads),
+            'SESSION_BACKEND': args.session_backend,
+            # Every virtual user logs in from 127.0.0.1
+            'AUTH_RATE_LIMIT': 'false',
+        }
+        if args.worker_class:
+            env['GUNICORN_WORKER_CLASS'] = args.worker_class
+        with AppServer(app=args.app, env=env) as server:
+            now = time.perf_counter()
+            measure_from = now + args.warmup
+            deadline = measure_from + args.duration
+            users = [
+                VirtualUser(server.url, firebase, accounts, args.mix, seed=args.seed + i,
+                            measure_from=measure_from, deadline=deadline, think=args.think)
+                for i in range(args.users)
+            ]
+            for user in users:
+                user.start()
+            for user in users:
+                user.join()
+
+    samples, errors = merge_samples(users)
+    all_values = [v for values in samples.values() for v in values]
+    endpoints = summarize(samples, errors, args.duration)
+    return {
+        'meta': {
+            'revision': git_revision(),
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'app': args.app,
+            'workers': args.workers,
+            'threads': args.threads,
+            'worker_class': args.worker_class or 'default',
+            'users': args.users,
+            'duration_s': args.duration,
+            'mix': args.mix,
+            'lookup_delay_s': args.lookup_delay,
+        },
+        'endpoints': endpoints,
+        'total': summarize({'all': all_values}, {'all': sum(errors.values())}, args.duration).get('all', {}),
+    }
+
+
+def print_results(results):
+    print(f"{'endpoint':<16}{'requests':>9}{'errors':>8}{'req/s':>9}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    rows = list(results['endpoints'].items()) + [('total', results['total'])]
+    for endpoint, stats in rows:
+        if not stats:
+            continue
+        print(f"{endpoint:<16}{stats['requests']:>9}{stats['errors']:>8}{stats['rps']:>9.1f}"
+              f"{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}")
+
+
+def compare(baseline, current, threshold):
+    """Print the change per endpoint and return the list of regressions."""
+    regressions = []
+    limit = threshold / 100
+    print(f"\n{'endpoint':<16}{'metric':<8}{'baseline':>10}{'current':>10}{'change':>9}")
+    for endpoint, old in baseline['endpoints'].items():
+        new = current['endpoints'].get(endpoint)
+        if new is None:
+            regressions.append(f"{endpoint}: missing from current run")
+            continue
+        for metric in ('rps', 'p50_ms', 'p95_ms', 'p99_ms'):
+            before, after = old[metric], new[metric]
+            change = (after - before) / before if before else 0.0
+            if metric == 'rps':
+                regressed = change < -limit
+            else:
+                regressed = change > limit and after - before > MIN_LATENCY_DELTA_MS
+            flag = '  REGRESSED' if regressed else ''
+            print(f"{endpoint:<16}{metric:<8}{before:>10.1f}{after:>10.1f}{change:>+9.1%}{flag}")
+            if regressed:
+                regressions.append(f"{endpoint} {metric}: {before:.1f} -> {after:.1f} ({change:+.1%})")
+        if new['errors'] > old['errors']:
+            regressions.append(f"{endpoint}: errors {old['errors']} -> {new['errors']}")
+    return regressions
+
+
+def report_regressions(regressions, threshold):
+    if regressions:
+        print(f"\nRegressions beyond {threshold:g}%:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"\nNo regressions beyond {threshold:g}%.")
+    return 0
+
+
+def load_results(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n', maxsplit=1)[0].strip())
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='run the load test')
+    run.add_argument('--duration', type=float, default=30, help='measured seconds')
+    run.add_argument('--warmup', type=float, default=5, help='unmeasured seconds before measuring')
+    run.add_argument('--users', type=int, default=16, help='concurrent virtual users')
+    run.add_argument('--think', type=float, default=0.0, help='pause between requests (s)')
+    run.add_argument('--mix', type=parse_mix, default=parse_mix('anonymous=0.7,member=0.3'))
+    run.add_argument('--accounts', type=int, default=200, help='distinct member accounts')
+    run.add_argument('--claims-ratio', type=float, default=0.5,
+                     help='share of accounts whose tokens carry name and email')
+    run.add_argument('--lookup-delay', type=float, default=0.05,
+                     help='latency of the fake user service (s)')
+    run.add_argument('--app', default='run:app', help='run:app or asgi:app')
+    run.add_argument('--workers', type=int, default=2)
+    run.add_argument('--threads', type=int, default=4)
+    run.add_argument('--worker-class', help='e.g. uvicorn.workers.UvicornWorker')
+    run.add_argument('--session-backend', default='sqlite')
+    run.add_argument('--seed', type=int, default=1)
+    run.add_argument('--output', help='write results to this JSON file')
+    run.add_argument('--baseline', help='compare against this results file')
+    run.add_argument('--threshold', type=float, default=15, help='allowed regression in percent')
+
+    cmp = commands.add_parser('compare', help='compare two results files')
+    cmp.add_argument('baseline')
+    cmp.add_argument('current')
+    cmp.add_argument('--threshold', type=float, default=15, help='allowed regression in percent')
+
+    args = parser.parse_args()
+    if args.command == 'compare':
+        regressions = compare(load_results(args.baseline), load_results(args.current), args.threshold)
+        return report_regressions(regressions, args.threshold)
+
+    results = run_load(args)
+    print_results(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+        print(f"\nWrote {args.output}")
+    if args.baseline:
+        regressions = compare(load_results(args.baseline), results, args.threshold)
+        return report_regressions(regressions, args.threshold)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
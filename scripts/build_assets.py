@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Build fingerprinted, pre-compressed copies of the static assets.
+Writes content-hashed files plus .gz (and .br when the brotli package is
+installed) variants under app/static/dist/, and a manifest.json mapping
+each source path to its fingerprinted path.
+Usage:
+    python scripts/build_assets.py
+"""
+import gzip
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_DIR = Path('app/static')
+DIST_DIR = STATIC_DIR / 'dist'
+MANIFEST_NAME = 'manifest.json'
+ASSET_PATTERNS = ['css/*.css', 'js/*.js', 'img/*.ico', 'img/*.svg', 'img/*.png', 'img/favicon/*']
+COMPRESSIBLE = {'.css', '.js', '.svg', '.ico', '.json', '.txt'}
+MIN_COMPRESS_SIZE = 256
+
+
+def fingerprint(path, data):
+    """Return the dist-relative fingerprinted name for an asset."""
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    return path.with_name(f'{path.stem}.{digest}{path.suffix}').as_posix()
+
+
+def write_variants(target, data):
+    """Write the asset and any compressed variants that are actually smaller."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_bytes(data)
+    encodings = []
+    if target.suffix not in COMPRESSIBLE or len(data) < MIN_COMPRESS_SIZE:
+        return encodings
+    if brotli is not None:
+        compressed = brotli.compress(data, quality=11)
+        if len(compressed) < len(data):
+            target.with_name(target.name + '.br').write_bytes(compressed)
+            encodings.append('br')
+    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(compressed) < len(data):
+        target.with_name(target.name + '.gz').write_bytes(compressed)
+        encodings.append('gzip')
+    return encodings
+
+
+def build():
+    """Rebuild app/static/dist from scratch and return the manifest."""
+    if DIST_DIR.exists():
+        shutil.rmtree(DIST_DIR)
+    files, encodings = {}, {}
+    for pattern in ASSET_PATTERNS:
+        for source in sorted(STATIC_DIR.glob(pattern)):
+            relative = source.relative_to(STATIC_DIR)
+            data = source.read_bytes()
+            hashed = fingerprint(relative, data)
+            available = write_variants(DIST_DIR / hashed, data)
+            files[relative.as_posix()] = f'dist/{hashed}'
+            if available:
+                encodings[f'dist/{hashed}'] = available
+    manifest = {'files': files, 'encodings': encodings}
+    DIST_DIR.mkdir(parents=True, exist_ok=True)
+    with open(DIST_DIR / MANIFEST_NAME, 'w', encoding='utf-8', newline='\n') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def main():
+    manifest = build()
+    print(f"Fingerprinted {len(manifest['files'])} assets into {DIST_DIR}")
+    print(f"Pre-compressed variants: {sum(len(v) for v in manifest['encodings'].values())}"
+          f"{'' if brotli else ' (install brotli for .br variants)'}")
+    if os.getenv('VERBOSE'):
+        for source, hashed in manifest['files'].items():
+            print(f"  {source} -> {hashed}")
+
+
+if __name__ == '__main__':
+    main()
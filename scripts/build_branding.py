@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Build the favicons and default avatars described by site_info's branding section.
+
+Each source image (the lotus logo, and the avatar in the light and dark
+palettes) is drawn once at high resolution and every output size is
+resampled from it. The favicon PNGs, a multi-resolution favicon.ico and
+the apple touch icon come from branding.logo; the avatars go to
+branding.avatar.default_path and dark_mode_path. Sources are built in
+parallel across a process pool, and a source whose settings and drawing
+code are unchanged since the last build is skipped.
+Usage:
+    python scripts/build_branding.py [--force]
+"""
+import hashlib
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import yaml
+from PIL import Image, ImageDraw
+
+ROOT = Path(__file__).resolve().parents[1]
+SITE_INFO_PATH = ROOT / 'config' / 'site_info.yaml'
+STATE_PATH = ROOT / 'config' / 'branding.cache'
+FAVICON_DIR = Path('app/static/img/favicon')
+ICO_PATH = Path('app/static/img/favicon.ico')
+# Sources are drawn at this size and resampled down
+MASTER_SIZE = 1024
+APPLE_TOUCH_SIZE = 180
+AVATAR_SIZE = 200
+DEFAULT_COLOR = '#7C4DFF'
+
+
+def draw_lotus(size, color):
+    """Draw the lotus mark on a transparent square."""
+    image = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    center = size // 2
+    radius = size // 3
+    petal = radius * 0.5
+    # Six petals as circles on a ring around the center
+    for angle in range(0, 360, 60):
+        x = center + radius * 0.6 * math.cos(math.radians(angle + 30))
+        y = center + radius * 0.6 * math.sin(math.radians(angle + 30))
+        draw.ellipse([x - petal, y - petal, x + petal, y + petal], fill=color)
+    draw.ellipse([center - radius // 3, center - radius // 3,
+                  center + radius // 3, center + radius // 3], fill=color)
+    return image
+
+
+def draw_avatar(size, background, figure):
+    """Draw a generic head-and-shoulders avatar."""
+    image = Image.new('RGBA', (size, size), background)
+    draw = ImageDraw.Draw(image)
+    head = size * 0.19
+    cx, cy = size / 2, size * 0.38
+    draw.ellipse([cx - head, cy - head, cx + head, cy + head], fill=figure)
+    draw.ellipse([size * 0.18, size * 0.64, size * 0.82, size * 1.18], fill=figure)
+    return image
+
+
+def resample(master, size):
+    return master.resize((size, size), Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+
+def build_logo(job):
+    """Render the logo once and write every favicon output."""
+    master = draw_lotus(MASTER_SIZE, job['color'])
+    images = {size: resample(master, size) for size in job['sizes']}
+    for size in job['png_sizes']:
+        images[size].save(ROOT / FAVICON_DIR / f'favicon-{size}x{size}.png', 'PNG', optimize=True)
+    if job['ico']:
+        ico_sizes = sorted(job['ico_sizes'], reverse=True)
+        # Pillow uses the appended frame of each size instead of resizing the first
+        images[ico_sizes[0]].save(
+            ROOT / ICO_PATH, format='ICO', sizes=[(s, s) for s in ico_sizes],
+            append_images=[images[s] for s in ico_sizes[1:]]
+        )
+    if job['apple_touch']:
+        # iOS ignores transparency, so flatten onto white
+        icon = Image.new('RGBA', (APPLE_TOUCH_SIZE, APPLE_TOUCH_SIZE), (255, 255, 255, 255))
+        icon.alpha_composite(images[APPLE_TOUCH_SIZE])
+        icon.convert('RGB').save(ROOT / FAVICON_DIR / 'apple-touch-icon.png', 'PNG', optimize=True)
+
+
+def build_avatar(job):
+    master = draw_avatar(MASTER_SIZE, job['background'], job['figure'])
+    resample(master, AVATAR_SIZE).convert('RGB').save(ROOT / job['path'], 'PNG', optimize=True)
+
+
+BUILDERS = {'logo': build_logo, 'avatar': build_avatar}
+
+
+def plan(branding):
+    """Return {name: (job, output paths)} for everything the branding section asks for."""
+    logo = branding.get('logo') or {}
+    themes = branding.get('themes') or {}
+    formats = logo.get('favicon_formats') or ['ico', 'png']
+    sizes = sorted(set(logo.get('favicon_sizes') or [16, 32, 48]))
+    apple_touch = bool(logo.get('apple_touch_icon', True))
+    # The ICO format stops at 256px; with no size that small there is no ICO
+    ico_sizes = [size for size in sizes if size <= 256]
+    job = {
+        'kind': 'logo',
+        'color': (themes.get('light') or {}).get('primary_color', DEFAULT_COLOR),
+        'sizes': sorted(set(sizes + ([APPLE_TOUCH_SIZE] if apple_touch else []))),
+        'png_sizes': sizes if 'png' in formats else [],
+        'ico': 'ico' in formats and bool(ico_sizes),
+        'ico_sizes': ico_sizes,
+        'apple_touch': apple_touch,
+    }
+    outputs = [FAVICON_DIR / f'favicon-{size}x{size}.png' for size in job['png_sizes']]
+    if job['ico']:
+        outputs.append(ICO_PATH)
+    if apple_touch:
+        outputs.append(FAVICON_DIR / 'apple-touch-icon.png')
+    jobs = {'logo': (job, outputs)}
+
+    avatar = branding.get('avatar') or {}
+    for theme, key in (('light', 'default_path'), ('dark', 'dark_mode_path')):
+        path = avatar.get(key)
+        if not path:
+            continue
+        palette = themes.get(theme) or {}
+        job = {
+            'kind': 'avatar',
+            'path': path,
+            'background': palette.get('surface_color', '#F5F5F5'),
+            'figure': (palette.get('text') or {}).get('secondary', '#757575'),
+        }
+        jobs[f'avatar-{theme}'] = (job, [Path(path)])
+    return jobs
+
+
+def job_digest(job, code_digest):
+    return hashlib.sha256(f'{code_digest}\0{json.dumps(job, sort_keys=True)}'.encode('utf-8')).hexdigest()
+
+
+def run_job(job):
+    BUILDERS[job['kind']](job)
+
+
+def load_state():
+    try:
+        with open(STATE_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state):
+    tmp_path = f'{STATE_PATH}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8', newline='\n') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, STATE_PATH)
+
+
+def run_jobs(pending, digests, state):
+    """Build pending jobs in a process pool, recording each success in state.
+
+    Returns the last failure, or None, once every job has finished.
+    """
+    failed = None
+    with ProcessPoolExecutor(max_workers=min(len(pending), os.cpu_count() or 1)) as pool:
+        futures = {name: pool.submit(run_job, job) for name, job in pending.items()}
+        for name, future in futures.items():
+            try:
+                future.result()
+                state[name] = digests[name]
+            except Exception as e:  # pylint: disable=broad-except
+                print(f"Failed to build {name}: {e}", file=sys.stderr)
+                failed = e
+    return failed
+
+
+def build(force=False):
+    """Build every stale output; return (built, skipped) job names."""
+    with open(SITE_INFO_PATH, 'r', encoding='utf-8') as f:
+        branding = (yaml.safe_load(f) or {}).get('branding') or {}
+    code_digest = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+    state = {} if force else load_state()
+    pending, skipped, digests = {}, [], {}
+    for name, (job, outputs) in plan(branding).items():
+        digests[name] = job_digest(job, code_digest)
+        if state.get(name) == digests[name] and all((ROOT / path).exists() for path in outputs):
+            skipped.append(name)
+            continue
+        for path in outputs:
+            (ROOT / path).parent.mkdir(parents=True, exist_ok=True)
+        pending[name] = job
+
+    if pending:
+        failed = run_jobs(pending, digests, state)
+        # Remember what did get built even if another source failed
+        save_state({name: state[name] for name in digests if name in state})
+        if failed is not None:
+            raise failed
+    return list(pending), skipped
+
+
+def main():
+    built, skipped = build(force='--force' in sys.argv[1:])
+    if built:
+        print(f"Built branding assets: {', '.join(built)}")
+    if skipped:
+        print(f"Up to date: {', '.join(skipped)}")
+
+
+if __name__ == '__main__':
+    main()
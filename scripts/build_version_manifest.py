@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Write the build-time version manifest read by app/version.py.
+Usage:
+    python scripts/build_version_manifest.py [output_path]
+"""
+import json
+import subprocess
+import sys
+from datetime import datetime
+
+import pytz
+
+
+def git(*args):
+    """Run a git command and return its stripped output."""
+    return subprocess.check_output(['git', *args], stderr=subprocess.DEVNULL, text=True).strip()
+
+
+def build_manifest():
+    """Collect version info from git once, at build time."""
+    sha = git('rev-parse', '--short', 'HEAD')
+    try:
+        tag = git('describe', '--tags', '--abbrev=0')
+        number = f"{tag}-{sha}"
+    except subprocess.CalledProcessError:
+        number = f"dev-{sha}"
+    return {
+        'number': number,
+        'sha': sha,
+        'build_date': datetime.now(pytz.UTC).strftime('%d.%m.%y %H:%M UTC'),
+        'commit_date': git('show', '-s', '--format=%ci', 'HEAD')
+    }
+
+
+def main():
+    output_path = sys.argv[1] if len(sys.argv) > 1 else '.version.json'
+    manifest = build_manifest()
+    with open(output_path, 'w', encoding='utf-8', newline='\n') as f:
+        json.dump(manifest, f, indent=2)
+        f.write('\n')
+    print(f"Wrote {output_path}: {manifest['number']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+"""Map-reduce summaries of commit ranges for the changelog.
+
+Commits are split into chunks that fit a prompt token budget, and the
+chunks are summarized concurrently over one pooled client. The partial
+summaries are then combined into a single paragraph. Each result is
+cached on disk: the final summary under the commit range and model, and
+each partial summary under its chunk's content and model. A re-run, or a
+retry after a failed tag, makes no requests, and a run that failed
+part-way only repeats the chunks that had not finished.
+
+Set OPENAI_BASE_URL to send requests to a local stand-in instead of the
+OpenAI API.
+"""
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from openai import OpenAI
+
+DEFAULT_MODEL = 'gpt-3.5-turbo'
+DEFAULT_BASE_URL = 'https://api.openai.com/v1'
+DEFAULT_CACHE_DIR = os.path.join('.cache', 'changelog')
+# Bump when the prompts change so cached summaries are not reused
+PROMPT_VERSION = '1'
+# Rough token estimate for English text; no tokenizer dependency needed
+CHARS_PER_TOKEN = 4
+
+MAP_PROMPT = (
+    "Summarize these git commits in a concise paragraph:\n"
+    "{commits}\nFocus on key changes and impact."
+)
+REDUCE_PROMPT = (
+    "These paragraphs each summarize part of one release's git commits:\n\n"
+    "{summaries}\n\nCombine them into one concise paragraph focused on key changes and impact."
+)
+
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def chunk_lines(lines, token_budget):
+    """Group lines into chunks whose estimated size fits token_budget.
+
+    A single line over the budget becomes a chunk of its own.
+    """
+    chunks, chunk, size = [], [], 0
+    for line in lines:
+        tokens = estimate_tokens(line)
+        if chunk and size + tokens > token_budget:
+            chunks.append(chunk)
+            chunk, size = [], 0
+        chunk.append(line)
+        size += tokens
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def _digest(*parts):
+    hasher = hashlib.sha256()
+    for part in parts:
+        hasher.update(part.encode('utf-8'))
+        hasher.update(b'\0')
+    return hasher.hexdigest()
+
+
+class SummaryCache:
+    """Summaries stored as one small JSON file per key."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.json')
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)['summary']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def set(self, key, summary):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'summary': summary}, f)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+class ChangelogSummarizer:
+    """Summarize commit subjects with bounded concurrency and caching.
+
+    `concurrency` caps both the worker threads and the client's connection
+    pool. Failed requests (connection errors, 429 and 5xx responses) are
+    retried with backoff by the OpenAI client, up to `max_retries` times.
+    """
+
+    def __init__(self, api_key, model=DEFAULT_MODEL, base_url=None, *, cache_dir=DEFAULT_CACHE_DIR,
+                 token_budget=3000, summary_tokens=300, concurrency=4, max_retries=3, timeout=60.0):
+        self.model = model
+        self.token_budget = token_budget
+        self.summary_tokens = summary_tokens
+        self.concurrency = concurrency
+        self.cache = SummaryCache(cache_dir)
+        self.request_count = 0
+        self.client = OpenAI(
+            api_key=api_key,
+            base_url=base_url or DEFAULT_BASE_URL,
+            max_retries=max_retries,
+            http_client=httpx.Client(
+                timeout=timeout,
+                limits=httpx.Limits(
+                    max_connections=concurrency, max_keepalive_connections=concurrency
+                ),
+            )
+        )
+
+    def close(self):
+        self.client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _complete(self, prompt, max_tokens):
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=0.7
+        )
+        return response.choices[0].message.content.strip()
+
+    def _cached_complete(self, prompt, max_tokens):
+        """Return (summary, whether a request was made)."""
+        key = _digest('prompt', PROMPT_VERSION, self.model, str(max_tokens), prompt)
+        summary = self.cache.get(key)
+        if summary is not None:
+            return summary, False
+        summary = self._complete(prompt, max_tokens)
+        self.cache.set(key, summary)
+        return summary, True
+
+    def _map(self, executor, prompts, max_tokens):
+        results = list(executor.map(lambda prompt: self._cached_complete(prompt, max_tokens), prompts))
+        # Counted here, on the calling thread, rather than in the workers
+        self.request_count += sum(requested for _, requested in results)
+        return [summary for summary, _ in results]
+
+    def summarize(self, commits, range_key=None):
+        """Return one paragraph summarizing commits (a list of subjects).
+
+        range_key identifies the commit range, e.g. the object ids of its
+        ends; when given, the final summary is cached under it.
+        """
+        final_key = range_key and _digest('range', PROMPT_VERSION, self.model, range_key)
+        if final_key:
+            summary = self.cache.get(final_key)
+            if summary is not None:
+                return summary
+
+        # Leave room in the budget for the prompt's own text
+        budget = max(1, self.token_budget - estimate_tokens(MAP_PROMPT))
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            summaries = self._map(executor, [
+                MAP_PROMPT.format(commits='\n'.join(chunk)) for chunk in chunk_lines(commits, budget)
+            ], self.summary_tokens)
+            # Combine in rounds until a single summary is left
+            budget = max(1, self.token_budget - estimate_tokens(REDUCE_PROMPT))
+            while len(summaries) > 1:
+                groups = chunk_lines(summaries, budget)
+                if len(groups) == len(summaries):
+                    # Every summary fills the budget alone; pair them so the rounds still shrink
+                    groups = [summaries[i:i + 2] for i in range(0, len(summaries), 2)]
+                summaries = self._map(executor, [
+                    REDUCE_PROMPT.format(summaries='\n\n'.join(group)) for group in groups
+                ], self.summary_tokens)
+
+        summary = summaries[0] if summaries else ''
+        if final_key:
+            self.cache.set(final_key, summary)
+        return summary
+
+
+def summarizer_from_env():
+    """Build a summarizer from CHANGELOG_AI_* settings, or None without an API key."""
+    api_key = os.getenv('OPENAI_API_KEY')
+    if not api_key:
+        return None
+    return ChangelogSummarizer(
+        api_key,
+        model=os.getenv('CHANGELOG_AI_MODEL', DEFAULT_MODEL),
+        base_url=os.getenv('OPENAI_BASE_URL'),
+        cache_dir=os.getenv('CHANGELOG_AI_CACHE_DIR', DEFAULT_CACHE_DIR),
+        token_budget=int(os.getenv('CHANGELOG_AI_TOKEN_BUDGET', '3000')),
+        summary_tokens=int(os.getenv('CHANGELOG_AI_SUMMARY_TOKENS', '300')),
+        concurrency=int(os.getenv('CHANGELOG_AI_CONCURRENCY', '4')),
+        max_retries=int(os.getenv('CHANGELOG_AI_MAX_RETRIES', '3')),
+    )
+
+
+def summarize_commits(commits, range_key=None):
+    """Summarize commits with settings from the environment; None when unavailable."""
+    summarizer = summarizer_from_env()
+    if summarizer is None:
+        print("No OpenAI API key found. Skipping AI summary.", file=sys.stderr)
+        return None
+    print("OpenAI API key found. Generating AI summary.")
+    try:
+        with summarizer:
+            return summarizer.summarize(commits, range_key)
+    except Exception as e:
+        print(f"Error generating AI summary: {e}", file=sys.stderr)
+        return None
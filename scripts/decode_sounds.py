@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Pre-decode the configured session sounds so no worker decodes on first use.
+Usage:
+    python scripts/decode_sounds.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.audio.sound_store import get_sound_store  # noqa: E402  pylint: disable=wrong-import-position
+from app.audio.sources import sounds_dir  # noqa: E402  pylint: disable=wrong-import-position
+from app.site_info import get_site_info_source  # noqa: E402  pylint: disable=wrong-import-position
+
+
+def main():
+    site_info = get_site_info_source().get()
+    store = get_sound_store(sounds_dir(site_info))
+    names = [entry['file'] for entry in site_info.get('background_sounds') or ()]
+    names += [entry['affirmations'] for entry in site_info.get('meditation_types') or ()
+              if entry.get('affirmations')]
+    default_affirmations = (site_info.get('session_defaults') or {}).get('affirmations')
+    if default_affirmations:
+        names.append(default_affirmations)
+
+    failures = 0
+    for name in dict.fromkeys(names):
+        try:
+            _, header = store.ensure_decoded(name)
+            print(f"✓ {name}: {header['frames'] / header['sample_rate']:.1f} s, "
+                  f"{header['channels']} ch -> {header['pcm_file']}")
+        except (FileNotFoundError, RuntimeError) as e:
+            failures += 1
+            print(f"! {name}: {e}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,129 +1,111 @@
 """Script to generate changelog from git commits."""
 from datetime import datetime
 import os
+import re
+import shutil
 import subprocess
 import sys
-import httpx
+import tempfile
 from dotenv import load_dotenv
-from openai import OpenAI
+from changelog_summary import summarize_commits
+from git_access import GitRepository
 # Load environment variables from .env file
 load_dotenv()
-def get_current_version():
+CHANGELOG_PATH = 'CHANGELOG.md'
+CHANGELOG_HEADER = (
+    "# Changelog\n\n"
+    "All notable changes to this project will be documented in this file.\n\n"
+)
+# Conventional commit type -> changelog section, in the order sections are written
+CATEGORIES = {
+    'feat': 'Features',
+    'fix': 'Bug Fixes',
+    'docs': 'Documentation',
+    'style': 'Style',
+    'refactor': 'Refactoring',
+    'perf': 'Performance',
+    'test': 'Tests',
+    'build': 'Build',
+    'ci': 'CI',
+    'chore': 'Chores',
+    'revert': 'Reverts',
+}
+# type(scope)!: description
+COMMIT_RE = re.compile(r'(?P<type>[A-Za-z]+)(?:\((?P<scope>[^()]*)\))?(?P<breaking>!)?:\s')
+BREAKING_RE = re.compile(r'^BREAKING[ -]CHANGE:', re.MULTILINE)
+BUMP_ORDER = ('patch', 'minor', 'major')
+READ_SIZE = 1 << 16
+def get_current_version(tag):
     """Get the current version from the latest tag."""
-    try:
-        # Get the latest tag
-        tag = subprocess.check_output(
-            ['git', 'describe', '--tags', '--abbrev=0'],
-            text=True
-        ).strip()
-        # Remove any template- prefix from existing tags for backward compatibility
-        return tag.replace('template-', '')
-    except subprocess.CalledProcessError:
+    if tag is None:
         return "0.0.1"  # Initial version if no tags exist
-def get_commits_since_last_tag():
-    """Get all commits since the last tag."""
-    try:
-        # Get the last tag
-        last_tag = subprocess.check_output(
-            ['git', 'describe', '--tags', '--abbrev=0'],
-            text=True
-        ).strip()
-        # Get commits since last tag
-        return subprocess.check_output(
-            ['git', 'log', f'{last_tag}..HEAD', '--pretty=format:%s'],
-            text=True
-        ).splitlines()
-    except subprocess.CalledProcessError:
-        # If no tags exist, get all commits
-        return subprocess.check_output(
-            ['git', 'log', '--pretty=format:%s'],
-            text=True
-        ).splitlines()
-def categorize_commits(commits):
-    """Categorize commits based on conventional commit messages."""
-    categories = {
-        'Features': [],
-        'Bug Fixes': [],
-        'Documentation': [],
-        'Style': [],
-        'Refactoring': [],
-        'Performance': [],
-        'Tests': [],
-        'Build': [],
-        'CI': [],
-        'Chores': [],
-        'Reverts': []
-    }
-    for commit in commits:
-        if commit.startswith('feat'):
-            categories['Features'].append(commit)
-        elif commit.startswith('fix'):
-            categories['Bug Fixes'].append(commit)
-        elif commit.startswith('docs'):
-            categories['Documentation'].append(commit)
-        elif commit.startswith('style'):
-            categories['Style'].append(commit)
-        elif commit.startswith('refactor'):
-            categories['Refactoring'].append(commit)
-        elif commit.startswith('perf'):
-            categories['Performance'].append(commit)
-        elif commit.startswith('test'):
-            categories['Tests'].append(commit)
-        elif commit.startswith('build'):
-            categories['Build'].append(commit)
-        elif commit.startswith('ci'):
-            categories['CI'].append(commit)
-        elif commit.startswith('chore'):
-            categories['Chores'].append(commit)
-        elif commit.startswith('revert'):
-            categories['Reverts'].append(commit)
-        return {k: v for k, v in categories.items() if v}
-def generate_ai_summary(commits):
-    """Generate an AI-powered summary of changes."""
-    if not os.getenv('OPENAI_API_KEY'):
-        print("No OpenAI API key found. Skipping AI summary.", file=sys.stderr)
-        return None
-    print("OpenAI API key found. Generating AI summary.")
-    try:
-        # Initialize OpenAI client with httpx configuration
-        client = OpenAI(
-            api_key=os.getenv('OPENAI_API_KEY'),
-            http_client=httpx.Client(
-                base_url="https://api.openai.com/v1",
-                timeout=60.0,
-            )
-        )
-        # Create the completion
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{
-                "role": "user",
-                "content": (
-                    "Summarize these git commits in a concise paragraph:\n"
-                    f"{commits}\nFocus on key changes and impact."
-                )
-            }],
-            max_tokens=200,
-            temperature=0.7
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        print(f"Error generating AI summary: {e}", file=sys.stderr)
+    # Remove any template- prefix from existing tags for backward compatibility
+    return tag.replace('template-', '')
+def iter_commits(last_tag=None, cwd=None):
+    """Yield (subject, body) for each commit since last_tag, newest first.
+
+    git log writes NUL-separated fields (-z separates commits with NUL as
+    well), which are split off a fixed-size read buffer, so the log is
+    never held in memory as a whole.
+    """
+    command = ['git', 'log', '-z', '--format=%s%x00%b']
+    if last_tag:
+        command.append(f'{last_tag}..HEAD')
+    with subprocess.Popen(command, stdout=subprocess.PIPE, cwd=cwd) as process:
+        pending, fields = b'', []
+        while True:
+            chunk = process.stdout.read(READ_SIZE)
+            if not chunk:
+                break
+            parts = (pending + chunk).split(b'\0')
+            pending = parts.pop()
+            for part in parts:
+                fields.append(part.decode('utf-8', errors='replace'))
+                if len(fields) == 2:
+                    yield fields[0], fields[1]
+                    fields = []
+        if pending or fields:
+            fields.append(pending.decode('utf-8', errors='replace'))
+            yield fields[0], fields[1] if len(fields) > 1 else ''
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, command)
+def parse_commit(subject, body=''):
+    """Return (type, scope, breaking) for a conventional commit, or None."""
+    match = COMMIT_RE.match(subject)
+    if match is None:
         return None
-def determine_version_bump(commits):
-    """Determine how to bump the version based on conventional commits.
+    breaking = match.group('breaking') is not None or BREAKING_RE.search(body) is not None
+    return match.group('type').lower(), match.group('scope'), breaking
+def categorize_commits(commits):
+    """Categorize commits and determine the version bump in one pass.
+
     Version format: MAJOR.MINOR.PATCH
-    - MAJOR version for breaking changes (denoted by ! or BREAKING CHANGE)
+    - MAJOR version for breaking changes (type! or a BREAKING CHANGE footer)
     - MINOR version for new features (feat:)
     - PATCH version for bug fixes (fix:) and other changes
+    Returns ({section: [subjects]}, bump type); commits that are not
+    conventional commits are left out.
     """
-    has_breaking = any('!' in commit or 'BREAKING CHANGE' in commit for commit in commits)
-    has_feature = any(commit.startswith('feat:') for commit in commits)
-    if has_breaking:
-        return 'major'
-    if has_feature:
-        return 'minor'
-    return 'patch'
+    categories = {category: [] for category in CATEGORIES.values()}
+    bump = 0
+    for subject, body in commits:
+        parsed = parse_commit(subject, body)
+        if parsed is None:
+            continue
+        commit_type, _, breaking = parsed
+        category = CATEGORIES.get(commit_type)
+        if category is None:
+            continue
+        categories[category].append(subject)
+        if breaking:
+            bump = 2
+        elif commit_type == 'feat' and bump < 1:
+            bump = 1
+    return {k: v for k, v in categories.items() if v}, BUMP_ORDER[bump]
+def get_range_key(repo, last_tag):
+    """Identify the commit range by the object ids of its ends."""
+    ends = [repo.rev_parse(f'{last_tag}^{{commit}}')] if last_tag else []
+    return ' '.join(ends + [repo.head()])
 def bump_version(current_version, bump_type):
     """Bump the version number based on SemVer rules."""
     major, minor, patch = map(int, current_version.split('.'))
@@ -132,55 +114,75 @@ def bump_version(current_version, bump_type):
     if bump_type == 'minor':
         return f"{major}.{minor + 1}.0"
     return f"{major}.{minor}.{patch + 1}"
-def update_changelog(categories, ai_summary=None):
-    """Update CHANGELOG.md with new entries."""
-    commits = []
-    for category_commits in categories.values():
-        commits.extend(category_commits)
-    current_version = get_current_version()
-    bump_type = determine_version_bump(commits)
-    new_version = bump_version(current_version, bump_type)
-    date = datetime.now().strftime('%Y-%m-%d')
-    content = f"## [{new_version}] - {date}\n\n"
+def format_entry(version, categories, ai_summary=None, date=None):
+    """Format one changelog section."""
+    date = date or datetime.now().strftime('%Y-%m-%d')
+    lines = [f"## [{version}] - {date}\n\n"]
     if ai_summary:
-        content += f"### Summary\n{ai_summary}\n\n"
+        lines.append(f"### Summary\n{ai_summary}\n\n")
     for category, category_commits in categories.items():
-        if category_commits:
-            content += f"### {category}\n"
-            for commit in category_commits:
-                content += f"- {commit}\n"
-            content += "\n"
-        # Read existing changelog
+        lines.append(f"### {category}\n")
+        lines.extend(f"- {commit}\n" for commit in category_commits)
+        lines.append("\n")
+    return ''.join(lines)
+def update_changelog(entry, path=CHANGELOG_PATH):
+    """Insert entry after the changelog's header.
+
+    The header is everything up to the first blank line. The rest of the
+    file is copied through in blocks into a temporary file that replaces
+    the changelog, so the old contents are never read into memory.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.changelog-', suffix='.md')
     try:
-        with open('CHANGELOG.md', 'r', encoding='utf-8') as f:
-            old_content = f.read()
-    except FileNotFoundError:
-        changelog_header = (
-            "# Changelog\n\n"
-            "All notable changes to this project will be documented in this file.\n\n"
-        )
-        return changelog_header + content
-        # Insert new changes after the header
-    header_end = old_content.find('\n\n')
-    if header_end == -1:
-        header_end = len(old_content)
-    # Create new content by combining old and new
-    return old_content[:header_end + 2] + content + old_content[header_end + 2:]
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='\n') as out:
+            try:
+                with open(path, 'r', encoding='utf-8', newline='') as old:
+                    line = ''
+                    for line in old:
+                        out.write(line)
+                        if line in ('\n', '\r\n'):
+                            break
+                    else:
+                        # No blank line, so the whole file is header
+                        if line:
+                            out.write('\n' if line.endswith('\n') else '\n\n')
+                    out.write(entry)
+                    shutil.copyfileobj(old, out, READ_SIZE)
+            except FileNotFoundError:
+                out.write(CHANGELOG_HEADER + entry)
+        try:
+            shutil.copymode(path, tmp_path)
+        except FileNotFoundError:
+            os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+def generate_changelog(repo, version=None, path=CHANGELOG_PATH):
+    """Add an entry for the commits since the latest tag to the changelog.
+
+    The entry is headed with version, or with the latest tag's version
+    bumped according to the commits. Returns that version, or None if
+    there were no conventional commits to add.
+    """
+    last_tag = repo.latest_tag()
+    categories, bump_type = categorize_commits(iter_commits(last_tag, cwd=repo.path))
+    if not categories:
+        return None
+    new_version = version or bump_version(get_current_version(last_tag), bump_type)
+    ai_summary = summarize_commits(
+        [commit for commits in categories.values() for commit in commits], get_range_key(repo, last_tag)
+    )
+    update_changelog(format_entry(new_version, categories, ai_summary), os.path.join(repo.path, path))
+    return new_version
 def main():
     """Main function to generate changelog."""
-    commits = get_commits_since_last_tag()
-    if not commits:
+    with GitRepository() as repo:
+        new_version = generate_changelog(repo)
+    if new_version is None:
         print("No new commits to add to changelog")
         return
-    categories = categorize_commits(commits)
-    ai_summary = generate_ai_summary('\n'.join(commits))
-    new_content = update_changelog(categories, ai_summary)
-    with open('CHANGELOG.md', 'w', encoding='utf-8', newline='\n') as f:
-        f.write(new_content)
-    # Create a new tag with the bumped version
-    current_version = get_current_version()
-    bump_type = determine_version_bump(commits)
-    new_version = bump_version(current_version, bump_type)
     try:
         # Create tag without template- prefix
         subprocess.run(['git', 'tag', new_version, '-m', f'Version {new_version}'], check=True)
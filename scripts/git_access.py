@@ -0,0 +1,236 @@
+"""In-process read access to the repository for the release scripts.
+
+Refs are read straight from the .git directory (loose files and
+packed-refs), and objects come from one long-lived `git cat-file --batch`
+process, so looking up a tag, resolving HEAD or reading a commit costs a
+pipe round trip instead of a process spawn. Writes (tags, commits) and
+describe still go through the git CLI.
+"""
+import os
+import subprocess
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, Optional, Tuple
+
+# Where `git rev-parse <name>` looks for a short ref name, in order
+REF_SEARCH = ('{}', 'refs/{}', 'refs/tags/{}', 'refs/heads/{}', 'refs/remotes/{}', 'refs/remotes/{}/HEAD')
+MAX_SYMREF_DEPTH = 5
+
+
+class GitError(Exception):
+    """Raised when a ref or object cannot be found or read."""
+
+
+class Commit(NamedTuple):
+    sha: str
+    tree: str
+    parents: Tuple[str, ...]
+    committer_time: int
+    committer_offset: int  # minutes east of UTC
+    message: str
+
+    @property
+    def committed_at(self):
+        """Commit date in the committer's timezone, like git's %ci."""
+        tz = timezone(timedelta(minutes=self.committer_offset))
+        return datetime.fromtimestamp(self.committer_time, tz)
+
+    @property
+    def subject(self):
+        return self.message.split('\n', 1)[0]
+
+
+def _parse_offset(offset):
+    """Turn a '+0130' style timezone into minutes east of UTC."""
+    sign = -1 if offset.startswith('-') else 1
+    return sign * (int(offset[1:3]) * 60 + int(offset[3:5]))
+
+
+def _parse_committer(value):
+    """Return (timestamp, minutes east of UTC) from a raw committer header value."""
+    timestamp, offset = value.rsplit(b' ', 2)[1:]
+    return int(timestamp), _parse_offset(offset.decode('ascii'))
+
+
+def _git_dirs(path):
+    """Return (git_dir, common_dir) for a work tree or bare repository at path."""
+    dot_git = os.path.join(path, '.git')
+    if os.path.isfile(dot_git):
+        # Linked work trees and submodules point at their real git directory
+        with open(dot_git, 'r', encoding='utf-8') as f:
+            git_dir = f.read().strip().split('gitdir: ', 1)[1]
+        git_dir = os.path.normpath(os.path.join(path, git_dir))
+    elif os.path.isdir(dot_git):
+        git_dir = dot_git
+    elif os.path.isfile(os.path.join(path, 'HEAD')):
+        git_dir = path
+    else:
+        raise GitError(f"Not a git repository: {path}")
+    common_dir = git_dir
+    try:
+        with open(os.path.join(git_dir, 'commondir'), 'r', encoding='utf-8') as f:
+            common_dir = os.path.normpath(os.path.join(git_dir, f.read().strip()))
+    except FileNotFoundError:
+        pass
+    return git_dir, common_dir
+
+
+class GitRepository:
+    """Read refs and objects of the repository at path without spawning per call.
+
+    Use as a context manager, or call close(), to stop the cat-file
+    process. Ref reads always go to disk, so refs changed by git commands
+    run in between are seen.
+    """
+
+    def __init__(self, path='.'):
+        self.path = os.path.abspath(path)
+        self.git_dir, self.common_dir = _git_dirs(self.path)
+        self._batch = None
+
+    def close(self):
+        if self._batch is not None:
+            self._batch.stdin.close()
+            self._batch.stdout.close()
+            self._batch.wait()
+            self._batch = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Refs
+
+    def _packed_refs(self):
+        """Return {ref: object id} from packed-refs."""
+        refs = {}
+        try:
+            with open(os.path.join(self.common_dir, 'packed-refs'), 'r', encoding='utf-8') as f:
+                for line in f:
+                    # Skip the header and the peeled ids of annotated tags
+                    if line.startswith(('#', '^')):
+                        continue
+                    sha, _, name = line.rstrip('\n').partition(' ')
+                    refs[name] = sha
+        except FileNotFoundError:
+            pass
+        return refs
+
+    def _read_loose(self, name):
+        # HEAD and other per-worktree refs live in git_dir, everything else is shared
+        base = self.git_dir if '/' not in name or name.startswith('refs/bisect/') else self.common_dir
+        try:
+            with open(os.path.join(base, name), 'r', encoding='utf-8') as f:
+                return f.read().strip()
+        except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+            return None
+
+    def read_ref(self, name, packed=None):
+        """Return the object id a full ref name points at, or None."""
+        for _ in range(MAX_SYMREF_DEPTH):
+            value = self._read_loose(name)
+            if value is None:
+                if packed is None:
+                    packed = self._packed_refs()
+                return packed.get(name)
+            if not value.startswith('ref: '):
+                return value
+            name = value[5:]
+        raise GitError(f"Symbolic ref loop at {name}")
+
+    def rev_parse(self, name):
+        """Resolve HEAD, a full or short ref name, or a full object id.
+
+        A trailing ^{commit} peels annotated tags down to their commit.
+        """
+        peel = name.endswith('^{commit}')
+        if peel:
+            name = name[:-len('^{commit}')]
+        sha = None
+        if len(name) in (40, 64) and all(c in '0123456789abcdef' for c in name):
+            sha = name
+        else:
+            packed = self._packed_refs()
+            for pattern in REF_SEARCH:
+                sha = self.read_ref(pattern.format(name), packed)
+                if sha:
+                    break
+        if not sha:
+            raise GitError(f"Unknown revision: {name}")
+        return self.peel(sha) if peel else sha
+
+    def head(self):
+        return self.rev_parse('HEAD')
+
+    # Objects
+
+    def _process(self):
+        if self._batch is None:
+            # Kept running across calls; close() shuts it down
+            self._batch = subprocess.Popen(  # pylint: disable=consider-using-with
+                ['git', 'cat-file', '--batch'], cwd=self.path,
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE
+            )
+        return self._batch
+
+    def read_object(self, sha):
+        """Return (type, raw bytes) of an object."""
+        process = self._process()
+        process.stdin.write(sha.encode('ascii') + b'\n')
+        process.stdin.flush()
+        header = process.stdout.readline().decode('ascii').split()
+        if len(header) != 3:
+            if not header:
+                self.close()
+            raise GitError(f"Object not found: {sha}")
+        _, object_type, size = header
+        data = process.stdout.read(int(size))
+        process.stdout.read(1)  # trailing newline
+        return object_type, data
+
+    def _peeled_object(self, sha):
+        """Return (id, type, raw bytes) of sha with annotated tags followed."""
+        for _ in range(MAX_SYMREF_DEPTH):
+            object_type, data = self.read_object(sha)
+            if object_type != 'tag':
+                return sha, object_type, data
+            sha = data.split(b'\n', 1)[0].split()[1].decode('ascii')
+        raise GitError(f"Tag chain too deep at {sha}")
+
+    def peel(self, sha):
+        """Follow annotated tags until a non-tag object."""
+        return self._peeled_object(sha)[0]
+
+    def commit(self, rev='HEAD'):
+        """Return the Commit a revision points at."""
+        sha, object_type, data = self._peeled_object(self.rev_parse(rev))
+        if object_type != 'commit':
+            raise GitError(f"{rev} is a {object_type}, not a commit")
+        headers, _, message = data.partition(b'\n\n')
+        tree, parents, committer_time, committer_offset = None, [], 0, 0
+        for line in headers.split(b'\n'):
+            key, _, value = line.partition(b' ')
+            if key == b'tree':
+                tree = value.decode('ascii')
+            elif key == b'parent':
+                parents.append(value.decode('ascii'))
+            elif key == b'committer':
+                committer_time, committer_offset = _parse_committer(value)
+        return Commit(sha, tree, tuple(parents), committer_time, committer_offset,
+                      message.decode('utf-8', errors='replace'))
+
+    def latest_tag(self, rev='HEAD') -> Optional[str]:
+        """Return the tag nearest to rev in its history, or None without one.
+
+        This is one `git describe --tags --abbrev=0` call: on merge histories
+        describe picks the tag with the fewest commits since it, which a
+        newest-first walk over cat-file does not reproduce.
+        """
+        try:
+            return subprocess.check_output(
+                ['git', 'describe', '--tags', '--abbrev=0', rev], cwd=self.path,
+                stderr=subprocess.DEVNULL, text=True
+            ).strip()
+        except subprocess.CalledProcessError:
+            return None
@@ -2,13 +2,36 @@
 """
 Git hook to run CodeQL analysis locally before commits.
 Requires CodeQL CLI to be installed: https://github.com/github/codeql-cli-binaries
+
+The database under .codeql/db is built from the staged (index) content of
+the Python files, exported to a temporary directory, so it analyzes what
+is being committed rather than the working tree. It is kept between runs
+and only rebuilt when Python sources in the index changed since it was
+built. Findings are cached per file content (the staged blob id), so a
+commit whose staged Python files have all been analyzed before finishes
+without running CodeQL. Set CODEQL_FULL=1 to ignore the cache.
+
+Settings (environment):
+    CODEQL_QUERIES  comma-separated query packs, suites or .ql files
+    CODEQL_RAM      memory budget in MB for extraction and analysis (default 2048)
+    CODEQL_THREADS  thread budget, 0 for one per core (default 0)
 """
+import csv
+import hashlib
+import json
 import os
 import subprocess
 import sys
-import shutil
-from typing import Tuple, List
+import tempfile
+from typing import Dict, List, Optional, Tuple
 from hook_utils import GREEN, RESET, print_header, print_warning, print_success, print_info
+CODEQL_DIR = '.codeql'
+DB_PATH = os.path.join(CODEQL_DIR, 'db')
+CACHE_PATH = os.path.join(CODEQL_DIR, 'cache.json')
+RESULTS_PATH = os.path.join(CODEQL_DIR, 'results.csv')
+DEFAULT_QUERIES = 'codeql/python-queries:codeql-suites/python-security-extended.qls'
+# Bump when the cache layout changes
+CACHE_VERSION = 2
 def check_codeql_installation() -> bool:
     """Check if CodeQL CLI is installed and available."""
     try:
@@ -17,26 +40,84 @@ def check_codeql_installation() -> bool:
     except (subprocess.CalledProcessError, FileNotFoundError):
         print_warning("CodeQL CLI not found. Please install it from: https://github.com/github/codeql-cli-binaries")
         return False
+def get_queries() -> List[str]:
+    """Query packs, suites or files to run, from CODEQL_QUERIES."""
+    return [q.strip() for q in os.getenv('CODEQL_QUERIES', DEFAULT_QUERIES).split(',') if q.strip()]
+def get_budget() -> Tuple[str, str]:
+    """The --ram and --threads options shared by extraction and analysis."""
+    return f"--ram={int(os.getenv('CODEQL_RAM', '2048'))}", f"--threads={int(os.getenv('CODEQL_THREADS', '0'))}"
+def get_indexed_python_files() -> Dict[str, str]:
+    """Map every Python file in the index to its blob id (a content hash)."""
+    output = subprocess.check_output(['git', 'ls-files', '-s', '-z', '--', '*.py'], text=True)
+    files = {}
+    for entry in output.split('\0'):
+        if entry:
+            # "<mode> <blob> <stage>\t<path>"
+            info, path = entry.split('\t', 1)
+            files[path] = info.split()[1]
+    return files
 def get_staged_files() -> List[str]:
-    """Get list of staged files for analysis."""
+    """Get list of staged Python files for analysis."""
     try:
         staged = subprocess.check_output(
-            ['git', 'diff', '--cached', '--name-only', '--diff-filter=ACM'],
+            ['git', 'diff', '--cached', '--name-only', '-z', '--diff-filter=ACM', '--', '*.py'],
             text=True
-        ).splitlines()
-        return [f for f in staged if f.endswith(('.py', '.js', '.ts', '.java', '.cpp', '.c'))]
+        ).split('\0')
+        return [f for f in staged if f]
     except subprocess.CalledProcessError:
         return []
-def create_database(db_path: str) -> bool:
-    """Create CodeQL database for the repository."""
+def sources_digest(files: Dict[str, str]) -> str:
+    """Fingerprint the Python sources a database was built from."""
+    digest = hashlib.sha256()
+    for path in sorted(files):
+        digest.update(f'{path}\0{files[path]}\n'.encode('utf-8'))
+    return digest.hexdigest()
+def load_cache(queries: List[str]) -> dict:
+    """Load the cache, starting fresh if it is missing or was made with other queries."""
+    empty = {'version': CACHE_VERSION, 'queries': queries, 'database': None, 'findings': {}}
+    if os.getenv('CODEQL_FULL') == '1':
+        return empty
+    try:
+        with open(CACHE_PATH, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return empty
+    if cache.get('version') != CACHE_VERSION or cache.get('queries') != queries:
+        return empty
+    return cache
+def save_cache(cache: dict) -> None:
+    """Write the cache atomically."""
+    os.makedirs(CODEQL_DIR, exist_ok=True)
+    tmp_path = f'{CACHE_PATH}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, CACHE_PATH)
+def cached_findings(cache: dict, files: Dict[str, str], paths: List[str]) -> Optional[Dict[str, list]]:
+    """Return {path: findings} for paths if every one was analyzed before, else None."""
+    results = {}
+    for path in paths:
+        findings = cache['findings'].get(files.get(path, ''))
+        if findings is None:
+            return None
+        results[path] = findings
+    return results
+def export_index(files: Dict[str, str], target: str) -> None:
+    """Write the staged content of files under target, at their repository paths."""
+    subprocess.run(
+        ['git', 'checkout-index', '-z', '--stdin', f'--prefix={target}/'],
+        input=''.join(f'{path}\0' for path in files), text=True, check=True
+    )
+def create_database(db_path: str, source_root: str) -> bool:
+    """Create CodeQL database for the sources under source_root."""
     try:
         # Create the directory if it doesn't exist
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         subprocess.run([
             'codeql', 'database', 'create', db_path,
-            '--overwrite',  # Overwrite existing database
-            '--language=python',  # Add other languages as needed
-            '--source-root=.'
+            '--overwrite',  # Replace the database from an older tree
+            '--language=python',
+            f'--source-root={source_root}',
+            *get_budget()
         ], check=True)
         return True
     except subprocess.CalledProcessError as e:
@@ -45,68 +126,100 @@ def create_database(db_path: str) -> bool:
     except OSError as e:
         print_warning(f"Failed to create directory: {e}")
         return False
-def run_analysis(db_path: str) -> Tuple[bool, str]:
-    """Run CodeQL analysis using predefined queries."""
+def run_analysis(db_path: str, queries: List[str]) -> Tuple[bool, Dict[str, list]]:
+    """Run every query pack in one evaluation and group the findings by file.
+
+    Passing all packs to a single `database analyze` lets CodeQL evaluate
+    them in parallel within the RAM/thread budget; separate processes
+    would contend for the database's lock and cache.
+    """
     try:
-        # Run security queries from installed query pack
-        query_path = os.path.expanduser(
-            '~/.codeql/packages/codeql/python-queries/1.3.4/Security/CWE-078/CommandInjection.ql'
-        )
         subprocess.run([
             'codeql', 'database', 'analyze', db_path,
             '--format=csv',  # Use CSV format for easier parsing
-            '--output=codeql-results.csv',
-            '--ram=2048',  # Limit memory usage
-            '--threads=0',  # Use all available threads
+            f'--output={RESULTS_PATH}',
+            *get_budget(),
             '--',  # Separate options from queries
-            query_path  # Run command injection query
+            *queries
         ], capture_output=True, text=True, check=True)
-        # Check if there are any results
-        if os.path.exists('codeql-results.csv'):
-            with open('codeql-results.csv', 'r', encoding='utf-8') as f:
-                results = f.readlines()
-                if len(results) > 1:  # More than just the header
-                    return False, f"Found {len(results)-1} potential security issues:\n" + ''.join(results)
-            return True, "No security issues found"
-        return True, "Analysis completed successfully"
+        by_file = {}
+        if os.path.exists(RESULTS_PATH):
+            with open(RESULTS_PATH, 'r', encoding='utf-8', newline='') as f:
+                # name, description, severity, message, path, start line, ...
+                for row in csv.reader(f):
+                    if len(row) >= 6:
+                        by_file.setdefault(row[4].lstrip('/'), []).append(
+                            {'name': row[0], 'severity': row[2], 'message': row[3], 'line': row[5]}
+                        )
+        return True, by_file
     except subprocess.CalledProcessError as e:
-        return False, f"Analysis failed: {e.output}"
+        print_warning(f"Analysis failed: {e.stderr or e.output}")
+        return False, {}
     finally:
         # Clean up results file
-        if os.path.exists('codeql-results.csv'):
-            os.remove('codeql-results.csv')
-def cleanup(db_path: str):
-    """Clean up temporary files and databases."""
-    try:
-        if os.path.exists(db_path):
-            shutil.rmtree(db_path)
-        if os.path.exists('codeql-results.sarif'):
-            os.remove('codeql-results.sarif')
-    except OSError as e:
-        print_warning(f"Cleanup failed: {e}")
+        if os.path.exists(RESULTS_PATH):
+            os.remove(RESULTS_PATH)
+def analyze(cache: dict, files: Dict[str, str], queries: List[str]) -> bool:
+    """Bring the database up to date, analyze it and cache findings for every file."""
+    digest = sources_digest(files)
+    if cache['database'] != digest or not os.path.isdir(DB_PATH):
+        print_info("Python sources changed; rebuilding the CodeQL database.")
+        # Findings are cached by blob id, so extract exactly those blobs
+        with tempfile.TemporaryDirectory() as source_root:
+            try:
+                export_index(files, source_root)
+            except subprocess.CalledProcessError as e:
+                print_warning(f"Failed to export staged sources: {e}")
+                return False
+            if not create_database(DB_PATH, source_root):
+                return False
+        cache['database'] = digest
+    else:
+        print_info("Reusing the CodeQL database.")
+    success, by_file = run_analysis(DB_PATH, queries)
+    if not success:
+        return False
+    for path, blob in files.items():
+        cache['findings'][blob] = by_file.get(path, [])
+    # Keep the cache to the current tree's files
+    live = set(files.values())
+    cache['findings'] = {blob: found for blob, found in cache['findings'].items() if blob in live}
+    save_cache(cache)
+    return True
+def report(results: Dict[str, list]) -> bool:
+    """Print findings in the staged files; return True when there are none."""
+    total = sum(len(findings) for findings in results.values())
+    if not total:
+        return True
+    print_warning(f"Found {total} potential security issues:")
+    for path, findings in sorted(results.items()):
+        for finding in findings:
+            print(f"  {path}:{finding['line']}: [{finding['severity']}] {finding['name']}: {finding['message']}")
+    return False
 def main():
     """Main function to run CodeQL analysis."""
     print_header("Running CodeQL Analysis...")
-    # Check if CodeQL is installed
-    if not check_codeql_installation():
-        sys.exit(1)
     # Get staged files
     staged_files = get_staged_files()
     if not staged_files:
         print_info("No relevant files to analyze.")
         sys.exit(0)
-    # Create temporary database
-    db_path = ".codeql/db"
-    if not create_database(db_path):
-        cleanup(db_path)
-        sys.exit(1)
-    # Run analysis
-    success, message = run_analysis(db_path)
-    cleanup(db_path)
-    if not success:
-        print_warning(message)
+    queries = get_queries()
+    files = get_indexed_python_files()
+    cache = load_cache(queries)
+    results = cached_findings(cache, files, staged_files)
+    if results is not None:
+        print_info("Staged Python files match cached CodeQL results.")
+    else:
+        # Check if CodeQL is installed
+        if not check_codeql_installation():
+            sys.exit(1)
+        if not analyze(cache, files, queries):
+            sys.exit(1)
+        results = cached_findings(cache, files, staged_files) or {}
+    if not report(results):
         sys.exit(1)
-    print_success(message)
+    print_success("No security issues found")
     print(f"\n{GREEN}✨ CodeQL analysis completed successfully!{RESET}")
 if __name__ == "__main__":
     main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Write placeholder WAV files for configured session sounds that have no source.
+Each background sound gets a few seconds of seeded noise beside its
+configured file (rain.mp3 -> rain.wav) and the affirmation layers get a soft
+tone, so sessions can be rendered in development without the real
+recordings. Existing files are left alone.
+Usage:
+    python scripts/make_sample_sounds.py
+"""
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.audio.mixer import SAMPLE_RATE, to_pcm16  # noqa: E402  pylint: disable=wrong-import-position
+from app.audio.sources import sounds_dir  # noqa: E402  pylint: disable=wrong-import-position
+from app.audio.wav import wav_header  # noqa: E402  pylint: disable=wrong-import-position
+from app.site_info import get_site_info_source  # noqa: E402  pylint: disable=wrong-import-position
+
+BACKGROUND_SECONDS = 5
+AFFIRMATION_SECONDS = 3
+
+
+def noise(seconds, seed):
+    """Return seeded stereo noise as float32 frames."""
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-0.3, 0.3, (seconds * SAMPLE_RATE, 2)).astype(np.float32)
+
+
+def tone(seconds, frequency=220.0):
+    """Return a quiet mono sine tone as float32 frames."""
+    t = np.arange(seconds * SAMPLE_RATE, dtype=np.float32) / SAMPLE_RATE
+    return (0.2 * np.sin(2 * np.pi * frequency * t)).astype(np.float32)[:, None]
+
+
+def write_wav(path, frames):
+    """Write float32 frames as a 16-bit PCM WAV file."""
+    data = to_pcm16(frames)
+    with open(path, 'wb') as f:
+        f.write(wav_header(len(data), SAMPLE_RATE, frames.shape[1]))
+        f.write(data)
+
+
+def main():
+    site_info = get_site_info_source().get()
+    directory = sounds_dir(site_info)
+    os.makedirs(directory, exist_ok=True)
+
+    samples = {}
+    for seed, entry in enumerate(site_info.get('background_sounds') or ()):
+        stem, _ = os.path.splitext(entry['file'])
+        samples[entry['file']] = (stem + '.wav', lambda seed=seed: noise(BACKGROUND_SECONDS, seed))
+    affirmations = [entry['affirmations'] for entry in site_info.get('meditation_types') or ()
+                    if entry.get('affirmations')]
+    default_affirmations = (site_info.get('session_defaults') or {}).get('affirmations')
+    if default_affirmations:
+        affirmations.append(default_affirmations)
+    for name in affirmations:
+        stem, _ = os.path.splitext(name)
+        samples[name] = (stem + '.wav', lambda: tone(AFFIRMATION_SECONDS))
+
+    for name, (wav_name, make) in samples.items():
+        if os.path.isfile(os.path.join(directory, name)):
+            print(f"= {name}: source present")
+            continue
+        path = os.path.join(directory, wav_name)
+        if os.path.isfile(path):
+            print(f"= {name}: {wav_name} present")
+            continue
+        write_wav(path, make())
+        print(f"✓ {name}: wrote {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -12,20 +12,19 @@ import sys
 import re
 from datetime import datetime
 
-def get_current_version():
+from generate_changelog import generate_changelog
+from git_access import GitRepository
+
+def get_current_version(repo):
     """Get the current version from the latest tag."""
-    try:
-        tag = subprocess.check_output(
-            ['git', 'describe', '--tags', '--abbrev=0'],
-            stderr=subprocess.DEVNULL
-        ).decode('ascii').strip()
-        # Extract version numbers
-        match = re.match(r'v?(\d+)\.(\d+)\.(\d+)', tag)
-        if match:
-            return tuple(map(int, match.groups()))
-        return (0, 0, 0)
-    except subprocess.CalledProcessError:
+    tag = repo.latest_tag()
+    if tag is None:
         return (0, 0, 0)
+    # Extract version numbers
+    match = re.match(r'v?(\d+)\.(\d+)\.(\d+)', tag)
+    if match:
+        return tuple(map(int, match.groups()))
+    return (0, 0, 0)
 
 def bump_version(current_version, bump_type):
     """Bump the version number based on semver."""
@@ -37,47 +36,43 @@ def bump_version(current_version, bump_type):
     # patch
     return (major, minor, patch + 1)
 
-def create_tag(version):
+def create_tag(repo, version):
     """Create and push a new git tag."""
-    tag = f'v{".".join(map(str, version))}'
+    number = ".".join(map(str, version))
+    tag = f'v{number}'
     message = f'Release {tag} - {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}'
 
     try:
-        # Generate changelog first
-        subprocess.run(['python', 'scripts/generate_changelog.py'], check=True)
-
-        # Stage and commit changelog
-        subprocess.run(['git', 'add', 'CHANGELOG.md'], check=True)
-        subprocess.run(['git', 'commit', '-m', f'docs: update changelog for {tag}'], check=True)
+        # Generate changelog first, in this process
+        if generate_changelog(repo, version=number):
+            # Stage and commit changelog
+            subprocess.run(['git', 'add', 'CHANGELOG.md'], cwd=repo.path, check=True)
+            subprocess.run(
+                ['git', 'commit', '-m', f'docs: update changelog for {tag}'], cwd=repo.path, check=True
+            )
+        else:
+            print('No new commits to add to changelog')
 
         # Create tag
-        subprocess.run(['git', 'tag', '-a', tag, '-m', message], check=True)
+        subprocess.run(['git', 'tag', '-a', tag, '-m', message], cwd=repo.path, check=True)
         print(f'Created tag: {tag}')
 
         # Push tag
         push = input('Push tag to remote? [y/N] ').lower()
         if push == 'y':
-            subprocess.run(['git', 'push', 'origin', tag], check=True)
+            subprocess.run(['git', 'push', 'origin', tag], cwd=repo.path, check=True)
             print(f'Pushed tag {tag} to remote')
     except subprocess.CalledProcessError as e:
         print(f'Error creating tag: {e}')
 
-def show_version_info():
+def show_version_info(repo):
     """Display current version information."""
-    try:
-        # Get latest tag
-        current = subprocess.check_output(
-            ['git', 'describe', '--tags', '--abbrev=0'],
-            stderr=subprocess.DEVNULL
-        ).decode('ascii').strip()
-    except subprocess.CalledProcessError:
-        current = 'No tags'
+    current = repo.latest_tag() or 'No tags'
 
     # Get commit info
-    sha = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD']).decode('ascii').strip()
-    commit_date = subprocess.check_output(
-        ['git', 'show', '-s', '--format=%ci', 'HEAD']
-    ).decode('ascii').strip()
+    commit = repo.commit('HEAD')
+    sha = commit.sha[:7]
+    commit_date = commit.committed_at.strftime('%Y-%m-%d %H:%M:%S %z')
 
     print(f'''
 Version Information:
@@ -94,25 +89,26 @@ def main():
 
     command = sys.argv[1]
 
-    if command == 'bump':
-        if len(sys.argv) != 3 or sys.argv[2] not in ['major', 'minor', 'patch']:
-            print('Please specify bump type: major, minor, or patch')
-            sys.exit(1)
+    with GitRepository() as repo:
+        if command == 'bump':
+            if len(sys.argv) != 3 or sys.argv[2] not in ['major', 'minor', 'patch']:
+                print('Please specify bump type: major, minor, or patch')
+                sys.exit(1)
 
-        current = get_current_version()
-        new_version = bump_version(current, sys.argv[2])
-        create_tag(new_version)
+            current = get_current_version(repo)
+            new_version = bump_version(current, sys.argv[2])
+            create_tag(repo, new_version)
 
-    elif command == 'tag':
-        current = get_current_version()
-        create_tag(current)
+        elif command == 'tag':
+            current = get_current_version(repo)
+            create_tag(repo, current)
 
-    elif command == 'info':
-        show_version_info()
+        elif command == 'info':
+            show_version_info(repo)
 
-    else:
-        print('Unknown command. Use bump, tag, or info')
-        sys.exit(1)
+        else:
+            print('Unknown command. Use bump, tag, or info')
+            sys.exit(1)
 
 if __name__ == '__main__':
     main()
@@ -7,5 +7,9 @@ pip install -r requirements.txt
 # Install git hooks
 python scripts/install_hooks.py
 
+# Write placeholder session sounds and pre-decode them
+python scripts/make_sample_sounds.py
+python scripts/decode_sounds.py
+
 # Verify setup
 python scripts/verify_setup.py
@@ -2,6 +2,8 @@ import os
 import base64
 import requests
 
+from build_branding import main as build_branding
+
 def setup_default_avatar():
     """Set up the default avatar for users without profile pictures."""
     img_dir = os.path.join('app', 'static', 'img')
@@ -42,3 +44,5 @@ iVBORw0KGgoAAAANSUhEUgAAAMAAAADACAYAAABS3GwHAAAABHNCSVQICAgIfAhkiAAAAAlwSFlzAAAO
 
 if __name__ == "__main__":
     setup_default_avatar()
+    # The configured light and dark avatars come from the branding build
+    build_branding()
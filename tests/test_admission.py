@@ -0,0 +1,168 @@
+"""Tests for the login admission limiter in app/admission.py and its ASGI front end."""
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import httpx
+from flask import Flask
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.admission import (  # noqa: E402  pylint: disable=wrong-import-position
+    TokenBucketLimiter, admission_controlled, client_ip, retry_after
+)
+from app.async_login import CALLBACK_PATH, AsyncLoginApp  # noqa: E402  pylint: disable=wrong-import-position
+
+
+class ClientIpTest(unittest.TestCase):
+    def test_forwarded_for_ignored_without_trusted_hops(self):
+        self.assertEqual(client_ip('10.0.0.1', '1.1.1.1'), '10.0.0.1')
+
+    def test_trusted_hops_pick_address_seen_by_outermost_proxy(self):
+        self.assertEqual(client_ip('10.0.0.1', '1.1.1.1, 2.2.2.2', trusted_hops=1), '2.2.2.2')
+        self.assertEqual(client_ip('10.0.0.1', '1.1.1.1, 2.2.2.2', trusted_hops=2), '1.1.1.1')
+
+    def test_spoofed_extra_hops_are_ignored(self):
+        spoofed = '6.6.6.6, 7.7.7.7, 1.1.1.1, 2.2.2.2'
+        self.assertEqual(client_ip('10.0.0.1', spoofed, trusted_hops=2), '1.1.1.1')
+
+    def test_fewer_hops_than_trusted_uses_first(self):
+        self.assertEqual(client_ip('10.0.0.1', '1.1.1.1', trusted_hops=3), '1.1.1.1')
+
+    def test_ipv6_grouped_by_prefix(self):
+        self.assertEqual(client_ip('2001:db8::1'), '2001:db8::/64')
+        self.assertEqual(client_ip('2001:db8::ffff:1'), client_ip('2001:db8::2'))
+        self.assertNotEqual(client_ip('2001:db8:0:1::1'), client_ip('2001:db8::1'))
+
+    def test_unparseable_address_returned_as_is(self):
+        self.assertEqual(client_ip(None), 'unknown')
+
+
+class TokenBucketLimiterTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'admission.sqlite3')
+        self.limiter = TokenBucketLimiter(
+            self.path, {'global': (10.0, 5), 'ip': (0.5, 2)}, busy_timeout=0.01
+        )
+
+    def test_ip_burst_then_shed(self):
+        self.assertEqual(self.limiter.admit('1.1.1.1', now=1000)[0], True)
+        self.assertEqual(self.limiter.admit('1.1.1.1', now=1000)[0], True)
+        self.assertEqual(self.limiter.admit('1.1.1.1', now=1000), (False, 2.0, 'ip'))
+        self.assertTrue(self.limiter.admit('2.2.2.2', now=1000)[0])
+
+    def test_global_burst_sheds_every_ip(self):
+        for i in range(5):
+            self.assertTrue(self.limiter.admit(f'10.0.0.{i}', now=1000)[0])
+        admitted, wait, scope = self.limiter.admit('10.0.0.9', now=1000)
+        self.assertEqual((admitted, scope), (False, 'global'))
+        self.assertAlmostEqual(wait, 0.1)
+
+    def test_refill_over_time(self):
+        self.limiter.admit('1.1.1.1', now=1000)
+        self.limiter.admit('1.1.1.1', now=1000)
+        admitted, wait, _ = self.limiter.admit('1.1.1.1', now=1001)
+        self.assertFalse(admitted)
+        self.assertAlmostEqual(wait, 1.0)
+        self.assertTrue(self.limiter.admit('1.1.1.1', now=1002)[0])
+        self.assertFalse(self.limiter.admit('1.1.1.1', now=1002)[0])
+
+    def test_shed_request_takes_no_token(self):
+        self.limiter.admit('1.1.1.1', now=1000)
+        self.limiter.admit('1.1.1.1', now=1000)
+        for _ in range(3):
+            self.limiter.admit('1.1.1.1', now=1001)
+        self.assertTrue(self.limiter.admit('1.1.1.1', now=1002)[0])
+
+    def test_fails_open_when_store_is_locked(self):
+        other = sqlite3.connect(self.path, isolation_level=None)
+        self.addCleanup(other.close)
+        other.execute('BEGIN EXCLUSIVE')
+        try:
+            self.assertEqual(self.limiter.admit('1.1.1.1', now=1000), (True, 0.0, None))
+        finally:
+            other.execute('ROLLBACK')
+
+    def test_fails_open_when_store_cannot_open(self):
+        limiter = TokenBucketLimiter(self.path, {'ip': (1.0, 1)})
+        limiter.after_fork()
+        limiter.path = os.path.join(self.path, 'not-a-directory', 'admission.sqlite3')
+        self.assertEqual(limiter.admit('1.1.1.1'), (True, 0.0, None))
+
+
+class RetryAfterTest(unittest.TestCase):
+    def test_rounds_up_to_whole_seconds(self):
+        self.assertEqual(retry_after(0.01), '1')
+        self.assertEqual(retry_after(2.0), '2')
+        self.assertEqual(retry_after(2.1), '3')
+
+
+class CountingLimiter:
+    def __init__(self, result=(True, 0.0, None)):
+        self.result = result
+        self.calls = []
+
+    def admit(self, ip):
+        self.calls.append(ip)
+        return self.result
+
+
+def make_app(limiter):
+    app = Flask(__name__)
+    app.config['TRUSTED_PROXY_HOPS'] = 0
+    app.extensions['auth_admission'] = limiter
+    app.views_called = 0
+
+    @app.route(CALLBACK_PATH)
+    @admission_controlled
+    def callback():
+        app.views_called += 1
+        return 'ok'
+
+    return app
+
+
+def asgi_get(app, path):
+    async def get():
+        transport = httpx.ASGITransport(app=AsyncLoginApp(app), client=('3.3.3.3', 1234))
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            return await client.get(path)
+    return asyncio.run(get())
+
+
+class AdmissionPathsTest(unittest.TestCase):
+    def test_wsgi_request_takes_one_token(self):
+        limiter = CountingLimiter()
+        response = make_app(limiter).test_client().get(CALLBACK_PATH)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(limiter.calls), 1)
+
+    def test_wsgi_shed_answers_429(self):
+        app = make_app(CountingLimiter((False, 2.5, 'ip')))
+        response = app.test_client().get(CALLBACK_PATH)
+        self.assertEqual((response.status_code, response.headers['Retry-After']), (429, '3'))
+        self.assertEqual(app.views_called, 0)
+
+    def test_asgi_admitted_request_is_not_charged_twice(self):
+        limiter = CountingLimiter()
+        app = make_app(limiter)
+        response = asgi_get(app, CALLBACK_PATH)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(limiter.calls, ['3.3.3.3'])
+        self.assertEqual(app.views_called, 1)
+
+    def test_asgi_shed_answers_429_without_flask(self):
+        app = make_app(CountingLimiter((False, 0.4, 'global')))
+        response = asgi_get(app, CALLBACK_PATH)
+        self.assertEqual((response.status_code, response.headers['retry-after']), (429, '1'))
+        self.assertEqual(app.views_called, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+"""Tests for scripts/git_access.py against scratch repositories."""
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'scripts'))
+
+from git_access import GitRepository  # noqa: E402  pylint: disable=wrong-import-position
+
+
+class LatestTagTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.path = self._tmp.name
+        self.git('init', '-q', '-b', 'main')
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def git(self, *args, date=None):
+        env = dict(os.environ, GIT_AUTHOR_NAME='Test', GIT_AUTHOR_EMAIL='test@example.com',
+                   GIT_COMMITTER_NAME='Test', GIT_COMMITTER_EMAIL='test@example.com')
+        if date is not None:
+            env['GIT_AUTHOR_DATE'] = env['GIT_COMMITTER_DATE'] = f'@{date} +0000'
+        return subprocess.run(
+            ['git', *args], cwd=self.path, env=env, check=True, capture_output=True, text=True
+        ).stdout.strip()
+
+    def commit(self, message, date):
+        self.git('commit', '-q', '--allow-empty', '-m', message, date=date)
+
+    def test_no_tags(self):
+        self.commit('root', 1000)
+        with GitRepository(self.path) as repo:
+            self.assertIsNone(repo.latest_tag())
+
+    def test_merge_prefers_tag_with_fewest_commits_since(self):
+        self.commit('root', 1000)
+        self.git('checkout', '-q', '-b', 'side')
+        # Newest commit in the history, but five commits away on the other side
+        self.commit('side', 9000)
+        self.git('tag', 'far')
+        self.git('checkout', '-q', 'main')
+        for i in range(5):
+            self.commit(f'main {i}', 2000 + i)
+        self.git('tag', '-a', 'near', '-m', 'near')
+        self.git('merge', '-q', '--no-ff', '-m', 'merge side', 'side', date=9500)
+
+        expected = self.git('describe', '--tags', '--abbrev=0')
+        self.assertEqual(expected, 'near')
+        with GitRepository(self.path) as repo:
+            self.assertEqual(repo.latest_tag(), expected)
+            self.assertEqual(repo.latest_tag('side'), 'far')
+
+
+if __name__ == '__main__':
+    unittest.main()
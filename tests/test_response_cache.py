@@ -0,0 +1,67 @@
+"""Tests for the anonymous page cache in app/response_cache.py."""
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from flask import Flask, session
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.response_cache import ResponseCache, cached_response  # noqa: E402  pylint: disable=wrong-import-position
+
+
+class FixedTheme:
+    def get(self):
+        return self
+
+    def html_class(self, cookie_value):
+        return cookie_value or 'light'
+
+
+def make_app():
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    template_folder = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+    app.extensions['response_cache'] = ResponseCache(lambda: 1, template_folder.name)
+    app.extensions['theme'] = FixedTheme()
+    app.renders = 0
+
+    @app.route('/page')
+    @cached_response
+    def page():
+        app.renders += 1
+        return 'page'
+
+    @app.route('/greet')
+    @cached_response
+    def greet():
+        app.renders += 1
+        session['greeted'] = True
+        return 'hello'
+
+    return app, template_folder
+
+
+class CachedResponseTest(unittest.TestCase):
+    def setUp(self):
+        self.app, template_folder = make_app()
+        self.addCleanup(template_folder.cleanup)
+        self.client = self.app.test_client()
+
+    def test_anonymous_page_rendered_once(self):
+        first = self.client.get('/page')
+        second = self.client.get('/page', headers={'If-None-Match': first.headers['ETag']})
+        self.assertEqual(self.app.renders, 1)
+        self.assertEqual(second.status_code, 304)
+
+    def test_view_that_writes_session_is_not_cached(self):
+        for _ in range(2):
+            response = self.client.get('/greet')
+            self.assertIn('Set-Cookie', response.headers)
+        self.assertEqual(self.app.renders, 2)
+        self.assertEqual(self.app.extensions['response_cache'].stats()['entries'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+"""Tests for newline-delimited batch uploads of meditation sessions."""
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from flask import Flask
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.meditation_log import (  # noqa: E402  pylint: disable=wrong-import-position
+    BatchTooLarge, MeditationLog, read_event_batch
+)
+from app.routes.main import bp  # noqa: E402  pylint: disable=wrong-import-position
+
+NDJSON = 'application/x-ndjson'
+
+
+def event(event_id, meditation_type='Mindfulness', **overrides):
+    data = {
+        'id': event_id,
+        'started_at': int(time.time()) - 3600,
+        'duration_seconds': 600,
+        'meditation_type': meditation_type,
+    }
+    data.update(overrides)
+    return data
+
+
+def ndjson(*items):
+    return ''.join(
+        (item if isinstance(item, str) else json.dumps(item)) + '\n' for item in items
+    ).encode('utf-8')
+
+
+class StaticSiteInfo:
+    def get(self):
+        return {'meditation_types': [{'name': 'Mindfulness'}, {'name': 'Breathing'}]}
+
+
+class ReadEventBatchTest(unittest.TestCase):
+    def read(self, body, max_events=10, max_bytes=4096, **kwargs):
+        return read_event_batch(io.BytesIO(body), max_events, max_bytes, **kwargs)
+
+    def test_valid_and_invalid_lines(self):
+        events, rejected = self.read(ndjson(event('a'), '', 'not json', event('b', started_at=0)))
+        self.assertEqual([e.event_id for e in events], ['a'])
+        self.assertEqual([r['line'] for r in rejected], [3, 4])
+        self.assertIn('started_at', rejected[1]['error'])
+
+    def test_byte_cap(self):
+        body = ndjson(*(event(f'e{i}') for i in range(5)))
+        with self.assertRaisesRegex(BatchTooLarge, 'bytes'):
+            self.read(body, max_bytes=len(body) - 1)
+        self.assertEqual(len(self.read(body, max_bytes=len(body))[0]), 5)
+
+    def test_event_cap_counts_rejected_lines(self):
+        with self.assertRaisesRegex(BatchTooLarge, '2 events'):
+            self.read(ndjson(event('a'), 'bad', event('b')), max_events=2)
+
+    def test_line_cap(self):
+        with self.assertRaisesRegex(BatchTooLarge, 'Line 2'):
+            self.read(ndjson(event('a'), event('b', background='x' * 200)), max_line_bytes=150)
+
+
+class RecordSessionBatchTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(tmp.cleanup)
+        app = Flask(__name__)
+        app.secret_key = 'test'
+        app.config.update(SESSION_BATCH_MAX_EVENTS=5, SESSION_BATCH_MAX_BYTES=2048)
+        app.extensions['site_info'] = StaticSiteInfo()
+        self.log = MeditationLog(os.path.join(tmp.name, 'log.sqlite3'))
+        app.extensions['meditation_log'] = self.log
+        app.register_blueprint(bp)
+        self.client = app.test_client()
+        with self.client.session_transaction() as session:
+            session['user_id'] = 'u1'
+
+    def post(self, body, content_type=NDJSON):
+        return self.client.post('/sessions/batch', data=body, content_type=content_type)
+
+    def test_requires_ndjson_content_type(self):
+        body = ndjson(event('a'))
+        for content_type in ('text/plain', 'application/x-www-form-urlencoded', 'application/json'):
+            self.assertEqual(self.post(body, content_type).status_code, 415)
+        self.assertEqual(self.log.stats('u1')['total_sessions'], 0)
+
+    def test_reports_rejected_lines_and_unknown_types(self):
+        response = self.post(ndjson(event('a'), '{"id": "b"}', event('c', 'Juggling')))
+        self.assertEqual(response.status_code, 200)
+        result = response.get_json()
+        self.assertEqual((result['received'], result['recorded']), (3, 1))
+        self.assertEqual(result['rejected'][0]['line'], 2)
+        self.assertEqual(result['rejected'][1]['id'], 'c')
+
+    def test_reupload_records_nothing_twice(self):
+        body = ndjson(event('a'), event('b', 'Breathing'))
+        self.assertEqual(self.post(body).get_json()['recorded'], 2)
+        result = self.post(body).get_json()
+        self.assertEqual((result['recorded'], result['duplicates']), (0, 2))
+        self.assertEqual(self.log.stats('u1')['total_sessions'], 2)
+
+    def test_oversized_batches_are_rejected(self):
+        too_many = ndjson(*(event(f'e{i}') for i in range(6)))
+        self.assertEqual(self.post(too_many).status_code, 413)
+        too_big = ndjson(event('a', background='x' * 100)) * 20
+        self.assertEqual(self.post(too_big).status_code, 413)
+        self.assertEqual(self.log.stats('u1')['total_sessions'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
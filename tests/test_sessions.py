@@ -0,0 +1,123 @@
+"""Tests for the server-side session stores and interface in app/sessions.py."""
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+
+from flask import Flask, jsonify, session
+from markupsafe import Markup
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.sessions import (  # noqa: E402  pylint: disable=wrong-import-position
+    MemorySessionStore, ServerSideSession, ServerSideSessionInterface, SQLiteSessionStore
+)
+
+PLANTED_SID = 'A' * 43
+
+
+def make_app(store):
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    app.session_interface = ServerSideSessionInterface(store)
+
+    @app.route('/set')
+    def set_values():
+        session['tuple'] = (1, 2)
+        session['bytes'] = b'\x00\xff'
+        session['markup'] = Markup('<b>hi</b>')
+        session['when'] = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        return ''
+
+    @app.route('/get')
+    def get_values():
+        return jsonify(
+            tuple=isinstance(session.get('tuple'), tuple),
+            bytes=session.get('bytes') == b'\x00\xff',
+            markup=isinstance(session.get('markup'), Markup),
+            when=session.get('when') == datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+        )
+
+    @app.route('/login/<uid>')
+    def login(uid):
+        session.regenerate()
+        session['user_id'] = uid
+        return ''
+
+    @app.route('/whoami')
+    def whoami():
+        return session.get('user_id', '')
+
+    return app
+
+
+class StoreBackendsMixin:
+    def make_store(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.store = self.make_store()
+        self.app = make_app(self.store)
+        self.client = self.app.test_client()
+
+    def sid(self):
+        return self.client.get_cookie('session').value
+
+    def test_values_round_trip_like_signed_cookies(self):
+        self.client.get('/set')
+        self.assertEqual(self.client.get('/get').get_json(),
+                         {'tuple': True, 'bytes': True, 'markup': True, 'when': True})
+
+    def test_regenerate_replaces_planted_sid(self):
+        self.client.set_cookie('session', PLANTED_SID)
+        self.client.get('/login/alice')
+        self.assertNotEqual(self.sid(), PLANTED_SID)
+        self.assertIsNone(self.store.get(PLANTED_SID))
+        self.assertEqual(self.client.get('/whoami').get_data(as_text=True), 'alice')
+
+    def test_regenerate_drops_previous_session(self):
+        self.client.get('/login/alice')
+        first = self.sid()
+        self.client.get('/login/bob')
+        self.assertNotEqual(self.sid(), first)
+        self.assertIsNone(self.store.get(first))
+        self.assertEqual(self.client.get('/whoami').get_data(as_text=True), 'bob')
+
+    def test_expired_entries_are_not_returned(self):
+        self.store.set(PLANTED_SID, '{}', 10, ttl=-1)
+        self.assertIsNone(self.store.get(PLANTED_SID))
+        self.store.set(PLANTED_SID, '{}', 10, ttl=60)
+        self.assertEqual(self.store.get(PLANTED_SID), ('{}', 10))
+
+    def test_expired_session_is_not_loaded(self):
+        self.app.permanent_session_lifetime = -1
+        self.client.get('/login/alice')
+        self.assertEqual(self.client.get('/whoami').get_data(as_text=True), '')
+
+
+class MemorySessionStoreTest(StoreBackendsMixin, unittest.TestCase):
+    def make_store(self):
+        return MemorySessionStore()
+
+
+class SQLiteSessionStoreTest(StoreBackendsMixin, unittest.TestCase):
+    def make_store(self):
+        tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(tmp.cleanup)
+        return SQLiteSessionStore(os.path.join(tmp.name, 'sessions.sqlite3'))
+
+
+class ServerSideSessionTest(unittest.TestCase):
+    def test_regenerate_is_idempotent(self):
+        data = ServerSideSession({'a': 1}, sid='old')
+        data.regenerate()
+        data.regenerate()
+        self.assertIsNone(data.sid)
+        self.assertEqual(data.replaced_sid, 'old')
+        self.assertTrue(data.modified)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+"""Tests for the decoded sound cache in app/audio/sound_store.py."""
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.audio import sound_store  # noqa: E402  pylint: disable=wrong-import-position
+from app.audio.mixer import SAMPLE_RATE, to_pcm16  # noqa: E402  pylint: disable=wrong-import-position
+from app.audio.wav import wav_header  # noqa: E402  pylint: disable=wrong-import-position
+
+
+def write_wav(path, seconds=1, seed=0):
+    frames = np.random.default_rng(seed).uniform(-0.3, 0.3, (seconds * SAMPLE_RATE, 2))
+    data = to_pcm16(frames.astype(np.float32))
+    with open(path, 'wb') as f:
+        f.write(wav_header(len(data), SAMPLE_RATE, 2))
+        f.write(data)
+
+
+class EnsureDecodedTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self._tmp.cleanup)
+        self.directory = self._tmp.name
+        self.path = os.path.join(self.directory, 'rain.wav')
+        write_wav(self.path)
+        self.store = sound_store.SoundStore(self.directory)
+
+    def pcm_files(self):
+        return sorted(name for name in os.listdir(self.directory) if name.endswith('.pcm'))
+
+    def test_touched_source_updates_header_without_decoding(self):
+        _, header = self.store.ensure_decoded('rain.wav')
+        os.utime(self.path, ns=(1, 1))
+        hash_file = sound_store._sha256  # pylint: disable=protected-access
+        with mock.patch.object(sound_store, 'decode') as decode, \
+                mock.patch.object(sound_store, '_sha256', wraps=hash_file) as sha256:
+            _, touched = self.store.ensure_decoded('rain.wav')
+            self.store.ensure_decoded('rain.wav')
+        decode.assert_not_called()
+        self.assertEqual(sha256.call_count, 1)
+        self.assertEqual(touched['pcm_file'], header['pcm_file'])
+        with open(self.path + sound_store.HEADER_SUFFIX, encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['source_mtime_ns'], 1)
+
+    def test_changed_source_replaces_old_pcm(self):
+        _, old = self.store.ensure_decoded('rain.wav')
+        write_wav(self.path, seed=1)
+        _, new = self.store.ensure_decoded('rain.wav')
+        self.assertNotEqual(new['pcm_file'], old['pcm_file'])
+        self.assertEqual(self.pcm_files(), [new['pcm_file']])
+
+    def test_old_pcm_removed_concurrently_is_ignored(self):
+        self.store.ensure_decoded('rain.wav')
+        write_wav(self.path, seed=1)
+        real_remove = os.remove
+
+        def remove_twice(path):
+            real_remove(path)
+            real_remove(path)
+
+        with mock.patch.object(sound_store.os, 'remove', remove_twice):
+            _, header = self.store.ensure_decoded('rain.wav')
+        self.assertEqual(self.pcm_files(), [header['pcm_file']])
+
+
+if __name__ == '__main__':
+    unittest.main()